@@ -0,0 +1,995 @@
+"""
+Benchmark del scraper contra una página de ownership sintética servida localmente.
+
+La página reproduce el contrato DOM del sitio (ownershipTable{sport}, ownershipPlayerRow,
+ownershipPlayerDkPrice, img alt del equipo, etc.) con una lista virtualizada de tamaño,
+ventana de filas y latencia de render configurables. Cada escenario ejecuta
+run_ownership_scrape completo y reporta tiempo total, llamadas a chromedriver, scrolls
+y filas por segundo. Siempre falla si un escenario no extrae todas las filas; si además hay un
+baseline guardado (benchmark_baseline.json, generado con --update-baseline en la máquina de
+referencia) falla ante regresiones de tiempo, llamadas o scrolls. Sin baseline esas comparaciones
+se omiten y se avisa.
+
+Uso:
+    python benchmark.py                          # escenarios por defecto contra el baseline
+    python benchmark.py --scenario large --update-baseline
+    python benchmark.py --players 500 --window 25 --latency-ms 80 --ingestion dom
+    python benchmark.py --compare-modes --xhr    # legacy vs bulk vs network sobre la misma página
+    python benchmark.py --frames --players 5000 --snapshots 48   # memoria/tiempo del esquema tipado
+    python benchmark.py --check-sources          # backend HTTP contra JSON incrustado, HTML y XHR
+    python benchmark.py --import-time            # arranque en frío de la CLI sin el stack del dashboard
+    python benchmark.py --lineups --candidates 400000   # lineups por segundo, 1 proceso contra el pool
+    python benchmark.py --field --field-size 150000     # field Monte Carlo: tiempo, memoria y duplicación
+    python benchmark.py --profiles --latency-ms 50      # perfil lean contra full: bytes, carga y RSS de Chrome
+    python benchmark.py --slates 4 --api-delay-ms 1500  # slates uno tras otro contra pestañas en paralelo
+"""
+import argparse
+import contextlib
+import functools
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from ownership import browser, config, field, lineups, parsing, schema, scrape, timeseries
+
+TEAMS = ["NYY", "BOS", "LAD", "SF", "CHC", "HOU", "ATL", "SEA", "TOR", "MIA"]
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Escenarios por defecto: jugadores, filas renderizadas, latencia de render (ms), modo de ingesta
+# y backend de origen ("browser" fuerza Selenium; "auto" prueba antes el backend HTTP)
+SCENARIOS = {
+    "small": {'players': 150, 'window': 30, 'latency_ms': 0, 'ingestion': "dom", 'source': "browser"},
+    "medium": {'players': 300, 'window': 30, 'latency_ms': 50, 'ingestion': "dom", 'source': "browser"},
+    "large": {'players': 600, 'window': 40, 'latency_ms': 100, 'ingestion': "dom", 'source': "browser"},
+    "network": {'players': 600, 'window': 40, 'latency_ms': 100, 'ingestion': "network", 'source': "browser"},
+    "http": {'players': 600, 'window': 40, 'latency_ms': 100, 'ingestion': "dom", 'source': "auto"},
+}
+
+# Margen tolerado antes de considerar una métrica como regresión
+TOLERANCES = {
+    'wall_s': 1.25,
+    'round_trips': 1.10,
+    'scrolls': 1.10,
+}
+WALL_TIME_SLACK_S = 0.5
+
+# Página con lista virtualizada: solo se renderizan las filas dentro de la ventana visible
+FIXTURE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Ownership fixture</title></head>
+<body>
+{page_assets}
+{slate_options}
+<div data-testid="ownershipTable{sport}">
+  <div id="scroller" style="height: {viewport}; overflow-y: auto; position: relative;">
+    <div id="spacer" style="position: relative;"></div>
+  </div>
+</div>
+<script>
+let PLAYERS = [];
+const ROW_HEIGHT = {row_height};
+const LATENCY_MS = {latency_ms};
+const LOGOS = {logos};
+const scroller = document.getElementById('scroller');
+const spacer = document.getElementById('spacer');
+// Sin ventana fija se pintan las filas que entran en la pantalla (como el sitio real) más un margen
+const WINDOW = {window} || Math.ceil(scroller.clientHeight / ROW_HEIGHT) + 5;
+
+function cell(testid, text) {{
+  const div = document.createElement('div');
+  div.setAttribute('data-testid', testid);
+  div.textContent = text;
+  return div;
+}}
+
+function render() {{
+  const first = Math.floor(scroller.scrollTop / ROW_HEIGHT);
+  const last = Math.min(PLAYERS.length, first + WINDOW);
+  spacer.innerHTML = '';
+  for (let i = first; i < last; i++) {{
+    const p = PLAYERS[i];
+    const row = document.createElement('div');
+    row.setAttribute('data-testid', 'ownershipPlayerRow');
+    row.style.cssText = 'position:absolute;left:0;right:0;height:' + ROW_HEIGHT + 'px;top:' + (i * ROW_HEIGHT) + 'px;';
+    const team = document.createElement('div');
+    team.setAttribute('data-testid', 'ownershipPlayerTeam');
+    const img = document.createElement('img');
+    img.setAttribute('alt', p.team + ' logo');
+    if (LOGOS) img.src = '/logos/' + p.team + '.png';
+    team.appendChild(img);
+    row.appendChild(team);
+    row.appendChild(cell('ownershipPlayer', p.name));
+    row.appendChild(cell('ownershipPlayerDkPrice', '$' + p.dk.salary.toLocaleString('en-US')));
+    row.appendChild(cell('ownershipPlayerDkOwnership', p.dk.ownership + '%'));
+    row.appendChild(cell('ownershipPlayerFdPrice', '$' + p.fd.salary.toLocaleString('en-US')));
+    row.appendChild(cell('ownershipPlayerFdOwnership', p.fd.ownership + '%'));
+    spacer.appendChild(row);
+  }}
+}}
+
+// Simula el tiempo que tarda el sitio en pintar las filas tras cada scroll
+function scheduleRender() {{
+  if (LATENCY_MS > 0) {{
+    setTimeout(render, LATENCY_MS);
+  }} else {{
+    render();
+  }}
+}}
+
+function load(payload) {{
+  PLAYERS = payload.players;
+  spacer.style.height = (PLAYERS.length * ROW_HEIGHT) + 'px';
+  scroller.addEventListener('scroll', scheduleRender);
+  scheduleRender();
+}}
+
+{loader}
+</script>
+</body>
+</html>
+"""
+
+
+def build_payload(n_players, shift=0):
+    """Genera el payload JSON de jugadores sintéticos que consume la página (shift varía el ownership)"""
+    players = []
+    for i in range(n_players):
+        players.append({
+            'name': f"Player {i:04d}",
+            'team': TEAMS[i % len(TEAMS)],
+            'dk': {'salary': 3000 + (i * 37) % 8000, 'ownership': round(((i + shift) * 7.3) % 45, 1)},
+            'fd': {'salary': 3500 + (i * 53) % 9000, 'ownership': round(((i + shift) * 5.9) % 40, 1)}
+        })
+    return {'players': players}
+
+
+# Recursos que el sitio real descarga y el scraper no necesita: logos por equipo, fuente web,
+# imagen de cabecera y un script de analítica servido desde otro host (*.localhost resuelve a
+# 127.0.0.1 en Chrome). Tamaños aproximados de los del sitio.
+ASSET_SIZES = {'logo': 12 * 1024, 'font': 80 * 1024, 'banner': 250 * 1024, 'tracker': 60 * 1024}
+TRACKER_HOST = "tracker.localhost"
+PAGE_ASSETS = """<style>@font-face { font-family: Site; src: url('/fonts/site.woff2') format('woff2'); }
+body { font-family: Site, sans-serif; margin: 0; }</style>
+<img src="/banner.jpg" alt="" style="display: block; width: 100%; height: 80px;">
+<script>
+const tracker = document.createElement('script');
+tracker.src = 'http://""" + TRACKER_HOST + """:' + location.port + '/collect.js';
+document.head.appendChild(tracker);
+</script>"""
+
+
+def asset_bytes(size):
+    return bytes(range(256)) * (size // 256)
+
+
+SLATE_OPTION_TEMPLATE = '<a data-testid="ownershipSlateOption" href="?slate={slate}"{selected}>{label}</a>'
+
+
+def fixture_slate_options(slates, selected=None):
+    """Selector de slates de la página sintética: el por defecto ("main") y los indicados"""
+    options = [SLATE_OPTION_TEMPLATE.format(slate="main", label="Main",
+                                            selected=' aria-selected="true"' if selected is None else "")]
+    for slate in slates:
+        options.append(SLATE_OPTION_TEMPLATE.format(slate=slate, label=slate.title(),
+                                                    selected=' aria-selected="true"' if slate == selected else ""))
+    return "<nav>" + "".join(options) + "</nav>"
+
+
+def build_fixture_routes(sport="mlb", n_players=300, window=30, row_height=40, latency_ms=0, xhr=False,
+                         assets=False, slates=()):
+    """
+    Construye las rutas de la página sintética. Con xhr=True las filas se descargan de
+    /api/ownership; si no, van incrustadas en el HTML. window=0 hace que la lista ocupe la
+    pantalla y pinte las filas que entran en ella; assets=True agrega logos, fuente, cabecera
+    y rastreador de terceros. slates agrega el selector de slates y una página /?slate=X (con
+    ownership distinto) por cada uno.
+    """
+    routes = {}
+    for index, slate in enumerate((None,) + tuple(slates)):
+        payload = json.dumps(build_payload(n_players, shift=index))
+        if xhr:
+            loader = "fetch('/api/ownership' + location.search).then((r) => r.json()).then(load);"
+        else:
+            loader = f"load({payload});"
+        html = render_fixture_page(sport, loader, window, row_height, latency_ms, assets,
+                                   fixture_slate_options(slates, slate) if slates else "")
+        query = "" if slate is None else f"?slate={slate}"
+        routes[f'/{query}'] = ("text/html; charset=utf-8", html.encode("utf-8"))
+        if xhr:
+            routes[f'/api/ownership{query}'] = ("application/json", payload.encode("utf-8"))
+    if assets:
+        for team in TEAMS:
+            routes[f'/logos/{team}.png'] = ("image/png", asset_bytes(ASSET_SIZES['logo']))
+        routes['/fonts/site.woff2'] = ("font/woff2", asset_bytes(ASSET_SIZES['font']))
+        routes['/banner.jpg'] = ("image/jpeg", asset_bytes(ASSET_SIZES['banner']))
+        routes['/collect.js'] = ("application/javascript", b"/*" + b"x" * ASSET_SIZES['tracker'] + b"*/")
+    return routes
+
+
+def render_fixture_page(sport, loader, window, row_height, latency_ms, assets, slate_options):
+    return FIXTURE_TEMPLATE.format(
+        sport=sport,
+        page_assets=PAGE_ASSETS if assets else "",
+        slate_options=slate_options,
+        viewport=f"{row_height * (window // 2)}px" if window else "calc(100vh - 120px)",
+        loader=loader,
+        row_height=row_height,
+        window=window,
+        latency_ms=latency_ms,
+        logos="true" if assets else "false"
+    )
+
+
+STATIC_ROW_TEMPLATE = (
+    '<div data-testid="ownershipPlayerRow">'
+    '<div data-testid="ownershipPlayerTeam"><img alt="{team} logo"></div>'
+    '<div data-testid="ownershipPlayer">{name}</div>'
+    '<div data-testid="ownershipPlayerDkPrice">${dk_salary:,}</div>'
+    '<div data-testid="ownershipPlayerDkOwnership">{dk_ownership}%</div>'
+    '<div data-testid="ownershipPlayerFdPrice">${fd_salary:,}</div>'
+    '<div data-testid="ownershipPlayerFdOwnership">{fd_ownership}%</div>'
+    '</div>'
+)
+
+
+def build_source_fixtures(sport="mlb", n_players=300):
+    """
+    Variantes de la página para el backend HTTP: JSON en un script inline, JSON en un
+    <script type="application/json">, filas renderizadas en el servidor y filas solo por XHR.
+    """
+    payload = build_payload(n_players)
+    rows = "".join(
+        STATIC_ROW_TEMPLATE.format(
+            team=p['team'], name=p['name'], dk_salary=p['dk']['salary'], dk_ownership=p['dk']['ownership'],
+            fd_salary=p['fd']['salary'], fd_ownership=p['fd']['ownership']
+        )
+        for p in payload['players']
+    )
+    next_data = json.dumps({'props': {'pageProps': {'ownership': payload}}})
+    return {
+        'inline': build_fixture_routes(sport, n_players)['/'][1].decode("utf-8"),
+        'json_script': f'<html><body><script id="__NEXT_DATA__" type="application/json">{next_data}</script></body></html>',
+        'server_rendered': f'<html><body><div data-testid="ownershipTable{sport}"><div>{rows}</div></div></body></html>',
+        'xhr': build_fixture_routes(sport, n_players, xhr=True)['/'][1].decode("utf-8"),
+    }
+
+
+def check_sources(args):
+    """Verifica el backend HTTP contra las variantes de la página servidas localmente"""
+    n_players = args.players or 300
+    expected = comparable(build_scraped_records(n_players))
+    fixtures = build_source_fixtures(args.sport, n_players)
+    routes = {f'/{name}': ("text/html; charset=utf-8", html.encode("utf-8")) for name, html in fixtures.items()}
+    server, url = serve_fixture(routes)
+    failures = 0
+    try:
+        print(f"{'Variante':<16} {'Filas':>6} {'ms':>8}  Resultado")
+        for name in fixtures:
+            start = time.perf_counter()
+            records = scrape.fetch_records_http(args.sport, url=f"{url}{name}")
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            # Con XHR la página no trae los datos: el backend debe ceder el turno al navegador
+            ok = records is None if name == "xhr" else comparable(records or []) == expected
+            failures += not ok
+            print(f"{name:<16} {len(records or []):>6} {elapsed_ms:>8.1f}  {'OK' if ok else 'ERROR'}")
+    finally:
+        server.shutdown()
+
+    # Selector de slates: descubrimiento sin navegador y una página distinta por slate
+    slates = ("early", "late")
+    server, url = serve_fixture(build_fixture_routes(args.sport, n_players, slates=slates))
+    try:
+        start = time.perf_counter()
+        found = scrape.discover_slates(args.sport, url=url)
+        pages = [scrape.fetch_records_http(args.sport, url=config.slate_url(url, slate)) for slate in found]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        ok = (list(found) == [None, *slates] and all(len(records or []) == n_players for records in pages)
+              and len({json.dumps(records) for records in pages}) == len(pages))
+        failures += not ok
+        print(f"{'slates':<16} {sum(len(records or []) for records in pages):>6} {elapsed_ms:>8.1f}  "
+              f"{'OK' if ok else 'ERROR'}")
+    finally:
+        server.shutdown()
+    return 1 if failures else 0
+
+
+def serve_fixture(routes, traffic=None, api_delay_ms=0):
+    """
+    Sirve las rutas en un puerto libre de localhost. Devuelve (servidor, url). Si se pasa traffic,
+    acumula en él las peticiones atendidas ('requests') y los bytes servidos ('bytes').
+    api_delay_ms simula el tiempo de respuesta del backend del sitio en las rutas /api/.
+    """
+    lock = threading.Lock()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in routes:
+                self.send_error(404)
+                return
+            if api_delay_ms and self.path.startswith('/api/'):
+                time.sleep(api_delay_ms / 1000)
+            content_type, body = routes[self.path]
+            if traffic is not None:
+                with lock:
+                    traffic['requests'] += 1
+                    traffic['bytes'] += len(body)
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def count_round_trips(driver, counter=None):
+    """
+    Envuelve driver.execute para contar cada comando enviado a chromedriver ('calls')
+    y cuántos de ellos son scrolls de la lista ('scrolls').
+    """
+    counter = counter if counter is not None else {'calls': 0, 'scrolls': 0}
+    original_execute = driver.execute
+
+    @functools.wraps(original_execute)
+    def counting_execute(driver_command, params=None):
+        counter['calls'] += 1
+        if params and params.get('script') == browser.SCROLL_TO_JS:
+            counter['scrolls'] += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return counter
+
+
+def create_pool(counter):
+    """Pool de una sola sesión, instrumentada para contar las llamadas a chromedriver"""
+    pool = browser.BrowserPool(size=1, on_launch=lambda driver: count_round_trips(driver, counter))
+    pool.warm(1)
+    return pool
+
+
+@contextlib.contextmanager
+def track_peak_rss(driver, interval=0.05):
+    """Muestrea la memoria residente de chromedriver y sus procesos de Chrome; deja el pico en ['peak_mb']"""
+    result = {'peak_mb': None}
+    stop = threading.Event()
+    pid = driver.service.process.pid
+
+    def sample():
+        while True:
+            rss = browser.process_tree_rss_mb(pid)
+            if rss is not None:
+                result['peak_mb'] = max(result['peak_mb'] or 0, rss)
+            if stop.wait(interval):
+                break
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield result
+    finally:
+        stop.set()
+        sampler.join()
+
+
+def benchmark_profiles(args):
+    """
+    Perfil lean contra full sobre la página sintética con logos, fuente, cabecera y rastreador:
+    bytes y peticiones servidos, tiempo hasta la primera fila, scrape completo y pico de RSS
+    """
+    routes = build_fixture_routes(args.sport, args.players or 600, window=0, latency_ms=args.latency_ms,
+                                  assets=True)
+    traffic = {'requests': 0, 'bytes': 0}
+    server, url = serve_fixture(routes, traffic)
+    results = {}
+    try:
+        for profile in config.BROWSER_PROFILES:
+            drivers = []
+            counter = {'calls': 0, 'scrolls': 0}
+
+            def on_launch(driver):
+                drivers.append(driver)
+                count_round_trips(driver, counter)
+
+            # El rastreador de la página sintética entra en la lista de hosts bloqueados del perfil lean
+            pool = browser.BrowserPool(size=1, profile=profile, on_launch=on_launch,
+                                       blocked_hosts=config.BROWSER_BLOCKED_HOSTS + (TRACKER_HOST,))
+            try:
+                pool.warm(1)
+                traffic.update(requests=0, bytes=0)
+                with tempfile.TemporaryDirectory() as output_root, track_peak_rss(drivers[0]) as rss:
+                    with pool.borrow() as driver:
+                        start = time.perf_counter()
+                        driver.get(url)
+                        WebDriverWait(driver, 20).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, parsing.ROW_SELECTOR))
+                        )
+                        ready_s = time.perf_counter() - start
+                        page_traffic = dict(traffic)
+                    counter.update(calls=0, scrolls=0)
+                    start = time.perf_counter()
+                    df = scrape.run_ownership_scrape(
+                        args.sport, ingestion_mode="dom", url=url, pool=pool, source="browser",
+                        snapshot_root=os.path.join(output_root, "snapshots"),
+                        trace_root=os.path.join(output_root, "traces"),
+                        checkpoint_root=os.path.join(output_root, "checkpoints")
+                    )
+                    wall_s = time.perf_counter() - start
+            finally:
+                pool.close()
+            results[profile] = {
+                'page_kb': page_traffic['bytes'] / 1024,
+                'page_requests': page_traffic['requests'],
+                'total_kb': traffic['bytes'] / 1024,
+                'ready_ms': ready_s * 1000,
+                'wall_s': wall_s,
+                'scrolls': counter['scrolls'],
+                'rows': 0 if df is None else len(df),
+                'peak_rss_mb': rss['peak_mb'],
+            }
+    finally:
+        server.shutdown()
+
+    print(f"{'Perfil':<6} {'Carga KB':>9} {'Pet.':>5} {'Total KB':>9} {'Lista ms':>9} {'Scrape s':>9} "
+          f"{'Scrolls':>8} {'Filas':>6} {'RSS pico MB':>12}")
+    for profile, metrics in results.items():
+        peak = f"{metrics['peak_rss_mb']:.0f}" if metrics['peak_rss_mb'] else "-"
+        print(f"{profile:<6} {metrics['page_kb']:>9.0f} {metrics['page_requests']:>5} {metrics['total_kb']:>9.0f} "
+              f"{metrics['ready_ms']:>9.0f} {metrics['wall_s']:>9.2f} {metrics['scrolls']:>8} {metrics['rows']:>6} "
+              f"{peak:>12}")
+    if len({metrics['rows'] for metrics in results.values()}) > 1:
+        print("ERROR: los perfiles leyeron cantidades distintas de filas")
+        return 1
+    return 0
+
+
+def benchmark_slates(args):
+    """
+    Todos los slates de la página sintética (con el backend demorado api_delay_ms) leídos uno tras
+    otro en una sesión contra scrape_slates, que los carga a la vez en pestañas de la misma sesión
+    """
+    slates = tuple(f"slate{index}" for index in range(1, args.slates))
+    routes = build_fixture_routes(args.sport, args.players or 300, window=0, latency_ms=args.latency_ms,
+                                  xhr=True, slates=slates)
+    server, url = serve_fixture(routes, api_delay_ms=args.api_delay_ms)
+    pool = browser.BrowserPool(size=1)
+    results = {}
+    try:
+        pool.warm(1)
+        with tempfile.TemporaryDirectory() as output_root:
+            def roots(mode):
+                return {name: os.path.join(output_root, mode, name)
+                        for name in ("snapshot_root", "trace_root", "checkpoint_root")}
+
+            start = time.perf_counter()
+            frames = [
+                scrape.run_ownership_scrape(args.sport, url=url, slate=slate, pool=pool, source="browser",
+                                            ingestion_mode=args.ingestion, **roots("sequential"))
+                for slate in (None,) + slates
+            ]
+            results['secuencial'] = (time.perf_counter() - start, frames)
+
+            start = time.perf_counter()
+            scraped = scrape.scrape_slates(args.sport, url=url, pool=pool, ingestion_mode=args.ingestion,
+                                           **roots("tabs"))
+            results['pestañas'] = (time.perf_counter() - start, [result['data'] for result in scraped.values()])
+    finally:
+        pool.close()
+        server.shutdown()
+
+    print(f"{'Modo':<10} {'Slates':>7} {'Filas':>7} {'Segundos':>9}")
+    for mode, (seconds, frames) in results.items():
+        done = [df for df in frames if df is not None]
+        print(f"{mode:<10} {len(done):>7} {sum(len(df) for df in done):>7} {seconds:>9.2f}")
+    if len(results['pestañas'][1]) != len(slates) + 1 or any(df is None for _, frames in results.values() for df in frames):
+        print("ERROR: no se leyeron todos los slates")
+        return 1
+    return 0
+
+
+def run_scenario(pool, counter, sport, scenario, output_root):
+    """Ejecuta un scrape completo contra la página sintética y devuelve sus métricas"""
+    routes = build_fixture_routes(
+        sport, scenario['players'], scenario['window'], latency_ms=scenario['latency_ms'],
+        xhr=scenario['ingestion'] == "network"
+    )
+    server, url = serve_fixture(routes)
+    try:
+        counter.update(calls=0, scrolls=0)
+        start = time.perf_counter()
+        df = scrape.run_ownership_scrape(
+            sport, ingestion_mode=scenario['ingestion'], url=url, pool=pool, source=scenario['source'],
+            snapshot_root=os.path.join(output_root, "snapshots"), trace_root=os.path.join(output_root, "traces"),
+            checkpoint_root=os.path.join(output_root, "checkpoints")
+        )
+        wall_s = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    rows = 0 if df is None else len(df)
+    return {
+        'wall_s': round(wall_s, 3),
+        'round_trips': counter['calls'],
+        'scrolls': counter['scrolls'],
+        'rows': rows,
+        'complete': df is not None and df.attrs['completeness']['complete'],
+        'rows_per_s': round(rows / wall_s, 1) if wall_s else 0.0,
+    }
+
+
+def find_regressions(name, scenario, metrics, baseline):
+    """Compara las métricas de un escenario con el baseline. Devuelve los mensajes de regresión"""
+    problems = []
+    if metrics['rows'] != scenario['players']:
+        problems.append(f"{name}: se extrajeron {metrics['rows']} de {scenario['players']} jugadores")
+    elif not metrics['complete']:
+        problems.append(f"{name}: el scrape no pasó la verificación de completitud")
+    if baseline is None:
+        return problems
+    for metric, tolerance in TOLERANCES.items():
+        limit = baseline[metric] * tolerance
+        if metric == 'wall_s':
+            limit += WALL_TIME_SLACK_S
+        if metrics[metric] > limit:
+            problems.append(f"{name}: {metric} = {metrics[metric]} supera el baseline {baseline[metric]} (límite {limit:.2f})")
+    return problems
+
+
+def load_baseline(path):
+    """Baseline guardado por escenario; {} si el archivo no existe"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def run_suite(args):
+    """Ejecuta los escenarios pedidos, imprime la tabla de resultados y verifica el baseline"""
+    if args.players:
+        scenarios = {"custom": {
+            'players': args.players, 'window': args.window,
+            'latency_ms': args.latency_ms, 'ingestion': args.ingestion, 'source': args.source
+        }}
+    else:
+        scenarios = {name: SCENARIOS[name] for name in (args.scenario or SCENARIOS)}
+
+    baseline = load_baseline(args.baseline)
+    counter = {'calls': 0, 'scrolls': 0}
+    pool = create_pool(counter)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as output_root:
+            for name, scenario in scenarios.items():
+                results[name] = run_scenario(pool, counter, args.sport, scenario, output_root)
+    finally:
+        pool.close()
+
+    print(f"{'Escenario':<10} {'Filas':>6} {'Segundos':>9} {'Llamadas':>9} {'Scrolls':>8} {'Filas/s':>8}")
+    for name, metrics in results.items():
+        print(f"{name:<10} {metrics['rows']:>6} {metrics['wall_s']:>9.2f} {metrics['round_trips']:>9} "
+              f"{metrics['scrolls']:>8} {metrics['rows_per_s']:>8.1f}")
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline actualizado en {args.baseline}")
+        return 0
+
+    # Sin baseline solo se verifican las filas y la completitud: el tiempo, las llamadas y los
+    # scrolls no tienen contra qué compararse, y se avisa en lugar de darlos por buenos
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print(f"AVISO: sin baseline para {', '.join(missing)} en {args.baseline}: solo se verificaron "
+              f"filas y completitud. Guardarlo con --update-baseline en la máquina de referencia.")
+    problems = []
+    for name, metrics in results.items():
+        problems.extend(find_regressions(name, scenarios[name], metrics, baseline.get(name)))
+    for problem in problems:
+        print(f"REGRESIÓN: {problem}")
+    return 1 if problems else 0
+
+
+def run_extraction(driver, url, sport, extraction_mode, scroll_increment=300):
+    """Recorre la lista completa con el modo indicado y devuelve (registros, llamadas, segundos)"""
+    driver.get(url)
+    WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, parsing.ROW_SELECTOR)))
+    container = driver.find_element(By.CSS_SELECTOR, f"div[data-testid='ownershipTable{sport}']")
+    scroll_container = container.find_element(By.XPATH, './div')
+    scroll_height = driver.execute_script("return arguments[0].scrollHeight", scroll_container)
+
+    browser.install_row_observer(driver, scroll_container)
+
+    counter = count_round_trips(driver)
+    processed_players = set()
+    records = []
+    position = 0
+    start = time.perf_counter()
+    while True:
+        browser.scroll_and_wait(driver, scroll_container, position)
+        new_rows, _, _ = browser.extract_new_rows(driver, processed_players, extraction_mode)
+        records.extend(new_rows)
+        if position >= scroll_height:
+            break
+        position += scroll_increment
+    elapsed = time.perf_counter() - start
+    del driver.execute
+    return records, counter['calls'], elapsed
+
+
+def run_network_ingestion(driver, url, sport):
+    """Carga la página y lee las filas de su payload de red. Devuelve (registros, llamadas, segundos)"""
+    counter = count_round_trips(driver)
+    start = time.perf_counter()
+    records = browser.collect_ownership_rows(driver, sport, ingestion_mode="network", url=url)
+    elapsed = time.perf_counter() - start
+    del driver.execute
+    return records, counter['calls'], elapsed
+
+
+def comparable(records):
+    """Registros con el ownership como número, para comparar fuentes que lo formatean distinto"""
+    return [
+        {**record,
+         'DK Ownership': float(record['DK Ownership'].rstrip('%')),
+         'FD Ownership': float(record['FD Ownership'].rstrip('%'))}
+        for record in records
+    ]
+
+
+def compare_modes(args):
+    """Compara legacy, bulk y (con --xhr) network sobre la misma página sintética"""
+    routes = build_fixture_routes(args.sport, args.players or 300, args.window,
+                                  latency_ms=args.latency_ms, xhr=args.xhr)
+    server, url = serve_fixture(routes)
+    pool = browser.BrowserPool(size=1)
+    try:
+        with pool.borrow() as driver:
+            results = {}
+            for mode in ("legacy", "bulk"):
+                results[mode] = run_extraction(driver, url, args.sport, mode)
+            if args.xhr:
+                results["network"] = run_network_ingestion(driver, url, args.sport)
+    finally:
+        pool.close()
+        server.shutdown()
+
+    print(f"{'Modo':<8} {'Filas':>6} {'Llamadas':>9} {'Segundos':>9}")
+    for mode, (records, calls, elapsed) in results.items():
+        print(f"{mode:<8} {len(records):>6} {calls:>9} {elapsed:>9.2f}")
+
+    legacy_records, legacy_calls, legacy_time = results["legacy"]
+    bulk_records, bulk_calls, bulk_time = results["bulk"]
+    if legacy_records != bulk_records:
+        print("ERROR: los modos de extracción produjeron registros distintos")
+        return 1
+    if args.xhr and comparable(results["network"][0]) != comparable(bulk_records):
+        print("ERROR: la ingesta por red no coincide con la extracción del DOM")
+        return 1
+    print(f"Reducción de llamadas: {legacy_calls / max(bulk_calls, 1):.1f}x, "
+          f"tiempo: {legacy_time / max(bulk_time, 1e-9):.1f}x")
+    return 0
+
+
+def build_scraped_records(n_players):
+    """Registros con el formato de texto que entrega el scraper ("$5,400", "12.5%")"""
+    return [
+        {'Team': player['team'],
+         'Player': player['name'],
+         'DK Price': parsing.format_payload_price(player['dk']['salary']),
+         'DK Ownership': parsing.format_payload_ownership(player['dk']['ownership']),
+         'FD Price': parsing.format_payload_price(player['fd']['salary']),
+         'FD Ownership': parsing.format_payload_ownership(player['fd']['ownership'])}
+        for player in build_payload(n_players)['players']
+    ]
+
+
+def legacy_ownership_frame(records):
+    """Conversión anterior al esquema tipado: todo texto salvo el ownership en float64"""
+    df = pd.DataFrame(records)
+    df['DK Ownership'] = df['DK Ownership'].str.replace('%', '').astype(float)
+    df['FD Ownership'] = df['FD Ownership'].str.replace('%', '').astype(float)
+    return df
+
+
+def frame_workload(df):
+    """Operaciones típicas del dashboard sobre un frame de varios snapshots"""
+    df.sort_values('DK Ownership', ascending=False)
+    df[df['Team'] == TEAMS[0]]
+    df.groupby('Player', observed=True)['DK Ownership'].mean()
+    df.nlargest(10, 'FD Ownership')
+
+
+def time_best(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_frames(args):
+    """Compara memoria y tiempo del frame de texto anterior frente al esquema tipado"""
+    records = build_scraped_records(args.players or 5000)
+    snapshots = args.snapshots
+
+    results = {}
+    for name, convert in (("texto", legacy_ownership_frame), ("tipado", schema.build_ownership_frame)):
+        parse_time = time_best(lambda: convert(records))
+        frame = pd.concat([convert(records) for _ in range(snapshots)], ignore_index=True)
+        if name == "tipado":
+            # concat puede perder las categorías; el almacén normaliza después de concatenar
+            frame = schema.validate_ownership_frame(schema.normalize_ownership_frame(frame))
+        results[name] = {
+            'parse_s': parse_time,
+            'memory_mb': frame.memory_usage(deep=True).sum() / 1024 ** 2,
+            'workload_s': time_best(lambda: frame_workload(frame)),
+            'rows': len(frame),
+        }
+
+    print(f"{'Esquema':<8} {'Filas':>9} {'Parseo s':>9} {'Memoria MB':>11} {'Consultas s':>12}")
+    for name, metrics in results.items():
+        print(f"{name:<8} {metrics['rows']:>9} {metrics['parse_s']:>9.4f} "
+              f"{metrics['memory_mb']:>11.1f} {metrics['workload_s']:>12.4f}")
+    legacy, typed = results["texto"], results["tipado"]
+    print(f"Memoria: {legacy['memory_mb'] / max(typed['memory_mb'], 1e-9):.1f}x menos, "
+          f"consultas: {legacy['workload_s'] / max(typed['workload_s'], 1e-9):.1f}x más rápidas")
+    return 0
+
+
+# Un día de snapshots cada 5 minutos; la serie recibe dos días para ejercitar el downsampling
+TIMESERIES_DAY_SNAPSHOTS = 288
+
+
+def benchmark_timeseries(args):
+    """Ingesta y consultas interactivas de la serie temporal con un buffer lleno y downsampling"""
+    import numpy as np
+
+    base = schema.build_ownership_frame(build_scraped_records(args.players or 600))
+    rng = np.random.default_rng(0)
+    dk = base['DK Ownership'].to_numpy(dtype='float32')
+    fd = base['FD Ownership'].to_numpy(dtype='float32')
+    start = pd.Timestamp('2026-01-01 10:00')
+    snapshots = []
+    for i in range(TIMESERIES_DAY_SNAPSHOTS * 2):
+        dk = np.clip(dk + rng.normal(0, 0.3, len(dk)).astype('float32'), 0, None)
+        fd = np.clip(fd + rng.normal(0, 0.3, len(fd)).astype('float32'), 0, None)
+        snapshots.append((start + pd.Timedelta(minutes=5 * i), base.assign(**{'DK Ownership': dk, 'FD Ownership': fd})))
+
+    series = timeseries.OwnershipSeries(args.sport)
+    ingest_start = time.perf_counter()
+    for captured_at, snapshot in snapshots:
+        series.ingest(snapshot, captured_at)
+    ingest_s = (time.perf_counter() - ingest_start) / len(snapshots)
+
+    since = series.times[-1] - pd.Timedelta(hours=1)
+    queries = {
+        'deltas': lambda: series.deltas('Combined Ownership', since),
+        'movers': lambda: series.movers('DK Ownership', since, 10, 'up'),
+        'rolling_rate': lambda: series.rolling_rate('FD Ownership'),
+        'history': lambda: series.history(base['Player'][:10], 'DK Ownership'),
+    }
+    memory_mb = sum(values.nbytes for values in series._values.values()) / 1024 ** 2
+
+    print(f"{len(snapshots)} snapshots de {len(base)} jugadores -> {len(series)} puntos "
+          f"({series.times[0]:%d %H:%M} a {series.times[-1]:%d %H:%M}), {memory_mb:.1f} MB")
+    print(f"Ingesta: {ingest_s * 1000:.3f} ms por snapshot")
+    for name, query in queries.items():
+        print(f"{name:<13} {time_best(query) * 1000:>8.2f} ms")
+    return 0
+
+
+# Posiciones sintéticas por deporte para que los slots de las reglas del sitio se ejerciten
+LINEUP_POSITIONS = {
+    'mlb': ['SP', 'SP', 'C', '1B', '2B', '3B', 'SS', 'OF', 'OF', 'OF', '1B/OF', '2B/SS'],
+    'nba': ['PG', 'SG', 'SF', 'PF', 'C', 'PG/SG', 'SF/PF', 'PF/C'],
+}
+
+
+def build_lineup_frame(sport, n_players):
+    """Frame scrapeado sintético con posiciones y proyecciones aleatorias"""
+    import numpy as np
+
+    base = schema.build_ownership_frame(build_scraped_records(n_players))
+    rng = np.random.default_rng(0)
+    return base.assign(
+        Position=rng.choice(LINEUP_POSITIONS[sport], len(base)),
+        **{'DK Projection': rng.gamma(4, 2.5, len(base)).astype('float32'),
+           'FD Projection': rng.gamma(4, 2.5, len(base)).astype('float32')},
+    )
+
+
+def benchmark_lineups(args):
+    """Candidatos y lineups por segundo del generador, en este proceso y repartidos en el pool"""
+    df = build_lineup_frame(args.sport, args.players or 300)
+    print(f"{len(df)} jugadores, {args.candidates} candidatos, techo de ownership {args.ceiling}")
+    print(f"{'Sitio':<6} {'Procesos':>8} {'Segundos':>9} {'Candidatos/s':>13} {'Válidos':>9} {'Lineups/s':>10}")
+    for site in lineups.LINEUP_SITES:
+        for workers in sorted({1, lineups.LINEUP_WORKERS}):
+            if workers > 1:
+                # Arranque del pool fuera de la medición (en el dashboard el pool queda vivo)
+                lineups.generate_lineups(df, args.sport, site, n_lineups=10, candidates=workers * 1000,
+                                         batch_size=1000, workers=workers)
+            result = lineups.generate_lineups(df, args.sport, site, n_lineups=args.n_lineups,
+                                              ownership_ceiling=args.ceiling, candidates=args.candidates,
+                                              workers=workers, seed=0)
+            stats = result.attrs['stats']
+            print(f"{site:<6} {workers:>8} {stats['seconds']:>9.2f} {stats['candidates'] / stats['seconds']:>13,.0f} "
+                  f"{stats['valid']:>9} {stats['lineups'] / stats['seconds']:>10,.0f}")
+    return 0
+
+
+def benchmark_field(args):
+    """
+    Field Monte Carlo de field_size entradas en este proceso y en el pool: tiempo, lineups por
+    segundo, pico de memoria de Python (tracemalloc) y error de exposición contra el ownership
+    """
+    import tracemalloc
+
+    df = build_lineup_frame(args.sport, args.players or 300)
+    # Precios escalados al tope del sitio: el field sintético tiene que caber como un field real
+    for site, prefix in lineups.LINEUP_SITES.items():
+        rules = lineups.lineup_rules(args.sport, site)
+        price = df[f'{prefix} Price'].astype('float64')
+        df[f'{prefix} Price'] = (price / price.mean() * 0.95 * rules['salary_cap'] / len(rules['slots'])).round(-2)
+    mine = lineups.generate_lineups(df, args.sport, "dk", n_lineups=150, workers=1, seed=0)
+    print(f"{len(df)} jugadores, field de {args.field_size} entradas x {args.fields}")
+    print(f"{'Sitio':<6} {'Procesos':>8} {'Segundos':>9} {'Lineups/s':>10} {'Válidos':>8} {'Pico MB':>8} "
+          f"{'Error exp.':>10} {'Duplicadas':>10}")
+    for site in lineups.LINEUP_SITES:
+        for workers in sorted({1, lineups.LINEUP_WORKERS}):
+            if workers > 1:
+                lineups.get_lineup_executor(workers).submit(int).result()
+            tracemalloc.start()
+            result = field.simulate_field(df, args.sport, site, field_size=args.field_size, n_fields=args.fields,
+                                          lineups=mine if site == "dk" else None, workers=workers, seed=0)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+            stats = result['stats']
+            print(f"{site:<6} {workers:>8} {stats['seconds']:>9.2f} {stats['simulated'] / stats['seconds']:>10,.0f} "
+                  f"{100 * stats['simulated'] / stats['candidates']:>7.1f}% {peak_mb:>8.1f} "
+                  f"{stats['exposure_error']:>10.2f} {stats['duplicated_entries']:>9.2f}%")
+    return 0
+
+
+# Arranque en frío de los puntos de entrada por lotes: tiempo de importación en un intérprete
+# nuevo y módulos pesados que no deben cargarse. El stack del dashboard se mide como referencia.
+IMPORT_TIME_BUDGET_S = 0.25
+DASHBOARD_MODULES = ("streamlit", "selenium", "plotly")
+IMPORT_TARGETS = {
+    "cli": ("import ownership.cli; ownership.cli.build_parser()", IMPORT_TIME_BUDGET_S,
+            DASHBOARD_MODULES + ("pandas", "pyarrow")),
+    "scrape": ("import ownership.scrape", None, DASHBOARD_MODULES),
+    "dashboard": ("import streamlit, selenium.webdriver, plotly.express, pandas, pyarrow.parquet", None, ()),
+}
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': sorted(m for m in {modules!r} if m in sys.modules)}}))
+"""
+
+
+def measure_import(statement, modules, repeat=3):
+    """Mejor tiempo de importación en intérpretes nuevos y módulos prohibidos que quedaron cargados"""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE.format(statement=statement, modules=modules)],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if result.returncode != 0:
+            return None
+        measurement = json.loads(result.stdout)
+        if best is None or measurement['seconds'] < best['seconds']:
+            best = measurement
+    return best
+
+
+def check_import_time(args):
+    """Verifica el presupuesto de importación de la CLI y que no cargue el stack del dashboard"""
+    problems = []
+    print(f"{'Entrada':<10} {'Segundos':>9} {'Límite':>7}  Módulos pesados cargados")
+    for name, (statement, budget, forbidden) in IMPORT_TARGETS.items():
+        measurement = measure_import(statement, forbidden)
+        if measurement is None:
+            print(f"{name:<10} {'-':>9} {'-':>7}  (no disponible en este entorno)")
+            continue
+        limit = f"{budget:.2f}" if budget else "-"
+        print(f"{name:<10} {measurement['seconds']:>9.3f} {limit:>7}  {', '.join(measurement['loaded']) or '-'}")
+        if budget and measurement['seconds'] > budget:
+            problems.append(f"{name}: {measurement['seconds']:.3f} s supera el presupuesto de {budget:.2f} s")
+        if measurement['loaded']:
+            problems.append(f"{name}: importa {', '.join(measurement['loaded'])}")
+    for problem in problems:
+        print(f"REGRESIÓN: {problem}")
+    return 1 if problems else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sport", default="mlb")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Escenario a ejecutar (repetible). Por defecto, todos")
+    parser.add_argument("--players", type=int, help="Escenario personalizado: cantidad de jugadores")
+    parser.add_argument("--window", type=int, default=30, help="Filas renderizadas a la vez")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Latencia de render tras cada scroll")
+    parser.add_argument("--ingestion", choices=browser.INGESTION_MODES, default="dom")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Guardar los resultados como baseline")
+    parser.add_argument("--compare-modes", action="store_true",
+                        help="Comparar los modos de extracción en lugar de ejecutar la suite")
+    parser.add_argument("--xhr", action="store_true", help="Con --compare-modes: servir las filas por XHR")
+    parser.add_argument("--source", choices=scrape.SOURCE_MODES, default="browser",
+                        help="Backend de origen del escenario personalizado")
+    parser.add_argument("--check-sources", action="store_true",
+                        help="Verificar el backend HTTP contra páginas locales (sin navegador)")
+    parser.add_argument("--import-time", action="store_true",
+                        help="Verificar el presupuesto de importación en frío de la CLI")
+    parser.add_argument("--frames", action="store_true",
+                        help="Medir memoria y tiempo del esquema tipado (sin navegador)")
+    parser.add_argument("--snapshots", type=int, default=48, help="Con --frames: snapshots a concatenar")
+    parser.add_argument("--timeseries", action="store_true",
+                        help="Medir ingesta, memoria y consultas de la serie temporal (sin navegador)")
+    parser.add_argument("--lineups", action="store_true",
+                        help="Medir lineups generados por segundo con y sin el pool de procesos (sin navegador)")
+    parser.add_argument("--candidates", type=int, default=lineups.LINEUP_CANDIDATES,
+                        help="Con --lineups: candidatos a muestrear")
+    parser.add_argument("--n-lineups", type=int, default=1000, help="Con --lineups: lineups a seleccionar")
+    parser.add_argument("--ceiling", type=float, default=150, help="Con --lineups: techo de ownership")
+    parser.add_argument("--profiles", action="store_true",
+                        help="Comparar el perfil de Chrome lean contra full (bytes, carga, RSS)")
+    parser.add_argument("--slates", type=int, default=0,
+                        help="Comparar N slates uno tras otro contra pestañas en paralelo de un mismo Chrome")
+    parser.add_argument("--api-delay-ms", type=int, default=1000,
+                        help="Con --slates: demora del backend de la página sintética")
+    parser.add_argument("--field", action="store_true",
+                        help="Medir el simulador Monte Carlo del field (sin navegador)")
+    parser.add_argument("--field-size", type=int, default=field.FIELD_SIZE, help="Con --field: entradas del concurso")
+    parser.add_argument("--fields", type=int, default=1, help="Con --field: fields a simular")
+    args = parser.parse_args()
+
+    if args.import_time:
+        return check_import_time(args)
+    if args.check_sources:
+        return check_sources(args)
+    if args.frames:
+        return benchmark_frames(args)
+    if args.timeseries:
+        return benchmark_timeseries(args)
+    if args.lineups:
+        return benchmark_lineups(args)
+    if args.field:
+        return benchmark_field(args)
+    if args.profiles:
+        return benchmark_profiles(args)
+    if args.slates:
+        return benchmark_slates(args)
+    if args.compare_modes:
+        return compare_modes(args)
+    return run_suite(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
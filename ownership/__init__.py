@@ -0,0 +1,42 @@
+"""
+Biblioteca de scraping y análisis de ownership de Fantasy Sports, usable sin el dashboard.
+
+Los nombres de uso frecuente se exponen aquí pero sus módulos se importan recién al usarlos,
+así que `import ownership` no carga pandas, pyarrow ni Selenium.
+"""
+import importlib
+
+_EXPORTS = {
+    'SPORTS': 'ownership.config',
+    'ownership_url': 'ownership.config',
+    'run_ownership_scrape': 'ownership.scrape',
+    'scrape_all_sports': 'ownership.scrape',
+    'scrape_slates': 'ownership.scrape',
+    'discover_slates': 'ownership.scrape',
+    'coalesced_scrape': 'ownership.scrape',
+    'fetch_ownership_records': 'ownership.scrape',
+    'build_ownership_frame': 'ownership.schema',
+    'normalize_ownership_frame': 'ownership.schema',
+    'validate_ownership_frame': 'ownership.schema',
+    'save_snapshot': 'ownership.store',
+    'latest_snapshot': 'ownership.store',
+    'load_snapshots': 'ownership.store',
+    'player_history': 'ownership.store',
+    'export_frame': 'ownership.export',
+    'write_export': 'ownership.export',
+    'get_leaderboard': 'ownership.leaderboard',
+    'load_projections': 'ownership.projections',
+    'join_projections': 'ownership.projections',
+    'generate_lineups': 'ownership.lineups',
+    'simulate_field': 'ownership.field',
+    'OwnershipSeries': 'ownership.timeseries',
+    'get_series': 'ownership.timeseries',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'ownership' has no attribute '{name}'")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
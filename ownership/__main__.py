@@ -0,0 +1,7 @@
+import sys
+
+from ownership.cli import main
+
+# Protegido: los procesos "spawn" del generador de lineups reimportan este módulo
+if __name__ == "__main__":
+    sys.exit(main())
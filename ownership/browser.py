@@ -0,0 +1,866 @@
+"""
+Scraping con Selenium: pool de navegadores Chrome, extracción de filas del DOM, esperas
+por mutaciones, captura del payload de red y recorrido de la lista virtualizada.
+"""
+import atexit
+import base64
+import contextlib
+import functools
+import json
+import os
+import signal
+import threading
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+from ownership.config import (
+    BROWSER_ALLOWED_HOSTS, BROWSER_BLOCKED_HOSTS, BROWSER_BLOCKED_URL_PATTERNS, BROWSER_BORROW_TIMEOUT,
+    BROWSER_MAX_RSS_MB, BROWSER_MAX_USES, BROWSER_PAGE_HEADER_PX, BROWSER_POOL_SIZE, BROWSER_PROFILE,
+    BROWSER_PROFILES, BROWSER_ROW_HEIGHT_PX, BROWSER_VIEWPORT_ROWS, BROWSER_WINDOW_WIDTH,
+    DEFAULT_SCROLL_WAIT_TIMEOUT, OWNERSHIP_SLATE_PARAM, ownership_url
+)
+from ownership.parsing import (
+    DK_OWNERSHIP_SELECTOR, DK_PRICE_SELECTOR, FD_OWNERSHIP_SELECTOR, FD_PRICE_SELECTOR, PLAYER_SELECTOR,
+    ROW_SELECTOR, SLATE_OPTION_SELECTOR, TEAM_SELECTOR, records_from_payload
+)
+from ownership.trace import ScrapeTrace, completeness_report
+
+# Función JS compartida que lee una fila del DOM como registro (los campos ausentes quedan en null)
+ROW_READER_JS = """
+const readRow = (row, sel) => {
+    const text = (css) => {
+        const el = row.querySelector(css);
+        return el ? (el.innerText || el.textContent || '').trim() : null;
+    };
+    const img = row.querySelector(sel.team + ' img');
+    return {
+        'Team': img ? (img.getAttribute('alt') || '').replace(' logo', '') : null,
+        'Player': text(sel.player),
+        'DK Price': text(sel.dkPrice),
+        'DK Ownership': text(sel.dkOwnership),
+        'FD Price': text(sel.fdPrice),
+        'FD Ownership': text(sel.fdOwnership)
+    };
+};
+"""
+
+# Script que serializa todas las filas visibles en una sola llamada a execute_script.
+# Recibe la lista de jugadores ya procesados y devuelve solo las filas nuevas.
+EXTRACT_ROWS_JS = ROW_READER_JS + """
+const seen = new Set(arguments[0]);
+const sel = arguments[1];
+const rows = document.querySelectorAll(sel.row);
+const records = [];
+const errors = [];
+for (const row of rows) {
+    const record = readRow(row, sel);
+    const player = record['Player'];
+    if (player === null) {
+        errors.push({player: null, message: 'No se encontró el nombre del jugador en la fila'});
+        continue;
+    }
+    if (seen.has(player)) {
+        continue;
+    }
+    seen.add(player);
+    const missing = Object.keys(record).filter((k) => record[k] === null);
+    if (missing.length) {
+        errors.push({player: player, message: player + ': faltan campos ' + missing.join(', ')});
+        continue;
+    }
+    records.push(record);
+}
+return {records: records, errors: errors, total: rows.length};
+"""
+
+EXTRACT_SELECTORS = {
+    'row': ROW_SELECTOR,
+    'player': PLAYER_SELECTOR,
+    'team': TEAM_SELECTOR,
+    'dkPrice': DK_PRICE_SELECTOR,
+    'dkOwnership': DK_OWNERSHIP_SELECTOR,
+    'fdPrice': FD_PRICE_SELECTOR,
+    'fdOwnership': FD_OWNERSHIP_SELECTOR
+}
+
+EXTRACTION_MODES = ("bulk", "legacy")
+
+
+def extract_rows_bulk(driver, processed_players):
+    """
+    Extrae las filas nuevas con un único execute_script por scroll.
+    Devuelve (registros nuevos, errores, filas visibles) y actualiza processed_players.
+    """
+    result = driver.execute_script(EXTRACT_ROWS_JS, sorted(processed_players), EXTRACT_SELECTORS)
+    records = result['records']
+    for record in records:
+        processed_players.add(record['Player'])
+    # Las filas con errores también cuentan como procesadas, igual que en el modo legacy
+    errors = []
+    for error in result['errors']:
+        if error['player'] is not None:
+            processed_players.add(error['player'])
+        errors.append(error['message'])
+    return records, errors, result['total']
+
+
+def extract_rows_legacy(driver, processed_players):
+    """
+    Extrae las filas nuevas consultando cada celda por separado a través de WebDriver.
+    Devuelve (registros nuevos, errores, filas visibles) y actualiza processed_players.
+    """
+    player_rows = driver.find_elements(By.CSS_SELECTOR, ROW_SELECTOR)
+    records = []
+    errors = []
+
+    for row in player_rows:
+        try:
+            # Obtener nombre del jugador para identificación única
+            player_name = row.find_element(By.CSS_SELECTOR, PLAYER_SELECTOR).text
+
+            # Verificar si ya procesamos este jugador
+            player_key = player_name.strip()
+            if player_key in processed_players:
+                continue
+
+            # Marcar como procesado
+            processed_players.add(player_key)
+
+            # Obtener equipo
+            team_div = row.find_element(By.CSS_SELECTOR, TEAM_SELECTOR)
+            team_img = team_div.find_element(By.TAG_NAME, "img")
+            team = team_img.get_attribute("alt").replace(" logo", "")
+
+            # Obtener precios y ownership
+            dk_price = row.find_element(By.CSS_SELECTOR, DK_PRICE_SELECTOR).text
+            dk_ownership = row.find_element(By.CSS_SELECTOR, DK_OWNERSHIP_SELECTOR).text
+            fd_price = row.find_element(By.CSS_SELECTOR, FD_PRICE_SELECTOR).text
+            fd_ownership = row.find_element(By.CSS_SELECTOR, FD_OWNERSHIP_SELECTOR).text
+
+            records.append({
+                'Team': team,
+                'Player': player_key,
+                'DK Price': dk_price,
+                'DK Ownership': dk_ownership,
+                'FD Price': fd_price,
+                'FD Ownership': fd_ownership
+            })
+
+        except Exception as e:
+            errors.append(str(e))
+            continue
+
+    return records, errors, len(player_rows)
+
+
+def extract_new_rows(driver, processed_players, extraction_mode="bulk"):
+    """Despacha la extracción de filas según el modo configurado"""
+    if extraction_mode == "bulk":
+        return extract_rows_bulk(driver, processed_players)
+    if extraction_mode == "legacy":
+        return extract_rows_legacy(driver, processed_players)
+    raise ValueError(f"Modo de extracción desconocido: {extraction_mode}. Opciones: {EXTRACTION_MODES}")
+
+
+# Geometría de la lista virtualizada: posición, alto visible, alto total, alto de fila (mediana
+# de las filas renderizadas) y desplazamiento de la primera fila (encabezados sobre la lista)
+MEASURE_SCROLL_EXTENT_JS = """
+const container = arguments[0];
+const box = container.getBoundingClientRect();
+const heights = [];
+let offset = null;
+for (const row of container.querySelectorAll(arguments[1])) {
+    const rect = row.getBoundingClientRect();
+    if (rect.height > 0) {
+        heights.push(rect.height);
+        const top = rect.top - box.top + container.scrollTop;
+        offset = offset === null ? top : Math.min(offset, top);
+    }
+}
+heights.sort((a, b) => a - b);
+return {
+    top: container.scrollTop,
+    viewport: container.clientHeight,
+    extent: container.scrollHeight,
+    rowHeight: heights.length ? heights[Math.floor(heights.length / 2)] : 0,
+    rowsOffset: offset || 0
+};
+"""
+
+
+def measure_scroll_extent(driver, scroll_container):
+    """Mide la geometría del contenedor de scroll y de sus filas renderizadas"""
+    return driver.execute_script(MEASURE_SCROLL_EXTENT_JS, scroll_container, ROW_SELECTOR)
+
+
+def plan_scroll_step(geometry):
+    """Píxeles por scroll: exactamente las filas completas que entran en el alto visible"""
+    row_height = geometry['rowHeight']
+    if row_height <= 0:
+        return max(1, geometry['viewport'])
+    return max(1, int(geometry['viewport'] // row_height)) * row_height
+
+
+def expected_row_count(geometry):
+    """Filas que debería tener la lista según su alto total, o None si no hay filas para medir"""
+    if geometry['rowHeight'] <= 0:
+        return None
+    return max(0, round((geometry['extent'] - geometry['rowsOffset']) / geometry['rowHeight']))
+
+
+# Observador en la página: cuenta cada lote de mutaciones dentro del contenedor de scroll
+INSTALL_ROW_OBSERVER_JS = """
+const container = arguments[0];
+if (!container.__ownershipObserver) {
+    container.__ownershipMutations = 0;
+    container.__ownershipObserver = new MutationObserver(() => {
+        container.__ownershipMutations += 1;
+    });
+    container.__ownershipObserver.observe(container, {childList: true, subtree: true, characterData: true});
+}
+return container.__ownershipMutations;
+"""
+
+# Hace scroll a la posición indicada (o al final si es null) y devuelve el estado previo
+# junto con la geometría resultante.
+# Marca además cuándo se pintaron dos frames tras el scroll, para no confiar en el final
+# de la lista antes de que la página haya reaccionado al evento de scroll.
+SCROLL_TO_JS = """
+const container = arguments[0];
+const before = container.scrollTop;
+const mutations = container.__ownershipMutations || 0;
+container.__ownershipPainted = false;
+container.scrollTop = arguments[1] === null ? container.scrollHeight : arguments[1];
+requestAnimationFrame(() => requestAnimationFrame(() => { container.__ownershipPainted = true; }));
+return {
+    mutations: mutations,
+    moved: container.scrollTop !== before,
+    top: container.scrollTop,
+    viewport: container.clientHeight,
+    extent: container.scrollHeight
+};
+"""
+
+# La espera termina cuando aparecieron filas nuevas o el contenedor ya está en scrollHeight
+ROWS_SETTLED_JS = """
+const container = arguments[0];
+if ((container.__ownershipMutations || 0) > arguments[1]) {
+    return true;
+}
+const atBottom = container.scrollTop + container.clientHeight >= container.scrollHeight - 1;
+return atBottom && container.__ownershipPainted === true;
+"""
+
+WAIT_POLL_FREQUENCY = 0.05
+
+
+def install_row_observer(driver, scroll_container):
+    """Instala (una sola vez) el MutationObserver sobre el contenedor de filas"""
+    return driver.execute_script(INSTALL_ROW_OBSERVER_JS, scroll_container)
+
+
+def scroll_and_wait(driver, scroll_container, position=None, timeout=DEFAULT_SCROLL_WAIT_TIMEOUT):
+    """
+    Hace scroll hasta position (None = hasta el final) y espera a que el DOM reaccione.
+    Devuelve el estado del scroll: 'moved', 'top', 'viewport', 'extent' y 'new_rows' (False si
+    el scroll no se movió o venció el timeout sin filas nuevas).
+    """
+    state = driver.execute_script(SCROLL_TO_JS, scroll_container, position)
+    state['new_rows'] = False
+    if not state['moved']:
+        # Ya estábamos en el final de la lista: no hay nada que esperar
+        return state
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY).until(
+            lambda d: d.execute_script(ROWS_SETTLED_JS, scroll_container, state['mutations'])
+        )
+        state['new_rows'] = True
+    except TimeoutException:
+        pass
+    return state
+
+
+INGESTION_MODES = ("network", "dom")
+
+
+def drain_performance_log(driver):
+    """Descarta las entradas acumuladas del log de rendimiento de Chrome"""
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def capture_ownership_payload(driver, entries=None):
+    """
+    Revisa las respuestas de red capturadas por el log de rendimiento (DevTools) desde el último
+    drenaje y devuelve los registros del primer payload JSON que contenga la tabla de ownership.
+    entries: lista donde acumular las entradas leídas. El log es de toda la sesión, así que con
+    varias pestañas abiertas las entradas de todas se comparten y cada pestaña busca su payload
+    en la lista completa (los cuerpos de otra pestaña no se pueden leer desde esta y se saltan).
+    """
+    try:
+        new_entries = driver.get_log('performance')
+    except Exception:
+        if entries is None:
+            return None
+        new_entries = []
+    if entries is None:
+        entries = new_entries
+    else:
+        entries.extend(new_entries)
+
+    best = None
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        if message.get('method') != 'Network.responseReceived':
+            continue
+        params = message.get('params', {})
+        if 'json' not in params.get('response', {}).get('mimeType', ''):
+            continue
+        try:
+            response = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+            body = response['body']
+            if response.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            records = records_from_payload(json.loads(body))
+        except Exception:
+            continue
+        if records and (best is None or len(records) > len(best)):
+            best = records
+    return best
+
+
+@functools.lru_cache(maxsize=1)
+def resolve_driver_path():
+    """Resuelve (y descarga si hace falta) el chromedriver una sola vez por proceso"""
+    return ChromeDriverManager().install()
+
+
+def lean_window_size(rows=BROWSER_VIEWPORT_ROWS):
+    """Ancho y alto de la ventana para que entren rows filas de la lista por pantalla"""
+    return BROWSER_WINDOW_WIDTH, rows * BROWSER_ROW_HEIGHT_PX + BROWSER_PAGE_HEADER_PX
+
+
+def host_resolver_rules(allowed_hosts):
+    """Regla de Chrome que solo resuelve los hosts permitidos (y sus subdominios)"""
+    excluded = ", ".join(f"EXCLUDE {host}, EXCLUDE *.{host}" for host in allowed_hosts)
+    return f"MAP * ~NOTFOUND, {excluded}"
+
+
+def blocked_url_patterns(blocked_hosts=BROWSER_BLOCKED_HOSTS):
+    """Patrones de Network.setBlockedURLs: recursos por extensión y hosts de terceros"""
+    patterns = list(BROWSER_BLOCKED_URL_PATTERNS)
+    for host in blocked_hosts:
+        patterns += [f"*://{host}/*", f"*://*.{host}/*"]
+    return patterns
+
+
+def apply_request_blocking(driver, blocked_hosts=BROWSER_BLOCKED_HOSTS):
+    """
+    Bloquea vía DevTools las peticiones de imágenes, media, fuentes y hosts de terceros en la
+    pestaña actual (el bloqueo es por pestaña: cada pestaña nueva lo necesita de nuevo)
+    """
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns(blocked_hosts)})
+
+
+def build_chrome_options(profile=BROWSER_PROFILE, allowed_hosts=BROWSER_ALLOWED_HOSTS):
+    """Opciones de Chrome headless usadas por todas las sesiones del pool"""
+    if profile not in BROWSER_PROFILES:
+        raise ValueError(f"Perfil de navegador desconocido: {profile}. Opciones: {BROWSER_PROFILES}")
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Ejecutar sin interfaz gráfica
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if profile == "full":
+        chrome_options.add_argument("--start-maximized")
+    else:
+        # En headless --start-maximized no tiene efecto: la ventana se fija según las filas por pantalla
+        chrome_options.add_argument("--window-size={},{}".format(*lean_window_size()))
+        # Las imágenes ni se piden (los <img> y su alt siguen en el DOM)
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        for argument in ("--disable-extensions", "--disable-background-networking", "--disable-component-update",
+                         "--disable-default-apps", "--disable-sync", "--mute-audio", "--no-first-run",
+                         "--disable-features=Translate,MediaRouter,OptimizationHints"):
+            chrome_options.add_argument(argument)
+        if allowed_hosts:
+            chrome_options.add_argument(f"--host-resolver-rules={host_resolver_rules(allowed_hosts)}")
+    # Log de red vía DevTools para el modo de ingesta "network"
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return chrome_options
+
+
+def process_tree_pids(root_pid):
+    """Devuelve el pid indicado y todos sus descendientes leyendo /proc (solo Linux)"""
+    children = {}
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # El nombre del proceso puede contener espacios: el ppid va después del último ')'
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    except OSError:
+        return [root_pid]
+
+    pids = []
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pids.append(pid)
+        pending.extend(children.get(pid, []))
+    return pids
+
+
+def process_tree_rss_mb(root_pid):
+    """Memoria residente (MB) de chromedriver y sus procesos de Chrome. None si no se puede medir"""
+    total_kb = 0
+    for pid in process_tree_pids(root_pid):
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024 if total_kb else None
+
+
+class BrowserPool:
+    """
+    Pool de sesiones de Chrome headless reutilizables, compartido por todo el proceso.
+    Cada sesión se recicla tras max_uses scrapes, si supera max_rss_mb o si falla el chequeo de salud.
+    profile elige el perfil de Chrome (BROWSER_PROFILES); con "lean" cada sesión bloquea además las
+    peticiones a blocked_hosts y, si allowed_hosts no está vacío, solo resuelve esos hosts.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, max_rss_mb=BROWSER_MAX_RSS_MB,
+                 options_factory=None, on_launch=None, profile=BROWSER_PROFILE, blocked_hosts=BROWSER_BLOCKED_HOSTS,
+                 allowed_hosts=BROWSER_ALLOWED_HOSTS):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.profile = profile
+        self.blocked_hosts = blocked_hosts
+        self.options_factory = options_factory or functools.partial(build_chrome_options, profile, allowed_hosts)
+        # Callback opcional invocado con cada sesión nueva (instrumentación, benchmarks)
+        self.on_launch = on_launch
+        self.driver_path = resolve_driver_path()
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _launch(self):
+        """Lanza una nueva sesión de Chrome con el driver ya resuelto"""
+        service = Service(self.driver_path)
+        driver = webdriver.Chrome(service=service, options=self.options_factory())
+        self.prepare_tab(driver)
+        self._uses[id(driver)] = 0
+        if self.on_launch:
+            self.on_launch(driver)
+        return driver
+
+    def prepare_tab(self, driver):
+        """Configuración por pestaña del perfil (con "lean", el bloqueo de peticiones) en la pestaña actual"""
+        if self.profile == "lean":
+            apply_request_blocking(driver, self.blocked_hosts)
+
+    def _dispose(self, driver):
+        """Cierra la sesión y garantiza que no queden procesos de Chrome huérfanos"""
+        self._uses.pop(id(driver), None)
+        process = getattr(driver.service, 'process', None)
+        pids = process_tree_pids(process.pid) if process else []
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        # Matar los procesos de Chrome que sobrevivan a quit() (por ejemplo tras un crash)
+        for pid in pids:
+            try:
+                with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                    if b'chrom' not in f.read().lower():
+                        continue
+                os.kill(pid, signal.SIGKILL)
+            except (OSError, AttributeError):
+                pass
+
+    def _is_healthy(self, driver):
+        """Chequeo de salud: la sesión responde y no excede el límite de memoria"""
+        try:
+            driver.execute_script("return 1")
+        except Exception:
+            return False
+        process = getattr(driver.service, 'process', None)
+        if self.max_rss_mb and process:
+            rss = process_tree_rss_mb(process.pid)
+            if rss is not None and rss > self.max_rss_mb:
+                return False
+        return True
+
+    def _reset(self, driver):
+        """Deja la sesión limpia antes de devolverla al pool"""
+        driver.get("about:blank")
+        drain_performance_log(driver)
+
+    def warm(self, count=1):
+        """Lanza sesiones por adelantado para que el primer scrape no pague el arranque en frío"""
+        for _ in range(min(count, self.size)):
+            if not self._slots.acquire(blocking=False):
+                break
+            try:
+                driver = self._launch()
+                with self._lock:
+                    self._idle.append(driver)
+            finally:
+                self._slots.release()
+
+    @contextlib.contextmanager
+    def borrow(self, timeout=BROWSER_BORROW_TIMEOUT):
+        """Presta una sesión sana del pool; se devuelve (o se recicla) al salir del bloque"""
+        if self._closed:
+            raise RuntimeError("El pool de navegadores está cerrado")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No hay navegadores libres tras {timeout} segundos")
+
+        driver = None
+        try:
+            while driver is None:
+                with self._lock:
+                    candidate = self._idle.pop() if self._idle else None
+                if candidate is None:
+                    driver = self._launch()
+                elif self._is_healthy(candidate):
+                    driver = candidate
+                else:
+                    self._dispose(candidate)
+
+            failed = False
+            try:
+                yield driver
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+                keep = (not failed and not self._closed
+                        and self._uses[id(driver)] < self.max_uses
+                        and self._is_healthy(driver))
+                if keep:
+                    try:
+                        self._reset(driver)
+                    except Exception:
+                        keep = False
+                if keep:
+                    with self._lock:
+                        self._idle.append(driver)
+                else:
+                    self._dispose(driver)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Cierra todas las sesiones ociosas"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._dispose(driver)
+
+
+@functools.lru_cache(maxsize=None)
+def get_browser_pool(size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, max_rss_mb=BROWSER_MAX_RSS_MB,
+                     profile=BROWSER_PROFILE):
+    """Pool de navegadores único por proceso y configuración"""
+    pool = BrowserPool(size=size, max_uses=max_uses, max_rss_mb=max_rss_mb, profile=profile)
+    atexit.register(pool.close)
+    threading.Thread(target=pool.warm, daemon=True).start()
+    return pool
+
+
+# Opciones del selector de slates con el mismo contrato que SlateOptionParser
+DISCOVER_SLATES_JS = """
+const param = arguments[1];
+const slates = [];
+for (const el of document.querySelectorAll(arguments[0])) {
+    let slate = el.getAttribute('data-slate');
+    if (!slate && el.getAttribute('href')) {
+        slate = new URL(el.getAttribute('href'), location.href).searchParams.get(param);
+    }
+    slate = slate || el.getAttribute('value');
+    if (!slate) {
+        continue;
+    }
+    slates.push({
+        slate: slate,
+        label: (el.innerText || el.textContent || '').trim().split(/\\s+/).join(' '),
+        selected: el.getAttribute('aria-selected') === 'true' || el.selected === true
+    });
+}
+return slates;
+"""
+
+
+def page_slates(driver, sport, timeout=20):
+    """
+    Espera la tabla de la página abierta en la pestaña actual y devuelve las opciones de su
+    selector de slates ({'slate', 'label', 'selected'}; lista vacía si no tiene selector)
+    """
+    WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY).until(EC.presence_of_element_located(
+        (By.CSS_SELECTOR, f"div[data-testid='ownershipTable{sport}']")
+    ))
+    return driver.execute_script(DISCOVER_SLATES_JS, SLATE_OPTION_SELECTOR, OWNERSHIP_SLATE_PARAM)
+
+
+class BrowserTab:
+    """Una pestaña de SlateTabs: activate() la deja como pestaña actual del driver"""
+
+    def __init__(self, driver, handle, performance_entries):
+        self.driver = driver
+        self.handle = handle
+        self.performance_entries = performance_entries
+
+    def activate(self):
+        self.driver.switch_to.window(self.handle)
+        # Chrome frena los timers y no pinta frames en pestañas de fondo: se trae al frente
+        try:
+            self.driver.execute_cdp_cmd('Page.bringToFront', {})
+        except Exception:
+            pass
+        return self.driver
+
+
+class SlateTabs:
+    """
+    Una pestaña por slate en la misma sesión de Chrome, con todas las páginas cargándose a la vez.
+    WebDriver opera una pestaña por vez, así que lo que corre en paralelo es la carga (red, scripts
+    y primer render); la lectura de cada slate se hace después, al activar su pestaña.
+    urls: {slate: url}. prepare_tab se aplica a cada pestaña nueva antes de cargarla (el bloqueo
+    de peticiones de DevTools es por pestaña). loaded=True indica que la página del primer slate
+    de urls ya está abierta en la pestaña actual, que se reutiliza sin volver a cargarla.
+    Al salir se cierran las pestañas nuevas y queda activa la original.
+    """
+
+    def __init__(self, driver, urls, prepare_tab=None, loaded=False):
+        self.driver = driver
+        self.urls = dict(urls)
+        self.prepare_tab = prepare_tab
+        self.loaded = loaded
+        self.performance_entries = []
+        self.tabs = {}
+        self._original = None
+
+    def __enter__(self):
+        driver = self.driver
+        self._original = driver.current_window_handle
+        slates = list(self.urls)
+        pending = slates[1:] if self.loaded else slates
+        if slates:
+            # El primer slate usa la pestaña original (ya cargada o por cargar)
+            self.tabs[slates[0]] = BrowserTab(driver, self._original, self.performance_entries)
+        # Primero se abren todas las pestañas: chromedriver espera la carga pendiente de la pestaña
+        # actual antes de abrir otra, así que navegar entre aperturas serializaría las cargas
+        for slate in pending:
+            if slate not in self.tabs:
+                driver.switch_to.new_window('tab')
+                if self.prepare_tab:
+                    self.prepare_tab(driver)
+                self.tabs[slate] = BrowserTab(driver, driver.current_window_handle, self.performance_entries)
+        for slate in pending:
+            driver.switch_to.window(self.tabs[slate].handle)
+            # Navegación sin esperar la carga: las páginas cargan a la vez
+            driver.execute_script("window.location.assign(arguments[0])", self.urls[slate])
+        return self
+
+    def __getitem__(self, slate):
+        return self.tabs[slate]
+
+    def __exit__(self, *exc_info):
+        for slate, tab in self.tabs.items():
+            if tab.handle == self._original:
+                continue
+            try:
+                self.driver.switch_to.window(tab.handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.driver.switch_to.window(self._original)
+        return False
+
+
+def collect_ownership_rows(driver, sport, progress_bar=None, extraction_mode="bulk",
+                           scroll_wait_timeout=DEFAULT_SCROLL_WAIT_TIMEOUT, page_load_timeout=20,
+                           deadline=None, ingestion_mode="network", url=None, trace=None,
+                           on_row_error=None, checkpoint=None, on_checkpoint=None, navigate=True,
+                           performance_entries=None):
+    """
+    Carga la página de ownership en el navegador dado y obtiene los registros de jugadores.
+    Devuelve la lista de registros de jugadores, o None si no aparece el contenedor de datos.
+    ingestion_mode: "network" lee el payload JSON de la tabla desde el log de red y, si no lo
+    encuentra, recurre al scroll del DOM; "dom" recorre siempre la lista virtualizada.
+    deadline: instante (time.monotonic) a partir del cual se aborta el scrape con TimeoutError.
+    trace: ScrapeTrace donde registrar tiempos por fase, scrolls y errores.
+    on_row_error: función opcional que recibe el mensaje de cada fila que no se pudo leer.
+    checkpoint: estado de un scrape interrumpido ({'position', 'records', 'processed_players'});
+    el recorrido continúa desde esa posición con esas filas ya leídas.
+    on_checkpoint: función opcional que recibe ese mismo estado tras cada scroll. Las listas son las
+    del recorrido en curso (sin copiar): se pueden guardar pero no modificar.
+    navigate=False lee la página ya abierta (o cargándose) en la pestaña actual en lugar de cargar url;
+    performance_entries es la lista compartida de entradas del log de red (ver capture_ownership_payload).
+    """
+    trace = trace or ScrapeTrace(sport)
+    if ingestion_mode not in INGESTION_MODES:
+        raise ValueError(f"Modo de ingesta desconocido: {ingestion_mode}. Opciones: {INGESTION_MODES}")
+    url = url or ownership_url(sport)
+
+    if progress_bar:
+        progress_bar.progress(10)
+        progress_bar.text("Abriendo navegador y cargando la página...")
+    
+    if navigate:
+        with trace.span('page_load'):
+            if ingestion_mode == "network":
+                drain_performance_log(driver)
+            driver.get(url)
+    
+    if progress_bar:
+        progress_bar.progress(20)
+        progress_bar.text("Esperando que se cargue el contenedor de datos...")
+    
+    wait = WebDriverWait(driver, page_load_timeout, poll_frequency=WAIT_POLL_FREQUENCY)
+    
+    # Buscar el contenedor de la tabla de ownership y esperar sus primeras filas
+    try:
+        with trace.span('table_wait'):
+            ownership_container = wait.until(EC.presence_of_element_located(
+                (By.CSS_SELECTOR, f"div[data-testid='ownershipTable{sport}']")
+            ))
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ROW_SELECTOR)))
+        if progress_bar:
+            progress_bar.progress(30)
+            progress_bar.text("Contenedor de datos encontrado! Iniciando extracción...")
+    except Exception as e:
+        trace.record_error('table_wait', e)
+        if progress_bar:
+            progress_bar.error(f"Error al esperar el contenedor: {e}")
+        return None
+    
+    # Con la tabla ya renderizada, su payload de datos ya fue descargado
+    if ingestion_mode == "network":
+        with trace.span('network_capture'):
+            payload_records = capture_ownership_payload(driver, performance_entries)
+        if payload_records:
+            if progress_bar:
+                progress_bar.progress(90)
+                progress_bar.text(f"Datos leídos de la red: {len(payload_records)} jugadores")
+            return payload_records
+        trace.count('network_fallbacks')
+        if progress_bar:
+            progress_bar.text("No se encontró el payload de datos, recorriendo la tabla...")
+    
+    # Buscar el contenedor donde se debe hacer scroll
+    scroll_container = ownership_container.find_element(By.XPATH, './div')
+    install_row_observer(driver, scroll_container)
+    
+    # Medir la lista una vez: cada scroll avanza exactamente una pantalla de filas
+    geometry = measure_scroll_extent(driver, scroll_container)
+    step = plan_scroll_step(geometry)
+    
+    # Crear lista para guardar los datos de todos los jugadores
+    all_players_data = []
+    
+    # Conjunto para llevar un registro de los jugadores ya procesados (para evitar duplicados)
+    processed_players = set()
+    
+    # Recorrido hasta que las pantallas leídas cubran todo el alto de la lista
+    position = geometry['top']
+    covered = 0
+    total_scrolls = 0
+    
+    # Retomar un scrape interrumpido: filas ya leídas y última posición de scroll
+    if checkpoint:
+        trace.count('checkpoint_resumes')
+        all_players_data.extend(checkpoint['records'])
+        processed_players.update(checkpoint['processed_players'])
+        position = checkpoint['position']
+        with trace.span('scroll_wait'):
+            state = scroll_and_wait(driver, scroll_container, position, scroll_wait_timeout)
+        geometry.update(top=state['top'], viewport=state['viewport'], extent=state['extent'])
+        if progress_bar:
+            progress_bar.text(f"Retomando el scrape anterior: {len(processed_players)} jugadores ya leídos")
+    
+    while True:
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Tiempo máximo de scraping agotado para {sport} tras {total_scrolls} scrolls")
+        
+        # Obtener solo las filas nuevas de la pantalla actual
+        with trace.span('row_extraction'):
+            new_rows, row_errors, current_count = extract_new_rows(
+                driver, processed_players, extraction_mode
+            )
+        all_players_data.extend(new_rows)
+        for error in row_errors:
+            trace.record_error('row_extraction', error)
+            if on_row_error:
+                on_row_error(error)
+        trace.record_scroll(position, len(new_rows) + len(row_errors), current_count)
+        if on_checkpoint:
+            on_checkpoint({
+                'position': geometry['top'],
+                'records': all_players_data,
+                'processed_players': processed_players,
+            })
+        
+        covered = max(covered, geometry['top'] + geometry['viewport'])
+        if progress_bar:
+            progress_bar.progress(int(30 + 60 * min(covered / max(geometry['extent'], 1), 1)))
+            progress_bar.text(f"Scroll #{total_scrolls+1}... Jugadores encontrados: {len(processed_players)}")
+        
+        if covered >= geometry['extent'] - 1:
+            # Confirmar que la lista no creció al llegar al final (carga perezosa); el alto de fila y
+            # el desplazamiento de la primera fila se conservan de la medición inicial
+            measured = measure_scroll_extent(driver, scroll_container)
+            geometry.update(top=measured['top'], viewport=measured['viewport'], extent=measured['extent'])
+            if covered >= geometry['extent'] - 1:
+                break
+            trace.count('extent_growths')
+        
+        # Avanzar una pantalla y esperar a que se rendericen las filas nuevas
+        position = geometry['top'] + step
+        with trace.span('scroll_wait'):
+            state = scroll_and_wait(driver, scroll_container, position, scroll_wait_timeout)
+        total_scrolls += 1
+        if not state['new_rows']:
+            trace.count('scroll_waits_without_new_rows')
+        if not state['moved']:
+            # El contenedor no avanza aunque no se cubrió todo su alto
+            trace.count('scroll_stalls')
+            break
+        geometry.update(top=state['top'], viewport=state['viewport'], extent=state['extent'])
+    
+    trace.completeness = completeness_report(
+        'scroll', expected_row_count(geometry), len(all_players_data), len(processed_players) - len(all_players_data),
+        scroll_extent=geometry['extent'], covered_extent=covered, scrolls=total_scrolls
+    )
+    return all_players_data
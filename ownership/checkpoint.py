@@ -0,0 +1,61 @@
+"""
+Checkpoints de scrapes en curso: las filas ya leídas, los jugadores procesados y la última
+posición de scroll. Un reintento tras una falla continúa desde ahí en lugar de empezar de cero.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from ownership.config import CHECKPOINT_MAX_AGE_MINUTES, CHECKPOINT_ROOT
+
+_checkpoint_lock = threading.Lock()
+
+
+def checkpoint_path(sport, root=CHECKPOINT_ROOT):
+    return os.path.join(root, f"{sport}.json")
+
+
+def save_checkpoint(sport, url, state, root=CHECKPOINT_ROOT):
+    """Guarda el estado de un scrape: {'position', 'records', 'processed_players'}"""
+    data = {
+        'sport': sport,
+        'url': url,
+        'updated_at': datetime.now().isoformat(),
+        'position': state['position'],
+        'records': state['records'],
+        'processed_players': sorted(state['processed_players']),
+    }
+    path = checkpoint_path(sport, root)
+    with _checkpoint_lock:
+        os.makedirs(root, exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+
+
+def load_checkpoint(sport, url, root=CHECKPOINT_ROOT, max_age_minutes=CHECKPOINT_MAX_AGE_MINUTES):
+    """
+    Checkpoint del deporte si es de la misma página y tiene menos de max_age_minutes (el
+    ownership cambia: no tiene sentido mezclar filas de hace horas). Si no, None.
+    """
+    try:
+        with open(checkpoint_path(sport, root), encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('url') != url:
+        return None
+    if datetime.fromisoformat(data['updated_at']) < datetime.now() - timedelta(minutes=max_age_minutes):
+        return None
+    data['processed_players'] = set(data['processed_players'])
+    return data
+
+
+def clear_checkpoint(sport, root=CHECKPOINT_ROOT):
+    """Borra el checkpoint del deporte (al completar el scrape)"""
+    with _checkpoint_lock:
+        try:
+            os.remove(checkpoint_path(sport, root))
+        except FileNotFoundError:
+            pass
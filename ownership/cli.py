@@ -0,0 +1,294 @@
+"""
+Línea de comandos para correr scrapes, exportaciones y el modo en vivo sin el dashboard
+(p. ej. desde cron). Los módulos pesados se importan dentro de cada comando.
+
+Uso:
+    python -m ownership scrape mlb nba --source http
+    python -m ownership scrape mlb --output mlb.parquet
+    python -m ownership scrape mlb --all-slates --verbose
+    python -m ownership export mlb --format csv.gz --output mlb.csv.gz
+    python -m ownership export nba --start 2026-10-01 --end 2026-10-07 --format parquet --output nba.zip
+    python -m ownership watch mlb --interval 5
+    python -m ownership lineups mlb --site fd --projections proj.csv --ceiling 120 --output lineups.csv
+    python -m ownership lineups mlb --slate early --projections proj.csv --output early.csv
+    python -m ownership field mlb --site fd --size 150000 --lineups lineups.csv --output duplicacion.csv
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from ownership.config import BROWSER_PROFILES, SNAPSHOT_ROOT, SPORTS, slate_key
+
+
+class ConsoleProgress:
+    """Barra de progreso mínima para la terminal con la interfaz que usa el scraper"""
+
+    def __init__(self, sport, stream=sys.stderr):
+        self.sport = sport
+        self.stream = stream
+
+    def progress(self, value):
+        pass
+
+    def text(self, message):
+        print(f"[{self.sport}] {message}", file=self.stream)
+
+    def error(self, message):
+        print(f"[{self.sport}] ERROR: {message}", file=self.stream)
+
+
+def parse_date(value):
+    return datetime.fromisoformat(value)
+
+
+def export_format(path, fmt):
+    """Formato explícito o, si no se indicó, deducido de la extensión del archivo de salida"""
+    from ownership.export import EXPORT_FORMATS
+
+    if fmt:
+        return fmt
+    for name, spec in sorted(EXPORT_FORMATS.items(), key=lambda item: -len(item[1]['extension'])):
+        if path and path.endswith('.' + spec['extension']):
+            return name
+    return 'csv'
+
+
+def write_output(df, path, fmt):
+    """Escribe el DataFrame en path ("-" = salida estándar) en el formato indicado"""
+    from ownership.export import write_export
+
+    if path == '-':
+        write_export(df, fmt, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+        return
+    with open(path, 'wb') as f:
+        write_export(df, fmt, f)
+
+
+def command_scrape_slates(args, options):
+    """Todos los slates de cada deporte, cada deporte en un solo navegador con una pestaña por slate"""
+    from ownership.scrape import scrape_slates
+
+    failed = 0
+    for sport in args.sports:
+        progress_bar = ConsoleProgress(sport) if args.verbose else None
+        results = scrape_slates(sport, progress_bar=progress_bar, job_timeout=args.timeout, **options)
+        for result in results.values():
+            df = result['data']
+            failed += df is None
+            print(f"{sport} [{result['label']}]: {'error' if df is None else f'{len(df)} jugadores'}", file=sys.stderr)
+        if not results:
+            failed += 1
+    return 1 if failed else 0
+
+
+def command_scrape(args):
+    from ownership.scrape import run_ownership_scrape, scrape_all_sports
+
+    progress_bars = {sport: ConsoleProgress(sport) for sport in args.sports} if args.verbose else {}
+    options = {'source': args.source, 'ingestion_mode': args.ingestion, 'snapshot_root': args.snapshot_root,
+               'resume': not args.fresh}
+    if args.browser_profile:
+        from ownership.browser import get_browser_pool
+
+        options['pool'] = get_browser_pool(profile=args.browser_profile)
+    if args.all_slates:
+        return command_scrape_slates(args, options)
+    if args.slate:
+        options['slate'] = args.slate
+    if len(args.sports) == 1:
+        sport = args.sports[0]
+        results = {sport: run_ownership_scrape(sport, progress_bars.get(sport), job_timeout=args.timeout, **options)}
+    else:
+        results = scrape_all_sports(args.sports, job_timeout=args.timeout, progress_bars=progress_bars, **options)
+
+    failed = [sport for sport, df in results.items() if df is None]
+    for sport, df in results.items():
+        print(f"{sport}: {'error' if df is None else f'{len(df)} jugadores'}", file=sys.stderr)
+    if args.output and len(args.sports) == 1 and not failed:
+        write_output(results[args.sports[0]], args.output, export_format(args.output, args.format))
+    return 1 if failed else 0
+
+
+def command_export(args):
+    from ownership.export import export_history_archive
+    from ownership.store import latest_snapshot
+
+    history = args.start or args.end
+    # En un ZIP de historial la extensión de --output no indica el formato de cada snapshot
+    fmt = export_format(None if history else args.output, args.format)
+    if history:
+        if args.output == '-':
+            count = export_history_archive(args.sport, args.start, args.end, fmt, sys.stdout.buffer, args.snapshot_root)
+        else:
+            with open(args.output, 'wb') as f:
+                count = export_history_archive(args.sport, args.start, args.end, fmt, f, args.snapshot_root)
+        print(f"{args.sport}: {count} snapshots exportados", file=sys.stderr)
+        return 0 if count else 1
+
+    df = latest_snapshot(args.sport, root=args.snapshot_root)
+    if df is None:
+        print(f"{args.sport}: no hay snapshots guardados", file=sys.stderr)
+        return 1
+    write_output(df, args.output, fmt)
+    return 0
+
+
+def command_watch(args):
+    from ownership.watch import OwnershipWatcher
+
+    watcher = OwnershipWatcher(args.sport, poll_interval=args.interval)
+    watcher.start()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    seq = 0
+    try:
+        while watcher.running and (deadline is None or time.monotonic() < deadline):
+            for event in watcher.events_since(seq):
+                seq = event['seq']
+                print(f"{event['time']:%H:%M:%S}\t{event['player']}\t{event['field']}\t{event['old']}\t{event['new']}",
+                      flush=True)
+            time.sleep(min(args.interval, 1))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+    if watcher.error:
+        print(f"{args.sport}: {watcher.error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def command_lineups(args):
+    from ownership.lineups import generate_lineups
+    from ownership.store import latest_snapshot
+
+    df = latest_snapshot(slate_key(args.sport, args.slate), root=args.snapshot_root)
+    if df is None:
+        print(f"{slate_key(args.sport, args.slate)}: no hay snapshots guardados", file=sys.stderr)
+        return 1
+    if args.projections:
+        from ownership.projections import join_projections, load_projections
+
+        df = join_projections(df, load_projections(args.projections, sport=args.sport, slate=args.slate))
+    sampling = {name: value for name, value in (('candidates', args.candidates), ('workers', args.workers))
+                if value is not None}
+    lineups = generate_lineups(
+        df, args.sport, args.site, n_lineups=args.lineups, ownership_ceiling=args.ceiling,
+        max_per_team=args.max_per_team, min_stack=args.min_stack, max_exposure=args.max_exposure,
+        seed=args.seed, **sampling
+    )
+    stats = lineups.attrs['stats']
+    print(f"{args.sport}: {stats['lineups']} lineups de {stats['valid']} válidos "
+          f"({stats['candidates']} candidatos, {stats['seconds']}s)", file=sys.stderr)
+    write_output(lineups, args.output, export_format(args.output, args.format))
+    return 0 if len(lineups) else 1
+
+
+def command_field(args):
+    import pandas as pd
+
+    from ownership.field import simulate_field
+    from ownership.store import latest_snapshot
+
+    df = latest_snapshot(args.sport, root=args.snapshot_root)
+    if df is None:
+        print(f"{args.sport}: no hay snapshots guardados", file=sys.stderr)
+        return 1
+    lineups = pd.read_csv(args.lineups) if args.lineups else None
+    options = {'workers': args.workers} if args.workers is not None else {}
+    result = simulate_field(df, args.sport, args.site, field_size=args.size, lineups=lineups,
+                            n_fields=args.fields, min_salary=args.min_salary, seed=args.seed, **options)
+    stats = result['stats']
+    print(f"{args.sport}: {stats['simulated']} lineups simulados en {stats['seconds']}s · "
+          f"{stats['distinct_lineups']:.0f} distintos por field · {stats['duplicated_entries']:.2f}% de entradas duplicadas",
+          file=sys.stderr)
+    table = result['lineups'] if lineups is not None else result[args.table]
+    write_output(table, args.output, export_format(args.output, args.format))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m ownership", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot-root", default=SNAPSHOT_ROOT, help="Directorio del almacén de snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scrape = commands.add_parser("scrape", help="Scrapear uno o varios deportes y guardar sus snapshots")
+    scrape.add_argument("sports", nargs="*", metavar="SPORT",
+                        help=f"Deportes a scrapear (por defecto: {', '.join(SPORTS)})")
+    scrape.add_argument("--source", choices=("auto", "http", "browser"), default="auto")
+    scrape.add_argument("--ingestion", choices=("network", "dom"), default="network")
+    scrape.add_argument("--timeout", type=float, default=600, help="Máximo de segundos por deporte")
+    scrape.add_argument("--output", help="Con un solo deporte y slate: escribir además el resultado en este archivo")
+    scrape.add_argument("--format", help="Formato de --output (por defecto, según la extensión)")
+    scrape.add_argument("--fresh", action="store_true",
+                        help="Empezar de cero aunque haya un checkpoint de un scrape interrumpido")
+    scrape.add_argument("--browser-profile", choices=BROWSER_PROFILES,
+                        help="Perfil de Chrome: lean (por defecto, sin imágenes, fuentes ni rastreadores) o full")
+    scrape.add_argument("--slate", help="Id del slate a scrapear (por defecto, el que muestra la página)")
+    scrape.add_argument("--all-slates", action="store_true",
+                        help="Descubrir y scrapear todos los slates del día en pestañas de un mismo navegador")
+    scrape.add_argument("--verbose", action="store_true", help="Mostrar el progreso en stderr")
+    scrape.set_defaults(handler=command_scrape)
+
+    export = commands.add_parser("export", help="Exportar el último snapshot o un rango del historial (ZIP)")
+    export.add_argument("sport", choices=list(SPORTS))
+    export.add_argument("--start", type=parse_date, help="Inicio del rango (ISO), exporta un ZIP")
+    export.add_argument("--end", type=parse_date, help="Fin del rango (ISO), exporta un ZIP")
+    export.add_argument("--format", help="csv, csv.gz, parquet, arrow o jsonl")
+    export.add_argument("--output", default="-", help="Archivo de salida ('-' = stdout)")
+    export.set_defaults(handler=command_export)
+
+    watch = commands.add_parser("watch", help="Mostrar los cambios de ownership en vivo")
+    watch.add_argument("sport", choices=list(SPORTS))
+    watch.add_argument("--interval", type=float, default=5, help="Segundos entre lecturas de cambios")
+    watch.add_argument("--duration", type=float, help="Terminar tras estos segundos (por defecto, hasta Ctrl+C)")
+    watch.set_defaults(handler=command_watch)
+
+    lineups = commands.add_parser("lineups", help="Generar lineups con techo de ownership desde el último snapshot")
+    lineups.add_argument("sport", choices=list(SPORTS))
+    lineups.add_argument("--site", choices=("dk", "fd"), default="dk")
+    lineups.add_argument("--lineups", type=int, default=150, help="Cantidad de lineups a generar")
+    lineups.add_argument("--slate", help="Slate del snapshot y de la columna Slate de las proyecciones "
+                                         "(por defecto, el principal)")
+    lineups.add_argument("--projections", help="Archivo de proyecciones (CSV o Parquet) para el score y las posiciones")
+    lineups.add_argument("--ceiling", type=float, help="Máximo de ownership acumulado por lineup")
+    lineups.add_argument("--max-per-team", type=int, help="Máximo de jugadores de un mismo equipo")
+    lineups.add_argument("--min-stack", type=int, help="Mínimo de jugadores del equipo del stack")
+    lineups.add_argument("--max-exposure", type=float, default=1.0, help="Fracción máxima de lineups por jugador")
+    lineups.add_argument("--candidates", type=int, help="Candidatos a muestrear (por defecto, 200000)")
+    lineups.add_argument("--workers", type=int, help="Procesos del pool (por defecto, hasta 4 según los CPU)")
+    lineups.add_argument("--seed", type=int)
+    lineups.add_argument("--format", help="Formato de --output (por defecto, según la extensión)")
+    lineups.add_argument("--output", default="-", help="Archivo de salida ('-' = stdout)")
+    lineups.set_defaults(handler=command_lineups)
+
+    field = commands.add_parser("field", help="Simular el field de un concurso: duplicación y exposición")
+    field.add_argument("sport", choices=list(SPORTS))
+    field.add_argument("--site", choices=("dk", "fd"), default="dk")
+    field.add_argument("--size", type=int, default=150000, help="Entradas del concurso")
+    field.add_argument("--fields", type=int, default=1, help="Fields a simular (más = estimaciones más finas)")
+    field.add_argument("--lineups", help="CSV de lineups (del comando lineups) cuya duplicación se estima")
+    field.add_argument("--table", choices=("players", "teams"), default="players",
+                       help="Sin --lineups: exposición por jugador o por equipo")
+    field.add_argument("--min-salary", type=float, help="Salario mínimo de los lineups del field")
+    field.add_argument("--workers", type=int, help="Procesos del pool (por defecto, hasta 4 según los CPU)")
+    field.add_argument("--seed", type=int)
+    field.add_argument("--format", help="Formato de --output (por defecto, según la extensión)")
+    field.add_argument("--output", default="-", help="Archivo de salida ('-' = stdout)")
+    field.set_defaults(handler=command_field)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "scrape":
+        args.sports = args.sports or list(SPORTS)
+        unknown = [sport for sport in args.sports if sport not in SPORTS]
+        if unknown:
+            parser.error(f"deportes desconocidos: {', '.join(unknown)}")
+        if args.output and (args.all_slates or len(args.sports) != 1):
+            parser.error("--output escribe un solo resultado: indicar un único deporte y no usar --all-slates")
+    return args.handler(args)
@@ -0,0 +1,108 @@
+"""
+Configuración compartida: deportes, URL del sitio, límites de navegadores y scrapes y
+directorios de datos. No importa nada pesado para que cualquier módulo pueda usarla.
+"""
+import re
+import urllib.parse
+
+# Deportes configurados: agregar una entrada basta para scrapear fantasyteamadvice.com/dfs/{sport}/ownership.
+# refresh_minutes y lock_times (hora local "HH:MM") guían el prefetch en segundo plano.
+SPORTS = {
+    "mlb": {"name": "MLB", "icon": "⚾", "refresh_minutes": 30, "lock_times": ["13:05", "19:05"]},
+    "nba": {"name": "NBA", "icon": "🏀", "refresh_minutes": 30, "lock_times": ["19:00"]},
+}
+
+# URL de la página de ownership de cada deporte
+OWNERSHIP_URL_TEMPLATE = "https://fantasyteamadvice.com/dfs/{sport}/ownership"
+
+
+# Parámetro de la URL que elige el slate (principal, early, late, showdown...). Sin él la
+# página muestra el slate por defecto del día, que en todo el código es el slate None.
+OWNERSHIP_SLATE_PARAM = "slate"
+# Máximo de slates por deporte que se scrapean a la vez, cada uno en una pestaña del mismo Chrome;
+# si hay más, se procesan en tandas de este tamaño
+SLATE_MAX_TABS = 8
+SLATE_DEFAULT_LABEL = "Principal"
+
+
+def slate_url(url, slate=None):
+    """url con el parámetro del slate indicado (la misma url para el slate por defecto)"""
+    if slate is None:
+        return url
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qsl(parts.query)
+    query = [(key, value) for key, value in query if key != OWNERSHIP_SLATE_PARAM]
+    query.append((OWNERSHIP_SLATE_PARAM, str(slate)))
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+
+def ownership_url(sport, slate=None):
+    """URL de la página de ownership para el deporte (y slate) indicado"""
+    return slate_url(OWNERSHIP_URL_TEMPLATE.format(sport=sport), slate)
+
+
+def slate_key(sport, slate=None):
+    """
+    Clave de almacenamiento de un slate (checkpoints, snapshots, serie temporal): el deporte para
+    el slate por defecto y "deporte-slate" para los demás, con el id reducido a caracteres seguros
+    """
+    if slate is None:
+        return sport
+    return f"{sport}-{re.sub(r'[^A-Za-z0-9_.]+', '_', str(slate))}"
+
+
+# Configuración del pool de navegadores
+BROWSER_POOL_SIZE = 2
+BROWSER_MAX_USES = 20
+BROWSER_MAX_RSS_MB = 1500
+BROWSER_BORROW_TIMEOUT = 120
+
+# Perfil de Chrome. "lean" no descarga imágenes, media ni fuentes, bloquea los hosts de publicidad y
+# analítica vía DevTools (el equipo se lee del alt de la imagen, que no necesita descargarla) y
+# fija una ventana con la altura justa para las filas que la lista virtualizada pinta por
+# pantalla. "full" es el perfil anterior: todo se descarga y la ventana es la por defecto.
+BROWSER_PROFILE = "lean"
+BROWSER_PROFILES = ("lean", "full")
+BROWSER_BLOCKED_URL_PATTERNS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+)
+BROWSER_BLOCKED_HOSTS = (
+    "googletagmanager.com", "google-analytics.com", "googlesyndication.com", "googleadservices.com",
+    "doubleclick.net", "facebook.net", "hotjar.com", "clarity.ms", "segment.com", "segment.io",
+    "amazon-adsystem.com", "adnxs.com", "criteo.com", "pubmatic.com", "rubiconproject.com", "taboola.com",
+    "outbrain.com", "quantserve.com", "scorecardresearch.com", "fonts.googleapis.com", "fonts.gstatic.com",
+)
+# Si no está vacío, Chrome solo resuelve estos hosts (y sus subdominios): el resto falla sin salir a la red
+BROWSER_ALLOWED_HOSTS = ()
+# Ventana del perfil "lean": BROWSER_VIEWPORT_ROWS filas visibles de BROWSER_ROW_HEIGHT_PX más el
+# encabezado de la página. Más filas por pantalla = menos scrolls, sin pintar la página completa.
+BROWSER_WINDOW_WIDTH = 1280
+BROWSER_VIEWPORT_ROWS = 40
+BROWSER_ROW_HEIGHT_PX = 48
+BROWSER_PAGE_HEADER_PX = 360
+
+# Máximo de segundos a esperar que se rendericen filas nuevas tras cada scroll
+DEFAULT_SCROLL_WAIT_TIMEOUT = 5
+
+# Límites del ejecutor de scrapes en paralelo. La cantidad real de navegadores
+# simultáneos está acotada además por el tamaño del pool.
+SCRAPE_MAX_WORKERS = BROWSER_POOL_SIZE
+SCRAPE_JOB_TIMEOUT = 600
+
+# Segundos durante los que el resultado de un scrape se comparte con las demás sesiones
+# en lugar de lanzar otro (los clics simultáneos siempre se unen al scrape en curso)
+SCRAPE_RESULT_TTL = 3600
+
+# Minutos durante los que un scrape interrumpido se puede retomar desde su checkpoint
+CHECKPOINT_MAX_AGE_MINUTES = 30
+# Segundos mínimos entre dos escrituras del checkpoint durante el scroll (cada una reescribe todas
+# las filas leídas); al fallar el scrape se guarda igual el último estado
+CHECKPOINT_INTERVAL_SECONDS = 5
+
+# Directorios de datos (relativos al directorio de trabajo)
+SNAPSHOT_ROOT = "snapshots"
+TRACE_ROOT = "traces"
+EXPORT_ROOT = "exports"
+CHECKPOINT_ROOT = "checkpoints"
@@ -0,0 +1,112 @@
+"""Exportación en bloques a CSV, CSV gzip, Parquet, Arrow IPC y JSON Lines."""
+import gzip
+import io
+import os
+import threading
+import zipfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ownership.config import EXPORT_ROOT, SNAPSHOT_ROOT
+from ownership.schema import frame_hash
+from ownership.store import read_snapshot_entries, select_snapshots
+
+# Exportación: las descargas se generan bajo demanda, en bloques de filas, sobre un archivo
+# en EXPORT_ROOT que se reutiliza mientras el snapshot no cambie.
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_CACHE_FILES = 50
+# st.download_button guarda el archivo completo en memoria: por encima de este tamaño el dashboard
+# no lo sirve y remite a la CLI (python -m ownership export)
+EXPORT_INLINE_MAX_MB = 200
+EXPORT_FORMATS = {
+    'csv': {'label': "CSV", 'extension': "csv", 'mime': "text/csv"},
+    'csv.gz': {'label': "CSV (gzip)", 'extension': "csv.gz", 'mime': "application/gzip"},
+    'parquet': {'label': "Parquet", 'extension': "parquet", 'mime': "application/vnd.apache.parquet"},
+    'arrow': {'label': "Arrow IPC", 'extension': "arrow", 'mime': "application/vnd.apache.arrow.stream"},
+    'jsonl': {'label': "JSON Lines", 'extension': "jsonl", 'mime': "application/x-ndjson"},
+}
+
+
+def iter_frame_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_export(df, fmt, f, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Escribe el DataFrame en el archivo binario f en el formato indicado, bloque a bloque"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}")
+
+    if fmt in ('csv', 'csv.gz'):
+        out = gzip.GzipFile(fileobj=f, mode='wb') if fmt == 'csv.gz' else f
+        text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+        df.iloc[:0].to_csv(text, index=False)
+        for chunk in iter_frame_chunks(df, chunk_rows):
+            chunk.to_csv(text, index=False, header=False)
+        # Soltar el wrapper sin cerrar el archivo de destino
+        text.detach()
+        if out is not f:
+            out.close()
+    elif fmt == 'jsonl':
+        for chunk in iter_frame_chunks(df, chunk_rows):
+            # to_json con lines=True ya termina cada bloque con un salto de línea
+            f.write(chunk.to_json(orient='records', lines=True, date_format='iso').encode('utf-8'))
+    else:
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        if fmt == 'parquet':
+            writer = pq.ParquetWriter(f, schema)
+        else:
+            writer = pa.ipc.new_stream(f, schema)
+        with writer:
+            for chunk in iter_frame_chunks(df, chunk_rows):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def prune_export_cache(root=EXPORT_ROOT, keep=EXPORT_CACHE_FILES):
+    """Deja solo los keep archivos de exportación usados más recientemente"""
+    try:
+        paths = [os.path.join(root, name) for name in os.listdir(root) if not name.endswith('.tmp')]
+    except FileNotFoundError:
+        return
+    for path in sorted(paths, key=os.path.getmtime, reverse=True)[keep:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def export_frame(df, fmt, snapshot_key=None, root=EXPORT_ROOT):
+    """
+    Ruta de un archivo con el DataFrame exportado en fmt. Si ya existe una exportación
+    del mismo snapshot (snapshot_key, por defecto el hash del contenido) se reutiliza.
+    """
+    snapshot_key = snapshot_key or frame_hash(df)
+    path = os.path.join(root, f"{snapshot_key}.{EXPORT_FORMATS[fmt]['extension']}")
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+
+    os.makedirs(root, exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write_export(df, fmt, f)
+    os.replace(tmp_path, path)
+    prune_export_cache(root)
+    return path
+
+
+def export_history_archive(sport, start, end, fmt, f, root=SNAPSHOT_ROOT):
+    """
+    Escribe en f un ZIP con un archivo por snapshot del rango [start, end]. Los snapshots se
+    leen y escriben de a uno, así que la memoria no crece con el tamaño del historial.
+    Devuelve la cantidad de snapshots exportados.
+    """
+    entries = select_snapshots(sport, start, end, root)
+    with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for entry in entries:
+            data = read_snapshot_entries([entry], root=root)
+            name = f"{entry['snapshot_id']}.{EXPORT_FORMATS[fmt]['extension']}"
+            with archive.open(name, 'w', force_zip64=True) as member:
+                write_export(data, fmt, member)
+    return len(entries)
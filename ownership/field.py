@@ -0,0 +1,231 @@
+"""
+Simulador Monte Carlo del field de un concurso: el ownership scrapeado se usa como probabilidad de
+selección de cada jugador para muestrear campos sintéticos (cientos de miles de lineups) bajo el
+tope salarial, y se estiman la duplicación de lineups propios y la exposición del field por jugador
+y por equipo.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from ownership.lineups import (
+    LINEUP_BATCH_SIZE, LINEUP_SITES, LINEUP_WORKERS, fit_penalty, get_lineup_executor, lineup_hashes,
+    lineup_player_pool, sample_lineups, team_counts,
+)
+
+FIELD_SIZE = 150000
+# Rondas y tamaño de la muestra piloto con que se calibran los log-pesos para que la exposición
+# simulada (después de descartar los lineups fuera del tope) coincida con el ownership scrapeado
+FIELD_CALIBRATION_ROUNDS = 4
+FIELD_CALIBRATION_SIZE = 20000
+# Por debajo de esta fracción de candidatos válidos el field no se puede simular en tiempo razonable.
+# La calibración no baja de FIELD_CALIBRATION_VALID_RATE: si el ownership no se puede reproducir
+# dentro del tope, se conservan los pesos de la última ronda que lo respetaba.
+FIELD_MIN_VALID_RATE = 0.005
+FIELD_CALIBRATION_VALID_RATE = 0.05
+# Jugadores de un mismo equipo a partir de los cuales un lineup cuenta como stack de ese equipo
+FIELD_STACK_SIZE = {'mlb': 4, 'nba': 3}
+# Lotes en vuelo por proceso: acota la memoria a unos pocos lotes aunque el field sea enorme
+FIELD_CHUNKS_IN_FLIGHT = 2
+# Columnas de generate_lineups que no son slots de jugador
+LINEUP_SUMMARY_COLUMNS = ('Salary', 'Ownership', 'Score', 'Stack')
+
+
+def ownership_targets(pool):
+    """Probabilidad de inclusión objetivo por jugador: el ownership escalado a un jugador por slot"""
+    ownership = np.maximum(pool['ownership'].astype('float64'), 0)
+    if not ownership.sum():
+        raise ValueError("El frame no tiene ownership para simular el field")
+    return ownership / ownership.sum() * pool['eligibility'].shape[0]
+
+
+def valid_field_lineups(pool, lineups, valid, min_salary=None):
+    """Lineups muestreados que respetan el tope salarial (y el mínimo, si se indica)"""
+    salary = pool['salary'][lineups].sum(axis=1)
+    ok = valid & (salary <= pool['salary_cap'])
+    if min_salary is not None:
+        ok &= salary >= min_salary
+    return lineups[ok]
+
+
+def calibrate_weights(pool, targets, min_salary=None, rounds=FIELD_CALIBRATION_ROUNDS,
+                      size=FIELD_CALIBRATION_SIZE, seed=None):
+    """
+    Log-pesos cuya exposición simulada se acerca a targets: se parte del log del ownership (con la
+    misma penalización por salario del generador, para que la mayoría de los candidatos entre en el
+    tope) y en cada ronda se corrige por el cociente entre el objetivo y la frecuencia observada en
+    una muestra piloto. Devuelve los pesos y la fracción de candidatos válidos con esos pesos.
+    """
+    rng = np.random.default_rng(seed)
+    floor = 1e-6
+    weights = np.log(np.maximum(targets, floor))
+    salary = np.nan_to_num(pool['salary'].astype('float64'))
+    weights -= fit_penalty(weights, salary, pool['eligibility'].shape[0], 0.9 * pool['salary_cap']) * salary
+    accepted = None
+    for _ in range(rounds + 1):
+        lineups, valid = sample_lineups(pool, size, rng, weights.astype('float32'))
+        lineups = valid_field_lineups(pool, lineups, valid, min_salary)
+        valid_rate = len(lineups) / size
+        if accepted is not None and valid_rate < FIELD_CALIBRATION_VALID_RATE:
+            break
+        accepted = (weights.astype('float32'), valid_rate)
+        if not len(lineups):
+            break
+        observed = np.bincount(lineups.ravel(), minlength=len(targets)) / len(lineups)
+        # Suavizado para los jugadores que la muestra no eligió nunca
+        observed = (observed * len(lineups) + 0.5) / (len(lineups) + 0.5)
+        weights = weights + np.where(targets > floor, np.log(np.maximum(targets, floor) / observed), 0)
+    return accepted
+
+
+def simulate_chunk(pool, size, seed, weights, min_salary=None, stack_size=4):
+    """
+    Un lote del field (se ejecuta en los procesos del pool). Devuelve solo agregados y hashes de
+    8 bytes por lineup, nunca los lineups completos: conteos por jugador, por equipo y de stacks.
+    """
+    rng = np.random.default_rng(seed)
+    lineups, valid = sample_lineups(pool, size, rng, weights)
+    lineups = valid_field_lineups(pool, lineups, valid, min_salary)
+    counts = team_counts(pool, lineups)
+    return {
+        'lineups': len(lineups),
+        'players': np.bincount(lineups.ravel(), minlength=len(pool['players'])),
+        'teams': (counts > 0).sum(axis=0),
+        'stacks': (counts >= stack_size).sum(axis=0),
+        'hashes': lineup_hashes(lineups, len(pool['players'])),
+    }
+
+
+def run_chunks(pool, jobs, workers, **options):
+    """Ejecuta los lotes en este proceso o en el pool, con a lo sumo FIELD_CHUNKS_IN_FLIGHT por proceso"""
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield simulate_chunk(pool, *job, **options)
+        return
+    executor = get_lineup_executor(workers)
+    pending = list(jobs)
+    running = []
+    while pending or running:
+        while pending and len(running) < workers * FIELD_CHUNKS_IN_FLIGHT:
+            running.append(executor.submit(simulate_chunk, pool, *pending.pop(0), **options))
+        yield running.pop(0).result()
+
+
+def lineup_indices(lineups, pool):
+    """Posiciones en el pool de los jugadores de cada lineup (filas con jugadores desconocidos = -1)"""
+    positions = pd.Series(np.arange(len(pool['players'])), index=pool['players'])
+    positions = positions[~positions.index.duplicated()]
+    slots = [column for column in lineups.columns if column not in LINEUP_SUMMARY_COLUMNS]
+    return np.column_stack([
+        positions.reindex(lineups[column].astype(str)).fillna(-1).to_numpy(dtype=np.int64) for column in slots
+    ])
+
+
+def duplication_estimates(lineups, pool, hashes, field_size):
+    """
+    Copias esperadas de cada lineup propio en un field de field_size rivales y probabilidad de que
+    al menos uno lo repita (Poisson sobre la frecuencia del lineup en el field simulado)
+    """
+    indices = lineup_indices(lineups, pool)
+    known = (indices >= 0).all(axis=1)
+    field_hashes, field_counts = np.unique(hashes, return_counts=True)
+    targets = lineup_hashes(np.maximum(indices, 0), len(pool['players']))
+    matches = np.zeros(len(lineups), dtype=np.int64)
+    if len(field_hashes):
+        found = np.minimum(np.searchsorted(field_hashes, targets), len(field_hashes) - 1)
+        hit = known & (field_hashes[found] == targets)
+        matches[hit] = field_counts[found[hit]]
+    expected = matches / max(len(hashes), 1) * field_size
+    return lineups.assign(**{
+        'Field Matches': matches,
+        'Expected Duplicates': np.where(known, expected, np.nan).astype('float32'),
+        'Duplication Probability': np.where(known, 100 * (1 - np.exp(-expected)), np.nan).astype('float32'),
+    })
+
+
+def field_duplication(hashes, field_size):
+    """Lineups distintos y % de entradas duplicadas, promediados sobre los fields simulados completos"""
+    n_fields = max(len(hashes) // field_size, 1)
+    distinct, duplicated = [], []
+    for block in np.array_split(hashes[:n_fields * field_size], n_fields):
+        _, counts = np.unique(block, return_counts=True)
+        distinct.append(len(counts))
+        duplicated.append(100 * counts[counts > 1].sum() / max(len(block), 1))
+    return float(np.mean(distinct)), float(np.mean(duplicated))
+
+
+def simulate_field(df, sport, site="dk", field_size=FIELD_SIZE, lineups=None, n_fields=1, min_salary=None,
+                   batch_size=LINEUP_BATCH_SIZE, workers=LINEUP_WORKERS, seed=None):
+    """
+    Simula n_fields fields de field_size lineups para el sitio ("dk" o "fd") usando su ownership
+    como probabilidad de selección, en lotes con semilla repartidos en workers procesos.
+    lineups: DataFrame de generate_lineups cuya duplicación se estima (opcional).
+    Devuelve un dict con 'players' (ownership scrapeado contra exposición simulada), 'teams'
+    (exposición y % de stacks por equipo), 'lineups' (con Field Matches, Expected Duplicates y
+    Duplication Probability, o None) y 'stats'.
+    """
+    start = time.perf_counter()
+    pool = lineup_player_pool(df, sport, site)
+    targets = ownership_targets(pool)
+    seeds = np.random.SeedSequence(seed)
+    calibration_seed, chunk_seeds = seeds.spawn(2)
+    weights, valid_rate = calibrate_weights(pool, targets, min_salary, seed=calibration_seed)
+    if valid_rate < FIELD_MIN_VALID_RATE:
+        raise ValueError(f"Solo el {100 * valid_rate:.2f}% de los lineups muestreados respeta el tope salarial; "
+                         "revisa los precios o el salario mínimo")
+
+    total = field_size * n_fields
+    options = {'weights': weights, 'min_salary': min_salary, 'stack_size': FIELD_STACK_SIZE.get(sport, 4)}
+    simulated = 0
+    players = np.zeros(len(pool['players']), dtype=np.int64)
+    teams = np.zeros(len(pool['teams']), dtype=np.int64)
+    stacks = np.zeros(len(pool['teams']), dtype=np.int64)
+    hashes = []
+    candidates = 0
+    # Se planifican los lotes según la tasa de válidos de la calibración y se agregan más si faltan
+    for _ in range(3):
+        if simulated >= total:
+            break
+        n_chunks = max(1, int(np.ceil((total - simulated) / (batch_size * valid_rate) * 1.05)))
+        jobs = [(batch_size, child) for child in chunk_seeds.spawn(n_chunks)]
+        candidates += n_chunks * batch_size
+        for chunk in run_chunks(pool, jobs, workers, **options):
+            simulated += chunk['lineups']
+            players += chunk['players']
+            teams += chunk['teams']
+            stacks += chunk['stacks']
+            hashes.append(chunk['hashes'])
+    hashes = np.concatenate(hashes)
+    distinct, duplicated = field_duplication(hashes, field_size)
+
+    prefix = LINEUP_SITES[site]
+    player_table = pd.DataFrame({
+        'Player': pool['players'],
+        'Team': pool['teams'][pool['team_ids']],
+        'Salary': pool['salary'].astype('int32'),
+        'Ownership': pool['ownership'],
+        'Field Exposure': (100 * players / simulated).astype('float32'),
+    })
+    player_table['Exposure Diff'] = player_table['Field Exposure'] - player_table['Ownership']
+    team_table = pd.DataFrame({
+        'Team': pool['teams'],
+        'Field Exposure': (100 * teams / simulated).astype('float32'),
+        'Stack Rate': (100 * stacks / simulated).astype('float32'),
+    })
+    return {
+        'players': player_table.sort_values('Field Exposure', ascending=False, ignore_index=True),
+        'teams': team_table.sort_values('Stack Rate', ascending=False, ignore_index=True),
+        'lineups': None if lineups is None else duplication_estimates(lineups, pool, hashes, field_size),
+        'stats': {
+            'site': prefix,
+            'field_size': field_size,
+            'fields': n_fields,
+            'simulated': simulated,
+            'candidates': candidates,
+            'distinct_lineups': distinct,
+            'duplicated_entries': duplicated,
+            'exposure_error': float((player_table['Field Exposure'] - 100 * targets).abs().mean()),
+            'seconds': round(time.perf_counter() - start, 3),
+        },
+    }
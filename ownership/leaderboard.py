@@ -0,0 +1,121 @@
+"""Leaderboards de ownership: métricas derivadas y top-N por métrica."""
+import collections
+import threading
+
+import numpy as np
+
+from ownership.schema import frame_hash
+
+# Leaderboard: métricas derivadas y orden por métrica calculados una vez por snapshot.
+# Cualquier top-N de cualquier métrica es un slice del orden precalculado.
+LEADERBOARD_METRICS = (
+    'DK Ownership', 'FD Ownership', 'Combined Ownership', 'Min Ownership',
+    'Ownership Spread', 'DK Own per $1k', 'FD Own per $1k',
+)
+LEADERBOARD_CACHE_SIZE = 16
+
+# Métricas de leverage: solo si el frame trae proyecciones (ver ownership.projections)
+LEVERAGE_METRICS = ('DK Proj per Own', 'FD Proj per Own', 'DK Proj per $1k', 'FD Proj per $1k')
+
+# Jugador destacado por métrica (tarjetas) y tablas de top-N con sus columnas
+LEADER_METRICS = {
+    'max_dk': 'DK Ownership',
+    'max_fd': 'FD Ownership',
+    'max_combined': 'Combined Ownership',
+    'max_min': 'Min Ownership',
+}
+TOP_TABLES = {
+    'top_dk': ('DK Ownership', ['Player', 'Team', 'DK Price', 'DK Ownership']),
+    'top_fd': ('FD Ownership', ['Player', 'Team', 'FD Price', 'FD Ownership']),
+    'top_combined': ('Combined Ownership', ['Player', 'Team', 'DK Ownership', 'FD Ownership', 'Combined Ownership']),
+    'top_min': ('Min Ownership', ['Player', 'Team', 'DK Ownership', 'FD Ownership', 'Min Ownership']),
+}
+LEVERAGE_TABLES = {
+    'lev_dk_own': ('DK Proj per Own', ['Player', 'Team', 'DK Projection', 'DK Ownership', 'DK Proj per Own']),
+    'lev_fd_own': ('FD Proj per Own', ['Player', 'Team', 'FD Projection', 'FD Ownership', 'FD Proj per Own']),
+    'lev_dk_value': ('DK Proj per $1k', ['Player', 'Team', 'DK Price', 'DK Projection', 'DK Proj per $1k']),
+    'lev_fd_value': ('FD Proj per $1k', ['Player', 'Team', 'FD Price', 'FD Projection', 'FD Proj per $1k']),
+}
+
+
+class Leaderboard:
+    """Métricas de ownership de un snapshot con los órdenes descendentes precalculados"""
+
+    def __init__(self, df, snapshot_hash=None):
+        self.snapshot_hash = snapshot_hash or frame_hash(df)
+        self.has_projections = 'DK Projection' in df and 'FD Projection' in df
+        dk = df['DK Ownership'].to_numpy(dtype='float32', na_value=np.nan)
+        fd = df['FD Ownership'].to_numpy(dtype='float32', na_value=np.nan)
+        dk_price = df['DK Price'].to_numpy(dtype='float32', na_value=np.nan)
+        fd_price = df['FD Price'].to_numpy(dtype='float32', na_value=np.nan)
+
+        # Una sola pasada vectorizada sobre los arrays; el índice se renumera para que
+        # las posiciones de los órdenes coincidan con las etiquetas
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics = {
+                'Combined Ownership': dk + fd,
+                'Min Ownership': np.fmin(dk, fd),
+                'Ownership Spread': dk - fd,
+                'DK Own per $1k': np.where(dk_price > 0, dk / (dk_price / 1000), np.nan).astype('float32'),
+                'FD Own per $1k': np.where(fd_price > 0, fd / (fd_price / 1000), np.nan).astype('float32'),
+            }
+            if self.has_projections:
+                dk_proj = df['DK Projection'].to_numpy(dtype='float32', na_value=np.nan)
+                fd_proj = df['FD Projection'].to_numpy(dtype='float32', na_value=np.nan)
+                metrics.update({
+                    'DK Proj per Own': np.where(dk > 0, dk_proj / dk, np.nan).astype('float32'),
+                    'FD Proj per Own': np.where(fd > 0, fd_proj / fd, np.nan).astype('float32'),
+                    'DK Proj per $1k': np.where(dk_price > 0, dk_proj / (dk_price / 1000), np.nan).astype('float32'),
+                    'FD Proj per $1k': np.where(fd_price > 0, fd_proj / (fd_price / 1000), np.nan).astype('float32'),
+                })
+        self.frame = df.reset_index(drop=True).assign(**metrics)
+
+        # argsort estable del valor negado: descendente, empates en el orden original
+        # (igual que idxmax/nlargest) y los nulos al final
+        self._orders = {
+            metric: np.argsort(-self.frame[metric].to_numpy(dtype='float32', na_value=np.nan), kind='stable')
+            for metric in LEADERBOARD_METRICS + (LEVERAGE_METRICS if self.has_projections else ())
+        }
+
+    def __len__(self):
+        return len(self.frame)
+
+    def top(self, metric, n=10, columns=None):
+        """Top n jugadores por métrica (slice del orden precalculado)"""
+        rows = self.frame.take(self._orders[metric][:n])
+        return rows if columns is None else rows[columns]
+
+    def leader(self, metric):
+        """Jugador con el valor más alto de la métrica, como diccionario"""
+        return self.frame.iloc[self._orders[metric][0]].to_dict()
+
+    def leaders(self):
+        """Jugadores destacados de las tarjetas (max_dk, max_fd, max_combined, max_min)"""
+        return {key: self.leader(metric) for key, metric in LEADER_METRICS.items()}
+
+    def top_tables(self, n=10, tables=TOP_TABLES):
+        """Tablas de top n por categoría (top_dk, top_fd, top_combined, top_min por defecto)"""
+        return {key: self.top(metric, n, columns) for key, (metric, columns) in tables.items()}
+
+    def leverage_tables(self, n=10):
+        """Tablas de top n por leverage (LEVERAGE_TABLES); vacío si el frame no trae proyecciones"""
+        return self.top_tables(n, LEVERAGE_TABLES) if self.has_projections else {}
+
+
+_leaderboards = collections.OrderedDict()
+_leaderboards_lock = threading.Lock()
+
+
+def get_leaderboard(df):
+    """Leaderboard del snapshot, memoizado (LRU) por el hash de su contenido"""
+    snapshot_hash = frame_hash(df)
+    with _leaderboards_lock:
+        if snapshot_hash in _leaderboards:
+            _leaderboards.move_to_end(snapshot_hash)
+            return _leaderboards[snapshot_hash]
+    leaderboard = Leaderboard(df, snapshot_hash)
+    with _leaderboards_lock:
+        _leaderboards[snapshot_hash] = leaderboard
+        while len(_leaderboards) > LEADERBOARD_CACHE_SIZE:
+            _leaderboards.popitem(last=False)
+    return leaderboard
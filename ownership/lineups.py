@@ -0,0 +1,338 @@
+"""
+Generador de lineups con conciencia de ownership para DraftKings y FanDuel: candidatos
+muestreados y evaluados en lotes de arrays de NumPy, repartidos en un pool de procesos, y
+selección de los mejores bajo un techo de ownership acumulado, límites por equipo y exposición.
+"""
+import atexit
+import concurrent.futures
+import functools
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Reglas por deporte y sitio: tope salarial, slots con las posiciones elegibles y máximo de
+# jugadores por equipo. Los datos scrapeados no traen posiciones: si el frame no tiene una
+# columna Position (p. ej. desde el archivo de proyecciones) los slots se tratan como UTIL y
+# solo cuenta el tamaño del roster.
+PITCHER = ('P', 'SP', 'RP')
+HITTER = ('C', '1B', '2B', '3B', 'SS', 'OF')
+LINEUP_RULES = {
+    ('mlb', 'dk'): {
+        'salary_cap': 50000,
+        'slots': [('P', PITCHER), ('P', PITCHER), ('C', ('C',)), ('1B', ('1B',)), ('2B', ('2B',)),
+                  ('3B', ('3B',)), ('SS', ('SS',)), ('OF', ('OF',)), ('OF', ('OF',)), ('OF', ('OF',))],
+        'max_per_team': 5,
+    },
+    ('mlb', 'fd'): {
+        'salary_cap': 35000,
+        'slots': [('P', PITCHER), ('C/1B', ('C', '1B')), ('2B', ('2B',)), ('3B', ('3B',)), ('SS', ('SS',)),
+                  ('OF', ('OF',)), ('OF', ('OF',)), ('OF', ('OF',)), ('UTIL', HITTER)],
+        'max_per_team': 4,
+    },
+    ('nba', 'dk'): {
+        'salary_cap': 50000,
+        'slots': [('PG', ('PG',)), ('SG', ('SG',)), ('SF', ('SF',)), ('PF', ('PF',)), ('C', ('C',)),
+                  ('G', ('PG', 'SG')), ('F', ('SF', 'PF')), ('UTIL', ('PG', 'SG', 'SF', 'PF', 'C'))],
+        'max_per_team': 8,
+    },
+    ('nba', 'fd'): {
+        'salary_cap': 60000,
+        'slots': [('PG', ('PG',)), ('PG', ('PG',)), ('SG', ('SG',)), ('SG', ('SG',)), ('SF', ('SF',)),
+                  ('SF', ('SF',)), ('PF', ('PF',)), ('PF', ('PF',)), ('C', ('C',))],
+        'max_per_team': 4,
+    },
+}
+LINEUP_SITES = {'dk': 'DK', 'fd': 'FD'}
+LINEUP_BATCH_SIZE = 20000
+LINEUP_CANDIDATES = 200000
+LINEUP_WORKERS = min(4, os.cpu_count() or 1)
+# Máxima diferencia de log-peso (nats) que una penalización puede introducir entre el jugador más
+# bajo y el más alto: con techos inalcanzables el muestreo sigue siendo aleatorio
+LINEUP_MAX_PENALTY_SPREAD = 12.0
+
+
+def lineup_rules(sport, site):
+    """Reglas del deporte y sitio. ValueError con los pares soportados si no hay reglas"""
+    try:
+        return LINEUP_RULES[(sport, site)]
+    except KeyError:
+        supported = ', '.join(f"{rule_sport}/{rule_site}" for rule_sport, rule_site in LINEUP_RULES)
+        raise ValueError(f"No hay reglas de lineup para {sport}/{site}. Soportados: {supported}") from None
+
+
+def lineup_sites(sport):
+    """Sitios con reglas de lineup para el deporte (vacío si el generador no lo soporta)"""
+    return {site: prefix for site, prefix in LINEUP_SITES.items() if (sport, site) in LINEUP_RULES}
+
+
+def lineup_player_pool(df, sport, site, score_column=None):
+    """
+    Arrays de los jugadores elegibles para el sitio: precio, ownership, score, equipo y la matriz
+    de elegibilidad por slot. score_column por defecto es la proyección del sitio si el frame la
+    trae y, si no, el precio en miles (el salario como aproximación de la proyección).
+    """
+    rules = lineup_rules(sport, site)
+    prefix = LINEUP_SITES[site]
+    players = df[df[f'{prefix} Price'].notna()].reset_index(drop=True)
+    if len(players) < len(rules['slots']):
+        raise ValueError(f"Hay {len(players)} jugadores con precio en {prefix}; un lineup necesita {len(rules['slots'])}")
+    if score_column is None:
+        score_column = f'{prefix} Projection' if f'{prefix} Projection' in players else f'{prefix} Price'
+    score = players[score_column].to_numpy(dtype='float32', na_value=np.nan)
+    if score_column.endswith('Price'):
+        score = score / 1000
+
+    if 'Position' in players:
+        positions = players['Position'].astype('string').fillna('').str.upper().str.split('/')
+        eligibility = np.array([
+            [bool(set(player_positions) & set(eligible)) for player_positions in positions]
+            for _, eligible in rules['slots']
+        ], dtype=bool).reshape(len(rules['slots']), len(players))
+        slot_names = [name for name, _ in rules['slots']]
+    else:
+        eligibility = np.ones((len(rules['slots']), len(players)), dtype=bool)
+        slot_names = ['UTIL'] * len(rules['slots'])
+
+    teams, team_ids = np.unique(players['Team'].astype(str).to_numpy(), return_inverse=True)
+    return {
+        'players': players['Player'].astype(str).to_numpy(),
+        'teams': teams,
+        'team_ids': team_ids.astype(np.int32),
+        'salary': players[f'{prefix} Price'].to_numpy(dtype='float32', na_value=np.nan),
+        'ownership': np.nan_to_num(players[f'{prefix} Ownership'].to_numpy(dtype='float32', na_value=np.nan)),
+        'score': np.nan_to_num(score, nan=0.0),
+        'eligibility': eligibility,
+        'slot_names': slot_names,
+        'salary_cap': rules['salary_cap'],
+    }
+
+
+def slot_groups(eligibility):
+    """Agrupa los slots con la misma elegibilidad (p. ej. los tres OF), de más a menos restrictivos"""
+    groups = {}
+    for slot, eligible in enumerate(eligibility):
+        groups.setdefault(eligible.tobytes(), (eligible, []))[1].append(slot)
+    return sorted(groups.values(), key=lambda group: group[0].sum())
+
+
+def fit_penalty(logits, values, n_slots, target):
+    """
+    Penalización por unidad de values (bisección) para que el lineup esperado con esos log-pesos
+    sume target; 0 si ya queda por debajo y acotada por LINEUP_MAX_PENALTY_SPREAD
+    """
+    def expected(penalty):
+        shifted = logits - penalty * values
+        p = np.exp(shifted - shifted.max())
+        return n_slots * (p * values).sum() / p.sum()
+
+    span = values.max() - values.min()
+    if not span or expected(0.0) <= target:
+        return 0.0
+    low, high = 0.0, LINEUP_MAX_PENALTY_SPREAD / span
+    if expected(high) > target:
+        return high
+    for _ in range(40):
+        middle = (low + high) / 2
+        if expected(middle) > target:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def sampling_weights(pool, temperature=1.0, ownership_ceiling=None):
+    """
+    Log-pesos de muestreo: score relativo, penalizado por ownership (con techo) y por salario para
+    que el lineup esperado quede en el 90% del techo y del tope salarial. Sin esto, con techos
+    ajustados casi ningún candidato sería válido.
+    """
+    n_slots = pool['eligibility'].shape[0]
+    logits = np.log(np.maximum(pool['score'] - pool['score'].min(), 0) + 1e-3).astype('float64') / temperature
+    if ownership_ceiling is not None:
+        ownership = pool['ownership'].astype('float64')
+        logits -= fit_penalty(logits, ownership, n_slots, 0.9 * ownership_ceiling) * ownership
+    salary = np.nan_to_num(pool['salary'].astype('float64'))
+    logits -= fit_penalty(logits, salary, n_slots, 0.9 * pool['salary_cap']) * salary
+    return logits.astype('float32')
+
+
+def sample_lineups(pool, size, rng, weights):
+    """
+    Muestrea size lineups sin jugadores repetidos según los log-pesos, por grupo de slots y todo el
+    lote a la vez: claves log(U)/w (Efraimidis-Spirakis, equivalente al top-k con ruido de Gumbel)
+    y un argmax por slot, más barato que ordenar con k de 1 a 3. Devuelve (lineups, válidos), donde
+    lineups es un array (size, slots) de posiciones en el pool.
+    """
+    n_players = len(pool['players'])
+    scale = np.exp(weights.max() - weights).astype('float32')
+    lineups = np.zeros((size, pool['eligibility'].shape[0]), dtype=np.int32)
+    taken = np.zeros((size, n_players), dtype=bool)
+    seen = np.zeros(n_players, dtype=bool)
+    valid = np.ones(size, dtype=bool)
+    rows = np.arange(size)
+    for eligible, slots in slot_groups(pool['eligibility']):
+        candidates = np.flatnonzero(eligible)
+        if len(candidates) < len(slots):
+            valid[:] = False
+            continue
+        keys = rng.random((size, len(candidates)), dtype=np.float32)
+        with np.errstate(divide='ignore'):
+            np.log(keys, out=keys)
+        keys *= scale[candidates]
+        # Solo hace falta excluir a los ya elegidos si el grupo comparte jugadores con uno anterior
+        if (eligible & seen).any():
+            keys[taken[:, candidates]] = -np.inf
+        for slot in slots:
+            top = keys.argmax(axis=1)
+            valid &= np.isfinite(keys[rows, top])
+            keys[rows, top] = -np.inf
+            chosen = candidates[top]
+            lineups[:, slot] = chosen
+            taken[rows, chosen] = True
+        seen |= eligible
+    return lineups, valid
+
+
+def team_counts(pool, lineups):
+    """Jugadores de cada equipo en cada lineup (lineups x equipos), con un solo bincount sobre (fila, equipo)"""
+    n_teams = len(pool['teams'])
+    flat = np.arange(len(lineups))[:, None] * n_teams + pool['team_ids'][lineups]
+    return np.bincount(flat.ravel(), minlength=len(lineups) * n_teams).reshape(len(lineups), n_teams)
+
+
+def lineup_hashes(lineups, n_players):
+    """
+    Hash de 64 bits del conjunto de jugadores de cada lineup: XOR de una clave aleatoria fija por
+    jugador, así el mismo conjunto en otro orden de slots da el mismo hash sin ordenar filas
+    """
+    player_keys = np.random.default_rng(0).integers(0, 2**63, n_players, dtype=np.uint64)
+    return np.bitwise_xor.reduce(player_keys[lineups], axis=1)
+
+
+def score_lineups(pool, lineups, valid, ownership_ceiling=None, max_per_team=None, min_stack=None,
+                  min_salary=None):
+    """
+    Salario, ownership acumulado, score y equipo del stack de cada lineup, y la máscara de lineups
+    que cumplen el tope salarial, el techo de ownership, el máximo por equipo, el stack mínimo y
+    al menos dos equipos.
+    """
+    salary = pool['salary'][lineups].sum(axis=1)
+    ownership = pool['ownership'][lineups].sum(axis=1)
+    score = pool['score'][lineups].sum(axis=1)
+
+    counts = team_counts(pool, lineups)
+    largest_team = counts.max(axis=1)
+
+    ok = valid & (salary <= pool['salary_cap']) & ((counts > 0).sum(axis=1) >= 2)
+    if min_salary is not None:
+        ok &= salary >= min_salary
+    if ownership_ceiling is not None:
+        ok &= ownership <= ownership_ceiling
+    if max_per_team is not None:
+        ok &= largest_team <= max_per_team
+    if min_stack is not None:
+        ok &= largest_team >= min_stack
+    return {'salary': salary, 'ownership': ownership, 'score': score, 'stack': counts.argmax(axis=1), 'ok': ok}
+
+
+def generate_batch(pool, size, seed, weights, **constraints):
+    """Un lote completo (se ejecuta en los procesos del pool): lineups válidos y su score"""
+    rng = np.random.default_rng(seed)
+    lineups, valid = sample_lineups(pool, size, rng, weights)
+    scored = score_lineups(pool, lineups, valid, **constraints)
+    ok = scored['ok']
+    return lineups[ok], scored['score'][ok]
+
+
+@functools.lru_cache(maxsize=None)
+def get_lineup_executor(workers=LINEUP_WORKERS):
+    """Pool de procesos único por cantidad de workers ("spawn": el dashboard corre con hilos)"""
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    atexit.register(executor.shutdown, wait=False, cancel_futures=True)
+    return executor
+
+
+def select_lineups(lineups, scores, n_lineups, n_players, max_exposure=1.0):
+    """
+    Los mejores n_lineups distintos por score sin que ningún jugador supere max_exposure
+    (fracción de los lineups en los que puede aparecer)
+    """
+    # Mismo conjunto de jugadores en otro orden de slots = mismo lineup
+    _, unique = np.unique(lineup_hashes(lineups, n_players), return_index=True)
+    order = unique[np.argsort(-scores[unique], kind='stable')]
+    limit = max(1, int(max_exposure * n_lineups))
+    if limit >= n_lineups:
+        return order[:n_lineups]
+    usage = np.zeros(n_players, dtype=np.int32)
+    selected = []
+    for i in order:
+        if (usage[lineups[i]] < limit).all():
+            usage[lineups[i]] += 1
+            selected.append(i)
+            if len(selected) == n_lineups:
+                break
+    return np.array(selected, dtype=np.int64)
+
+
+def generate_lineups(df, sport, site="dk", n_lineups=1000, ownership_ceiling=None, max_per_team=None,
+                     min_stack=None, max_exposure=1.0, min_salary=None, score_column=None,
+                     candidates=LINEUP_CANDIDATES, batch_size=LINEUP_BATCH_SIZE, workers=LINEUP_WORKERS,
+                     temperature=1.0, seed=None):
+    """
+    Genera hasta n_lineups lineups válidos para el sitio ("dk" o "fd") que maximizan el score.
+    ownership_ceiling: máximo de ownership acumulado del lineup (suma de porcentajes).
+    max_per_team: máximo de jugadores de un equipo (por defecto, el de las reglas del sitio).
+    min_stack: mínimo de jugadores del equipo más representado (stack).
+    max_exposure: fracción máxima de lineups en los que puede aparecer un jugador.
+    candidates: lineups a muestrear en total, en lotes de batch_size repartidos en workers procesos
+    (workers=1 = en este proceso).
+    temperature: más alta = candidatos más variados, más baja = más concentrados en el mejor score.
+    Devuelve un DataFrame con un lineup por fila (jugadores por slot, Salary, Ownership, Score y
+    equipo del stack); attrs['stats'] lleva candidatos, válidos y segundos.
+    """
+    start = time.perf_counter()
+    pool = lineup_player_pool(df, sport, site, score_column)
+    constraints = {
+        'ownership_ceiling': ownership_ceiling,
+        'max_per_team': max_per_team or lineup_rules(sport, site)['max_per_team'],
+        'min_stack': min_stack,
+        'min_salary': min_salary,
+    }
+    seeds = np.random.SeedSequence(seed).spawn(max(1, -(-candidates // batch_size)))
+    weights = sampling_weights(pool, temperature, ownership_ceiling)
+    jobs = [(pool, batch_size, child, weights) for child in seeds]
+
+    if workers > 1 and len(jobs) > 1:
+        futures = [get_lineup_executor(workers).submit(generate_batch, *job, **constraints) for job in jobs]
+        results = [future.result() for future in futures]
+    else:
+        results = [generate_batch(*job, **constraints) for job in jobs]
+
+    lineups = np.concatenate([lineups for lineups, _ in results])
+    scores = np.concatenate([scores for _, scores in results])
+    selected = select_lineups(lineups, scores, n_lineups, len(pool['players']), max_exposure)
+    chosen = lineups[selected].reshape(len(selected), len(pool['slot_names']))
+
+    columns = {}
+    for slot, name in enumerate(pool['slot_names']):
+        label = name if pool['slot_names'].count(name) == 1 else f"{name}{pool['slot_names'][:slot + 1].count(name)}"
+        columns[label] = pool['players'][chosen[:, slot]]
+    scored = score_lineups(pool, chosen, np.ones(len(chosen), dtype=bool))
+    result = pd.DataFrame(columns).assign(
+        Salary=scored['salary'].astype('int32'),
+        Ownership=scored['ownership'],
+        Score=scored['score'],
+        Stack=pool['teams'][scored['stack']],
+    )
+    result.attrs['stats'] = {
+        'candidates': len(jobs) * batch_size,
+        'valid': len(lineups),
+        'lineups': len(result),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    return result
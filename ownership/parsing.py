@@ -0,0 +1,337 @@
+"""
+Lectura de datos de ownership sin navegador: contrato DOM de la tabla, payloads JSON
+(de la red o incrustados en la página) y el backend HTTP. Solo usa la biblioteca estándar.
+"""
+import gzip
+import json
+import re
+import urllib.parse
+import urllib.request
+from html.parser import HTMLParser
+
+from ownership.config import OWNERSHIP_SLATE_PARAM
+
+# Selectores del contrato DOM de la tabla de ownership
+ROW_SELECTOR = "div[data-testid='ownershipPlayerRow']"
+PLAYER_SELECTOR = "div[data-testid='ownershipPlayer']"
+TEAM_SELECTOR = "div[data-testid='ownershipPlayerTeam']"
+DK_PRICE_SELECTOR = "div[data-testid='ownershipPlayerDkPrice']"
+DK_OWNERSHIP_SELECTOR = "div[data-testid='ownershipPlayerDkOwnership']"
+FD_PRICE_SELECTOR = "div[data-testid='ownershipPlayerFdPrice']"
+FD_OWNERSHIP_SELECTOR = "div[data-testid='ownershipPlayerFdOwnership']"
+# Opciones del selector de slates: el id del slate va en data-slate (o en el parámetro slate de
+# su enlace o en value) y el nombre visible como texto; la opción activa lleva aria-selected
+SLATE_OPTION_SELECTOR = "[data-testid='ownershipSlateOption']"
+
+# Claves (normalizadas: minúsculas y solo alfanuméricos) que identifican cada columna en un payload JSON
+PAYLOAD_PLAYER_KEYS = {'player', 'playername', 'name', 'fullname', 'displayname'}
+PAYLOAD_TEAM_KEYS = {'team', 'teamabbr', 'teamabbrev', 'teamabbreviation', 'teamname', 'teamcode'}
+PAYLOAD_SITE_PREFIXES = {'DK': ('dk', 'draftkings'), 'FD': ('fd', 'fanduel')}
+# Sufijos exactos de cada columna por sitio ('dksalary', 'fanduelownership'); se prefieren a las
+# coincidencias parciales, que ignoran las proyecciones ('dkProjectedOwnership')
+PAYLOAD_PRICE_SUFFIXES = ('salary', 'price')
+PAYLOAD_OWNERSHIP_SUFFIXES = ('ownership', 'own', 'ownpct')
+PAYLOAD_EXCLUDED_WORDS = ('proj',)
+# Registros de cada lista que se miran para reconocer las columnas (el primero puede venir incompleto)
+PAYLOAD_SAMPLE_ITEMS = 5
+
+
+def normalize_payload_key(key):
+    return ''.join(ch for ch in str(key).lower() if ch.isalnum())
+
+
+def flatten_payload_item(item, prefix=''):
+    """Aplana un objeto JSON anidado concatenando claves normalizadas ({'dk': {'salary': 1}} -> 'dksalary')"""
+    flat = {}
+    for key, value in item.items():
+        flat_key = prefix + normalize_payload_key(key)
+        if isinstance(value, dict):
+            flat.update(flatten_payload_item(value, flat_key))
+        else:
+            flat[flat_key] = value
+    return flat
+
+
+def match_payload_columns(flat_item):
+    """Asocia las claves de un registro aplanado con las columnas del esquema. None si falta alguna"""
+    columns = {}
+    for key in flat_item:
+        if key in PAYLOAD_PLAYER_KEYS:
+            columns.setdefault('Player', key)
+        elif key in PAYLOAD_TEAM_KEYS:
+            columns.setdefault('Team', key)
+    for site, prefixes in PAYLOAD_SITE_PREFIXES.items():
+        for column, suffixes in ((f'{site} Price', PAYLOAD_PRICE_SUFFIXES),
+                                 (f'{site} Ownership', PAYLOAD_OWNERSHIP_SUFFIXES)):
+            exact = [prefix + suffix for suffix in suffixes for prefix in prefixes]
+            key = next((key for key in exact if key in flat_item), None)
+            if key is None:
+                key = next((key for key in flat_item
+                            if key.startswith(prefixes) and any(suffix in key for suffix in suffixes)
+                            and not any(word in key for word in PAYLOAD_EXCLUDED_WORDS)), None)
+            if key is not None:
+                columns[column] = key
+    required = ('Team', 'Player', 'DK Price', 'DK Ownership', 'FD Price', 'FD Ownership')
+    if not all(column in columns for column in required):
+        return None
+    return columns
+
+
+def format_payload_price(value):
+    """Devuelve el precio con el mismo formato que muestra la página ("$5,400")"""
+    if isinstance(value, (int, float)):
+        return f"${int(value):,}"
+    return str(value).strip()
+
+
+def format_payload_ownership(value):
+    """Devuelve el ownership con el mismo formato que muestra la página ("12.5%")"""
+    if isinstance(value, (int, float)):
+        return f"{value}%"
+    value = str(value).strip()
+    return value if value.endswith('%') else f"{value}%"
+
+
+def find_payload_lists(payload):
+    """Recorre el JSON y devuelve todas las listas de objetos que contiene"""
+    found = []
+    pending = [payload]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            if node and all(isinstance(item, dict) for item in node):
+                found.append(node)
+            pending.extend(node)
+        elif isinstance(node, dict):
+            pending.extend(node.values())
+    return found
+
+
+def records_from_payload(payload):
+    """
+    Busca en un payload JSON la lista de jugadores de la tabla de ownership y la convierte
+    al esquema Team/Player/DK Price/DK Ownership/FD Price/FD Ownership. None si no la encuentra.
+    """
+    best = None
+    for candidate in find_payload_lists(payload):
+        flat_items = [flatten_payload_item(item) for item in candidate]
+        sample_keys = dict.fromkeys(key for flat in flat_items[:PAYLOAD_SAMPLE_ITEMS] for key in flat)
+        columns = match_payload_columns(sample_keys)
+        if columns is None:
+            continue
+
+        records = []
+        seen = set()
+        for flat in flat_items:
+            if any(flat.get(key) is None for key in columns.values()):
+                continue
+            player = str(flat[columns['Player']]).strip()
+            if player in seen:
+                continue
+            seen.add(player)
+            records.append({
+                'Team': str(flat[columns['Team']]).replace(" logo", ""),
+                'Player': player,
+                'DK Price': format_payload_price(flat[columns['DK Price']]),
+                'DK Ownership': format_payload_ownership(flat[columns['DK Ownership']]),
+                'FD Price': format_payload_price(flat[columns['FD Price']]),
+                'FD Ownership': format_payload_ownership(flat[columns['FD Ownership']])
+            })
+        if records and (best is None or len(records) > len(best)):
+            best = records
+    return best
+
+
+# Backend HTTP: descarga la página sin navegador y busca los datos en el JSON incrustado
+# (<script type="application/json">, window.__STATE__ = {...}, load({...})) o en las
+# filas renderizadas en el servidor. Cuesta unos pocos MB y milisegundos cuando el sitio lo permite.
+HTTP_FETCH_TIMEOUT = 10
+HTTP_RETRY_AFTER_MINUTES = 60
+HTTP_HEADERS = {
+    'User-Agent': "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/124.0 Safari/537.36",
+    'Accept': "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+    'Accept-Encoding': "gzip",
+}
+
+JSON_SCRIPT_RE = re.compile(
+    r'<script[^>]*type=["\']application/(?:ld\+)?json["\'][^>]*>(.*?)</script>', re.S | re.I
+)
+INLINE_SCRIPT_RE = re.compile(r'<script(?![^>]*\bsrc=)[^>]*>(.*?)</script>', re.S | re.I)
+# Posibles inicios de un literal JSON dentro de un script: tras "=", "(" o ":"
+JSON_LITERAL_START_RE = re.compile(r'[=(:]\s*(?=[\[{])')
+
+
+def selector_testid(selector):
+    """data-testid de un selector CSS del contrato DOM"""
+    return re.search(r"data-testid='([^']+)'", selector).group(1)
+
+
+ROW_TESTID = selector_testid(ROW_SELECTOR)
+TEAM_TESTID = selector_testid(TEAM_SELECTOR)
+ROW_FIELD_TESTIDS = {
+    selector_testid(PLAYER_SELECTOR): 'Player',
+    selector_testid(DK_PRICE_SELECTOR): 'DK Price',
+    selector_testid(DK_OWNERSHIP_SELECTOR): 'DK Ownership',
+    selector_testid(FD_PRICE_SELECTOR): 'FD Price',
+    selector_testid(FD_OWNERSHIP_SELECTOR): 'FD Ownership',
+}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+
+class OwnershipRowParser(HTMLParser):
+    """Lee las filas de ownership renderizadas en el servidor con el mismo contrato que readRow"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.records = []
+        self._seen = set()
+        self._open = []
+        self._row = None
+        self._field = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'img':
+            if self._row is not None and TEAM_TESTID in self._open:
+                self._row['Team'] = (attrs.get('alt') or '').replace(' logo', '')
+            return
+        if tag in VOID_TAGS:
+            return
+        testid = attrs.get('data-testid')
+        self._open.append(testid)
+        if testid == ROW_TESTID:
+            self._row = dict.fromkeys(['Team'] + list(ROW_FIELD_TESTIDS.values()))
+        elif self._row is not None and testid in ROW_FIELD_TESTIDS:
+            self._field = ROW_FIELD_TESTIDS[testid]
+            self._row[self._field] = ''
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS or not self._open:
+            return
+        testid = self._open.pop()
+        if self._field and ROW_FIELD_TESTIDS.get(testid) == self._field:
+            self._row[self._field] = self._row[self._field].strip()
+            self._field = None
+        elif testid == ROW_TESTID and self._row is not None:
+            row, self._row = self._row, None
+            if all(value is not None for value in row.values()) and row['Player'] not in self._seen:
+                self._seen.add(row['Player'])
+                self.records.append(row)
+
+    def handle_data(self, data):
+        if self._field:
+            self._row[self._field] += data
+
+
+def iter_embedded_json(html):
+    """Objetos JSON incrustados en la página: scripts JSON y literales dentro de scripts inline"""
+    for body in JSON_SCRIPT_RE.findall(html):
+        try:
+            yield json.loads(body)
+        except ValueError:
+            continue
+    decoder = json.JSONDecoder()
+    for body in INLINE_SCRIPT_RE.findall(html):
+        position = 0
+        for match in JSON_LITERAL_START_RE.finditer(body):
+            if match.end() < position:
+                continue
+            try:
+                value, position = decoder.raw_decode(body, match.end())
+            except ValueError:
+                continue
+            yield value
+
+
+def records_from_html(html):
+    """Registros de ownership de una página HTML sin ejecutar JavaScript, o None"""
+    best = None
+    for payload in iter_embedded_json(html):
+        records = records_from_payload(payload)
+        if records and (best is None or len(records) > len(best)):
+            best = records
+    if best:
+        return best
+
+    parser = OwnershipRowParser()
+    parser.feed(html)
+    parser.close()
+    return parser.records or None
+
+
+SLATE_OPTION_TESTID = selector_testid(SLATE_OPTION_SELECTOR)
+
+
+def slate_option_id(attrs, param=OWNERSHIP_SLATE_PARAM):
+    """Id del slate de una opción del selector, o None si no lo indica"""
+    if attrs.get('data-slate'):
+        return attrs['data-slate']
+    if attrs.get('href'):
+        values = urllib.parse.parse_qs(urllib.parse.urlsplit(attrs['href']).query).get(param)
+        if values:
+            return values[0]
+    return attrs.get('value') or None
+
+
+class SlateOptionParser(HTMLParser):
+    """Lee las opciones del selector de slates renderizadas en el servidor"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.slates = []
+        self._option = None
+        self._depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        if self._option is not None:
+            self._depth += 1
+            return
+        attrs = dict(attrs)
+        if attrs.get('data-testid') != SLATE_OPTION_TESTID:
+            return
+        self._option = {
+            'slate': slate_option_id(attrs),
+            'label': '',
+            'selected': attrs.get('aria-selected') == 'true' or 'selected' in attrs,
+        }
+        self._depth = 0
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS or self._option is None:
+            return
+        if self._depth:
+            self._depth -= 1
+            return
+        option, self._option = self._option, None
+        option['label'] = ' '.join(option['label'].split())
+        if option['slate'] is not None:
+            self.slates.append(option)
+
+    def handle_data(self, data):
+        if self._option is not None:
+            self._option['label'] += data
+
+
+def slates_from_html(html):
+    """
+    Opciones del selector de slates de una página HTML sin ejecutar JavaScript: lista de
+    {'slate', 'label', 'selected'} en el orden de la página (vacía si no hay selector)
+    """
+    parser = SlateOptionParser()
+    parser.feed(html)
+    parser.close()
+    return parser.slates
+
+
+def http_get(url, timeout=HTTP_FETCH_TIMEOUT):
+    """Descarga url y devuelve el cuerpo como texto"""
+    request = urllib.request.Request(url, headers=HTTP_HEADERS)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        body = response.read()
+        if response.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        charset = response.headers.get_content_charset() or 'utf-8'
+    return body.decode(charset, errors='replace')
@@ -0,0 +1,125 @@
+"""Prefetch en segundo plano del último snapshot de cada deporte."""
+import concurrent.futures
+import functools
+import threading
+import time
+from datetime import datetime, timedelta
+
+from ownership.config import SCRAPE_JOB_TIMEOUT, SCRAPE_MAX_WORKERS, SPORTS
+from ownership.scrape import coalesced_scrape
+from ownership.store import latest_snapshot
+
+# Prefetch en segundo plano: refresca cada deporte según su intervalo y antes de cada lock
+PREFETCH_ENABLED = True
+PREFETCH_TICK_SECONDS = 30
+PREFETCH_LOCK_LEAD_MINUTES = 15
+
+
+class PrefetchScheduler:
+    """
+    Refresca en segundo plano los deportes configurados y publica el último snapshot completo
+    de cada uno, para que las páginas lo sirvan al instante sin esperar un scrape.
+    """
+
+    def __init__(self, sports=None, tick_seconds=PREFETCH_TICK_SECONDS):
+        self.sports = dict(sports or SPORTS)
+        self.tick_seconds = tick_seconds
+        self._results = {}
+        self._status = {sport: {'state': 'idle', 'started_at': None, 'error': None} for sport in self.sports}
+        self._next_run = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=SCRAPE_MAX_WORKERS)
+        self._thread = None
+
+        # Sembrar con el último snapshot guardado para servir datos incluso tras un reinicio
+        for sport in self.sports:
+            try:
+                stored = latest_snapshot(sport)
+            except Exception:
+                stored = None
+            if stored is not None and not stored.empty:
+                captured_at = stored['Captured At'].iloc[0].to_pydatetime()
+                self._results[sport] = {
+                    'data': stored.drop(columns=['Snapshot Id', 'Captured At']),
+                    'captured_at': captured_at
+                }
+                self._next_run[sport] = self.next_refresh(sport, captured_at)
+
+    def next_refresh(self, sport, after):
+        """Próximo refresco: el intervalo del deporte o, si llega antes, el aviso previo a un lock"""
+        config = self.sports[sport]
+        next_run = after + timedelta(minutes=config.get('refresh_minutes', 60))
+        lead = timedelta(minutes=PREFETCH_LOCK_LEAD_MINUTES)
+        for lock_time in config.get('lock_times', []):
+            hour, minute = (int(part) for part in lock_time.split(':'))
+            for day_offset in (0, 1):
+                lock_at = (after + timedelta(days=day_offset)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+                if after < lock_at - lead < next_run:
+                    next_run = lock_at - lead
+        return next_run
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="prefetch", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            now = datetime.now()
+            for sport in self.sports:
+                try:
+                    if now >= self._next_run.get(sport, now):
+                        self.refresh_now(sport)
+                except Exception:
+                    pass
+            time.sleep(self.tick_seconds)
+
+    def refresh_now(self, sport):
+        """Encola un refresco del deporte si no hay uno en curso"""
+        with self._lock:
+            if self._status[sport]['state'] == 'running':
+                return False
+            self._status[sport] = {'state': 'running', 'started_at': datetime.now(), 'error': None}
+            # Evitar que el loop lo vuelva a encolar mientras corre
+            self._next_run[sport] = datetime.max
+        self._executor.submit(self._refresh, sport)
+        return True
+
+    def _refresh(self, sport):
+        error = None
+        try:
+            # Si una sesión ya está scrapeando el deporte, el refresco se une a ese scrape
+            df = coalesced_scrape(sport, max_age=0, job_timeout=SCRAPE_JOB_TIMEOUT)
+            if df is None:
+                error = "El scrape no devolvió datos"
+            else:
+                self.publish(sport, df)
+        except Exception as e:
+            error = str(e)
+        with self._lock:
+            self._status[sport] = {'state': 'failed' if error else 'idle', 'started_at': None, 'error': error}
+            self._next_run[sport] = self.next_refresh(sport, datetime.now())
+
+    def publish(self, sport, df, captured_at=None):
+        """Publica un snapshot completo del deporte (también lo usan los scrapes manuales)"""
+        with self._lock:
+            self._results[sport] = {'data': df, 'captured_at': captured_at or datetime.now()}
+
+    def latest(self, sport):
+        """Último snapshot publicado: {'data': DataFrame, 'captured_at': datetime} o None"""
+        with self._lock:
+            return self._results.get(sport)
+
+    def status(self, sport):
+        """Estado del refresco: {'state': idle|running|failed, 'started_at', 'error'} y próximo refresco"""
+        with self._lock:
+            return dict(self._status[sport], next_run=self._next_run.get(sport))
+
+
+@functools.lru_cache(maxsize=None)
+def get_prefetch_scheduler():
+    """Scheduler único por proceso; se arranca con la primera página que se abre"""
+    scheduler = PrefetchScheduler()
+    if PREFETCH_ENABLED:
+        scheduler.start()
+    return scheduler
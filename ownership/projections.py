@@ -0,0 +1,257 @@
+"""
+Cruce de proyecciones propias con el ownership scrapeado: índice precalculado de nombres
+normalizados (sin acentos, puntos, sufijos ni iniciales separadas) y equipo, con respaldo difuso
+para los nombres que no coinciden exactamente.
+"""
+import collections
+import difflib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ownership.schema import frame_hash
+
+# Nombres de columna aceptados en los archivos de proyecciones (sin distinguir mayúsculas)
+PROJECTION_COLUMN_ALIASES = {
+    'player': 'Player', 'name': 'Player', 'player name': 'Player', 'jugador': 'Player',
+    'team': 'Team', 'tm': 'Team', 'equipo': 'Team',
+    'sport': 'Sport', 'deporte': 'Sport',
+    'slate': 'Slate',
+    'position': 'Position', 'pos': 'Position', 'posicion': 'Position',
+    'projection': 'Projection', 'proj': 'Projection', 'fpts': 'Projection', 'points': 'Projection',
+    'dk projection': 'DK Projection', 'dk proj': 'DK Projection', 'dk fpts': 'DK Projection',
+    'fd projection': 'FD Projection', 'fd proj': 'FD Projection', 'fd fpts': 'FD Projection',
+}
+PROJECTION_COLUMNS = ('DK Projection', 'FD Projection')
+NAME_SUFFIXES_RE = r'\b(?:jr|sr|ii|iii|iv|v)\b'
+PROJECTION_FUZZY_CUTOFF = 0.88
+PROJECTION_CACHE_SIZE = 8
+
+# Orden de los métodos de cruce, del más estricto al más permisivo
+MATCH_METHODS = ('exact', 'name', 'initial', 'fuzzy')
+# Jugadores sin cruce porque su clave aparece en varias filas distintas del archivo (p. ej. el
+# mismo jugador en varios slates con proyecciones distintas): no se elige una al azar
+MATCH_AMBIGUOUS = 'ambiguous'
+
+
+def normalize_names(names):
+    """'José Ramírez Jr.' -> 'jose ramirez', 'J. D. Martinez' -> 'jd martinez' (vectorizado)"""
+    return (
+        names.astype('string')
+        .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+        .str.lower()
+        .str.replace(r"[.'’`]", '', regex=True)
+        .str.replace(r'[^a-z0-9]+', ' ', regex=True)
+        .str.replace(NAME_SUFFIXES_RE, ' ', regex=True)
+        .str.replace(r'\b([a-z]) (?=[a-z]\b)', r'\1', regex=True)
+        .str.split().str.join(' ')
+        .fillna('')
+    )
+
+
+def normalize_teams(teams):
+    return teams.astype('string').str.upper().str.replace(r'[^A-Z0-9]', '', regex=True).fillna('')
+
+
+def initial_keys(names):
+    """'jose ramirez' -> 'j ramirez': primera inicial y apellido"""
+    return names.str[:1] + ' ' + names.str.split().str[-1].fillna('')
+
+
+def unique_key_index(keys):
+    """Posición de cada clave única; las claves repetidas son ambiguas y se descartan"""
+    keys = pd.Series(keys).reset_index(drop=True)
+    unique = ~keys.duplicated(keep=False) & (keys != '')
+    return pd.Series(np.flatnonzero(unique), index=pd.Index(keys[unique]))
+
+
+def ambiguous_keys(keys):
+    """Claves que aparecen en más de una fila"""
+    keys = pd.Series(keys)
+    return set(keys[keys.duplicated() & (keys != '')])
+
+
+def normalize_slates(slates):
+    return slates.astype('string').str.strip().str.lower().fillna('')
+
+
+def projection_slates(projections):
+    """Slates distintos del archivo de proyecciones, en orden de aparición (vacío sin columna Slate)"""
+    if 'Slate' not in projections:
+        return []
+    return list(projections['Slate'].dropna().astype(str).str.strip().drop_duplicates())
+
+
+def lookup_keys(index, keys):
+    """Posiciones de keys en el índice (-1 si no están)"""
+    if index.empty:
+        return np.full(len(keys), -1)
+    found = index.index.get_indexer(pd.Index(keys))
+    return np.where(found >= 0, index.to_numpy()[np.maximum(found, 0)], -1)
+
+
+def load_projections(source, name=None, sport=None, slate=None):
+    """
+    Lee un archivo de proyecciones (CSV o Parquet, por ruta o archivo abierto) con al menos el
+    jugador y una proyección. Si no hay proyecciones por sitio se usa la genérica para ambos.
+    Con sport y una columna Sport, se queda solo con las filas de ese deporte; con slate (id o
+    nombre, o una lista de alias) y una columna Slate, solo con las de ese slate.
+    """
+    name = name or (source if isinstance(source, str) else getattr(source, 'name', ''))
+    if os.path.splitext(name)[1].lower() in ('.parquet', '.pq'):
+        projections = pd.read_parquet(source)
+    else:
+        projections = pd.read_csv(source)
+    projections = projections.rename(columns=lambda column: PROJECTION_COLUMN_ALIASES.get(
+        str(column).strip().lower(), column
+    ))
+
+    available = [column for column in ('Projection',) + PROJECTION_COLUMNS if column in projections]
+    if 'Player' not in projections or not available:
+        raise ValueError("El archivo de proyecciones necesita una columna de jugador y una de proyección")
+    for column in available:
+        projections[column] = pd.to_numeric(projections[column], errors='coerce').astype('float32')
+    for column in PROJECTION_COLUMNS:
+        if column not in projections:
+            projections[column] = projections[available[0]]
+    if sport and 'Sport' in projections:
+        projections = projections[projections['Sport'].astype('string').str.lower() == sport.lower()]
+    if slate and 'Slate' in projections:
+        aliases = [slate] if isinstance(slate, str) else [alias for alias in slate if alias]
+        projections = projections[normalize_slates(projections['Slate']).isin(normalize_slates(pd.Series(aliases)))]
+    return projections.reset_index(drop=True)
+
+
+class ProjectionIndex:
+    """
+    Claves normalizadas de un archivo de proyecciones, calculadas una sola vez. Las filas repetidas
+    con los mismos valores (p. ej. un jugador con igual proyección en varios slates) cuentan una vez.
+    """
+
+    def __init__(self, projections):
+        values = [column for column in ('Player', 'Team', 'Position') + PROJECTION_COLUMNS if column in projections]
+        self.projections = projections.drop_duplicates(subset=values).reset_index(drop=True)
+        self.names = normalize_names(self.projections['Player'])
+        teams = normalize_teams(self.projections['Team']) if 'Team' in self.projections else ''
+        self.teams = teams if isinstance(teams, pd.Series) else pd.Series('', index=self.names.index)
+        keys = {
+            'exact': self.names + '|' + self.teams,
+            'name': self.names,
+            'initial': initial_keys(self.names) + '|' + self.teams,
+        }
+        self._indexes = {method: unique_key_index(method_keys) for method, method_keys in keys.items()}
+        # Claves con varias filas: ni el cruce exacto ni el difuso las resuelven
+        self._ambiguous = {method: ambiguous_keys(keys[method]) for method in ('exact', 'name')}
+        # Candidatos del respaldo difuso por equipo (y todos juntos si el equipo no coincide)
+        self._candidates = collections.defaultdict(dict)
+        for position, (player, team, exact) in enumerate(zip(self.names, self.teams, keys['exact'])):
+            if exact not in self._ambiguous['exact']:
+                self._candidates[team][player] = position
+            if player not in self._ambiguous['name']:
+                self._candidates[None][player] = position
+
+    def __len__(self):
+        return len(self.projections)
+
+    def fuzzy_position(self, name, team):
+        """Fila del nombre más parecido (primero en el mismo equipo), o -1"""
+        for candidates in (self._candidates.get(team), self._candidates[None]):
+            if candidates:
+                match = difflib.get_close_matches(name, list(candidates), n=1, cutoff=PROJECTION_FUZZY_CUTOFF)
+                if match:
+                    return candidates[match[0]]
+        return -1
+
+    def match(self, players, teams):
+        """
+        Fila de proyección de cada jugador y el método con que se encontró (MATCH_METHODS, o None).
+        Cada método solo se aplica a los jugadores que los anteriores no resolvieron. Los que quedan
+        con una clave exacta o de nombre repetida en el archivo no pasan al respaldo difuso y se
+        marcan como MATCH_AMBIGUOUS (fila -1).
+        """
+        names = normalize_names(players).reset_index(drop=True)
+        teams = normalize_teams(teams).reset_index(drop=True)
+        keys = {
+            'exact': names + '|' + teams,
+            'name': names,
+            'initial': initial_keys(names) + '|' + teams,
+        }
+        positions = np.full(len(names), -1)
+        methods = np.full(len(names), None, dtype=object)
+        for method, index in self._indexes.items():
+            pending = np.flatnonzero(positions < 0)
+            if not len(pending):
+                break
+            found = lookup_keys(index, keys[method].iloc[pending])
+            positions[pending] = found
+            methods[pending[found >= 0]] = method
+        for i in np.flatnonzero(positions < 0):
+            if keys['exact'][i] in self._ambiguous['exact'] or names[i] in self._ambiguous['name']:
+                methods[i] = MATCH_AMBIGUOUS
+            elif names[i]:
+                positions[i] = self.fuzzy_position(names[i], teams[i])
+                if positions[i] >= 0:
+                    methods[i] = 'fuzzy'
+        return positions, methods
+
+
+_indexes = collections.OrderedDict()
+_joins = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(cache, key, build):
+    """LRU compartido de índices y cruces, como el de los leaderboards"""
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    value = build()
+    with _cache_lock:
+        cache[key] = value
+        while len(cache) > PROJECTION_CACHE_SIZE:
+            cache.popitem(last=False)
+    return value
+
+
+def get_projection_index(projections):
+    """Índice del archivo de proyecciones, memoizado por el hash de su contenido"""
+    return _cached(_indexes, frame_hash(projections), lambda: ProjectionIndex(projections))
+
+
+def join_projections(df, projections):
+    """
+    Agrega a un DataFrame de ownership las columnas DK Projection y FD Projection del archivo de
+    proyecciones, el método de cruce ('Projection Match'), el nombre encontrado ('Projection Player')
+    y la posición ('Position') si el archivo la trae. Los jugadores sin proyección quedan con nulos.
+    Memoizado por el contenido de ambos frames.
+    """
+    index = get_projection_index(projections)
+
+    def build():
+        positions, methods = index.match(df['Player'], df['Team'])
+        matched = positions >= 0
+        joined = df.reset_index(drop=True).copy()
+        for column in PROJECTION_COLUMNS + ('Player', 'Position'):
+            if column not in index.projections:
+                continue
+            values = index.projections[column].to_numpy()[np.maximum(positions, 0)]
+            if column in ('Player', 'Position'):
+                name = 'Projection Player' if column == 'Player' else column
+                joined[name] = np.where(matched, values.astype(object), None)
+            else:
+                joined[column] = np.where(matched, values, np.nan).astype('float32')
+        joined['Projection Match'] = methods
+        return joined
+
+    return _cached(_joins, (frame_hash(df), frame_hash(projections)), build)
+
+
+def match_summary(joined):
+    """Jugadores cruzados por método, ambiguos (clave repetida en el archivo) y sin proyección"""
+    counts = joined['Projection Match'].value_counts()
+    summary = {method: int(counts.get(method, 0)) for method in MATCH_METHODS + (MATCH_AMBIGUOUS,)}
+    summary['unmatched'] = int(joined['Projection Match'].isna().sum())
+    return summary
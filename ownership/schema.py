@@ -0,0 +1,135 @@
+"""Esquema tipado de los DataFrames de ownership: conversión, validación y formato."""
+import hashlib
+
+import pandas as pd
+
+# Esquema tipado de los datos de ownership: precios enteros, ownership en float32 y
+# equipo/jugador como categorías. El formato "$5,400" / "12.5%" solo se aplica al mostrar.
+OWNERSHIP_SCHEMA = {
+    'Team': 'category',
+    'Player': 'category',
+    'DK Price': 'Int32',
+    'DK Ownership': 'float32',
+    'FD Price': 'Int32',
+    'FD Ownership': 'float32',
+}
+OWNERSHIP_COLUMNS = list(OWNERSHIP_SCHEMA)
+
+
+def parse_price_column(values):
+    """'$5,400' -> 5400 (Int32; nulo si la celda no tiene precio)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.round().astype('Int32')
+    digits = values.astype('string').str.replace(r'[^\d.\-]', '', regex=True)
+    return pd.to_numeric(digits.replace('', pd.NA), errors='coerce').round().astype('Int32')
+
+
+def parse_ownership_column(values):
+    """'12.5%' -> 12.5 (float32; NaN si la celda no es un porcentaje, p. ej. '-')"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float32')
+    text = values.astype('string').str.rstrip('%').str.strip()
+    return pd.to_numeric(text.replace('', pd.NA), errors='coerce').astype('float32')
+
+
+def normalize_ownership_frame(df):
+    """
+    Convierte un DataFrame de ownership al esquema tipado con operaciones vectorizadas.
+    Acepta tanto los textos del scraper como columnas ya numéricas; las columnas ausentes se ignoran.
+    """
+    df = df.copy()
+    for column, dtype in OWNERSHIP_SCHEMA.items():
+        if column not in df:
+            continue
+        if column.endswith('Price'):
+            df[column] = parse_price_column(df[column])
+        elif column.endswith('Ownership'):
+            df[column] = parse_ownership_column(df[column])
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def validate_ownership_frame(df):
+    """Comprueba que el DataFrame cumple OWNERSHIP_SCHEMA; lanza ValueError si no"""
+    problems = []
+    for column, dtype in OWNERSHIP_SCHEMA.items():
+        if column not in df:
+            problems.append(f"falta la columna '{column}'")
+        elif str(df[column].dtype) != dtype:
+            problems.append(f"'{column}' es {df[column].dtype}, se esperaba {dtype}")
+    if 'Player' in df and df['Player'].isna().any():
+        problems.append("hay filas sin jugador")
+    if problems:
+        raise ValueError("Esquema inválido: " + "; ".join(problems))
+    return df
+
+
+def format_price(value):
+    """5400 -> '$5,400' (solo para mostrar)"""
+    return "-" if pd.isna(value) else f"${int(value):,}"
+
+
+def coerced_cells(raw, df):
+    """
+    Mensajes de las celdas con texto que no se pudo convertir a número y quedaron vacías
+    (p. ej. '-' en lugar de un porcentaje)
+    """
+    messages = []
+    for column in OWNERSHIP_COLUMNS:
+        if not column.endswith(('Price', 'Ownership')) or pd.api.types.is_numeric_dtype(raw[column]):
+            continue
+        text = raw[column].astype('string').str.strip()
+        for index in df.index[(text.fillna('') != '') & df[column].isna()]:
+            messages.append(f"{raw.at[index, 'Player']}: {column} '{raw.at[index, column]}' no es numérico, se dejó vacío")
+    return messages
+
+
+def build_ownership_frame(records):
+    """
+    Crea el DataFrame de ownership a partir de los registros extraídos. Las celdas inválidas
+    se convierten fila por fila en valores nulos y las filas sin jugador se descartan; los
+    avisos quedan en attrs['coerced_cells'].
+    """
+    # Crear DataFrame y convertirlo al esquema tipado (el formato se aplica al mostrar)
+    raw = pd.DataFrame(records, columns=OWNERSHIP_COLUMNS)
+    missing_player = raw['Player'].isna()
+    raw = raw[~missing_player].reset_index(drop=True)
+    df = normalize_ownership_frame(raw)
+    df.attrs['coerced_cells'] = (
+        [f"{int(missing_player.sum())} filas sin jugador descartadas"] if missing_player.any() else []
+    ) + coerced_cells(raw, df)
+    return validate_ownership_frame(df)
+
+
+def apply_ownership_updates(df, records):
+    """
+    Aplica al DataFrame tipado los registros de los jugadores que cambiaron: actualiza sus
+    celdas y agrega al final los jugadores nuevos. Solo se convierten los registros
+    recibidos; el DataFrame original no se modifica.
+    """
+    updates = build_ownership_frame(records)
+    if updates.empty:
+        return df
+    df = df.copy()
+    positions = pd.Index(df['Player'].astype(str)).get_indexer(updates['Player'].astype(str))
+    known = positions >= 0
+    for column in OWNERSHIP_COLUMNS:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            # Las categorías nuevas (jugador o equipo) se agregan antes de asignar
+            new = updates[column].cat.categories.difference(df[column].cat.categories)
+            if len(new):
+                df[column] = df[column].cat.add_categories(new)
+            updates[column] = updates[column].cat.set_categories(df[column].cat.categories)
+        df.iloc[positions[known], df.columns.get_loc(column)] = updates.loc[known, column].to_numpy()
+    if not known.all():
+        attrs = df.attrs
+        df = pd.concat([df, updates[~known]], ignore_index=True)
+        df.attrs = attrs
+    return df
+
+
+def frame_hash(df):
+    """Hash del contenido de un DataFrame, usado como clave del snapshot"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()
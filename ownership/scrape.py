@@ -0,0 +1,366 @@
+"""
+Orquestación de scrapes: backends de origen (HTTP o navegador) con respaldo automático,
+scrape completo con snapshot y traza, scrapes de varios deportes en paralelo y de todos los
+slates de un deporte en pestañas de un mismo navegador.
+"""
+import concurrent.futures
+import contextlib
+import time
+from datetime import datetime, timedelta
+
+from ownership.checkpoint import clear_checkpoint, load_checkpoint, save_checkpoint
+from ownership.config import (
+    BROWSER_BORROW_TIMEOUT, CHECKPOINT_INTERVAL_SECONDS, CHECKPOINT_ROOT, DEFAULT_SCROLL_WAIT_TIMEOUT, SCRAPE_JOB_TIMEOUT, SCRAPE_MAX_WORKERS,
+    SCRAPE_RESULT_TTL, SLATE_DEFAULT_LABEL, SLATE_MAX_TABS, SNAPSHOT_ROOT, SPORTS, TRACE_ROOT, ownership_url,
+    slate_key, slate_url
+)
+from ownership.parsing import (
+    HTTP_FETCH_TIMEOUT, HTTP_RETRY_AFTER_MINUTES, http_get, records_from_html, slates_from_html
+)
+from ownership.schema import build_ownership_frame
+from ownership.singleflight import SingleFlight
+from ownership.store import maintain_snapshot_store, save_snapshot
+from ownership.timeseries import get_series
+from ownership.trace import ScrapeTrace, completeness_report
+
+
+# Backends de origen de datos. Todos reciben el deporte y opciones por nombre (ignoran las que
+# no usan) y devuelven la misma lista de registros, o None si no obtuvieron la tabla por su vía.
+def fetch_records_http(sport, url=None, trace=None, progress_bar=None, http_timeout=HTTP_FETCH_TIMEOUT, **options):
+    """Backend sin navegador: descarga la página y lee el JSON incrustado o las filas del HTML"""
+    trace = trace or ScrapeTrace(sport)
+    if progress_bar:
+        progress_bar.progress(10)
+        progress_bar.text("Descargando la página sin navegador...")
+    with trace.span('http_fetch'):
+        html = http_get(url or ownership_url(sport), http_timeout)
+    with trace.span('http_parse'):
+        return records_from_html(html)
+
+
+def fetch_records_browser(sport, url=None, trace=None, progress_bar=None, pool=None, deadline=None,
+                          extraction_mode="bulk", scroll_wait_timeout=DEFAULT_SCROLL_WAIT_TIMEOUT,
+                          page_load_timeout=20, ingestion_mode="network", on_row_error=None, checkpoint=None,
+                          on_checkpoint=None, tab=None, **options):
+    """
+    Backend Selenium: toma una sesión del pool y recorre la página con collect_ownership_rows.
+    tab: pestaña de SlateTabs con la página ya cargándose; se lee esa en lugar de tomar una sesión.
+    """
+    # Selenium solo se importa si realmente hace falta un navegador
+    from ownership.browser import collect_ownership_rows, get_browser_pool
+
+    trace = trace or ScrapeTrace(sport)
+    with contextlib.ExitStack() as browser:
+        with trace.span('browser_acquire'):
+            if tab is not None:
+                driver = tab.activate()
+            else:
+                driver = browser.enter_context((pool or get_browser_pool()).borrow())
+        return collect_ownership_rows(
+            driver, sport, progress_bar, extraction_mode, scroll_wait_timeout, page_load_timeout,
+            deadline, ingestion_mode, url, trace, on_row_error, checkpoint, on_checkpoint,
+            navigate=tab is None, performance_entries=tab.performance_entries if tab is not None else None
+        )
+
+
+SOURCE_BACKENDS = {
+    "http": fetch_records_http,
+    "browser": fetch_records_browser,
+}
+SOURCE_MODES = ("auto",) + tuple(SOURCE_BACKENDS)
+
+# Deportes cuyo backend HTTP no devolvió datos: se omite hasta la hora indicada
+_http_skip_until = {}
+
+
+def fetch_ownership_records(sport, source="auto", trace=None, **options):
+    """
+    Obtiene los registros con el backend indicado o, con source="auto", probando los
+    backends en orden (del más barato al más caro). Devuelve (registros, backend) o (None, None).
+    """
+    if source not in SOURCE_MODES:
+        raise ValueError(f"Origen de datos desconocido: {source}. Opciones: {SOURCE_MODES}")
+    trace = trace or ScrapeTrace(sport)
+    names = list(SOURCE_BACKENDS) if source == "auto" else [source]
+    if source == "auto" and _http_skip_until.get(sport, datetime.min) > datetime.now():
+        names.remove("http")
+
+    for name in names:
+        try:
+            records = SOURCE_BACKENDS[name](sport, trace=trace, **options)
+        except Exception as e:
+            # Un backend que falla en modo automático cede el turno al siguiente
+            if source != "auto" or name == names[-1]:
+                raise
+            trace.record_error(name, e)
+            records = None
+        if records:
+            if name == "http":
+                _http_skip_until.pop(sport, None)
+            return records, name
+        trace.count(f'{name}_fallbacks')
+        if name == "http" and source == "auto":
+            _http_skip_until[sport] = datetime.now() + timedelta(minutes=HTTP_RETRY_AFTER_MINUTES)
+    return None, None
+
+
+def run_ownership_scrape(sport="mlb", progress_bar=None, extraction_mode="bulk",
+                         scroll_wait_timeout=DEFAULT_SCROLL_WAIT_TIMEOUT, page_load_timeout=20,
+                         job_timeout=None, ingestion_mode="network", url=None, pool=None,
+                         snapshot_root=SNAPSHOT_ROOT, trace_root=TRACE_ROOT, source="auto", on_row_error=None,
+                         resume=True, on_partial=None, checkpoint_root=CHECKPOINT_ROOT, slate=None, tab=None):
+    """
+    Función general para hacer scraping de datos de propiedad tanto para MLB como NBA (sin cache).
+    source: "auto" prueba primero el backend HTTP y recurre al navegador si la página no trae
+    los datos sin JavaScript; "http" o "browser" fuerzan un backend.
+    El backend del navegador toma prestada una sesión caliente del pool y la devuelve al terminar.
+    ingestion_mode: "network" lee el payload JSON de la página (con respaldo en el scroll del DOM),
+    "dom" recorre siempre la lista virtualizada.
+    extraction_mode: "bulk" serializa las filas en el navegador con una sola llamada por scroll,
+    "legacy" consulta cada celda por separado.
+    scroll_wait_timeout: máximo de segundos a esperar que se rendericen filas tras cada scroll.
+    page_load_timeout: máximo de segundos a esperar la tabla y sus primeras filas.
+    job_timeout: máximo de segundos para todo el scrape (None = sin límite).
+    url, pool, snapshot_root y trace_root permiten apuntar a otra página, pool o almacén (p. ej. en benchmarks).
+    on_row_error: función opcional que recibe el mensaje de cada fila que no se pudo leer
+    (también las celdas que no se pudieron convertir y quedaron vacías).
+    resume: retomar el checkpoint de un scrape interrumpido del mismo deporte, si es reciente.
+    Durante el scroll se guarda un checkpoint en checkpoint_root como máximo cada
+    CHECKPOINT_INTERVAL_SECONDS y otra vez si el scrape falla; se borra al completar.
+    on_partial: función opcional que recibe las filas leídas hasta el momento tras cada scroll.
+    slate: slate a scrapear (None = el que la página muestra por defecto). Los slates que no son
+    el por defecto guardan checkpoints, snapshots y serie temporal bajo slate_key(sport, slate).
+    tab: pestaña de SlateTabs ya abierta en la página del slate (la usa scrape_slates).
+    Cada ejecución guarda una traza JSON con sus tiempos por fase en trace_root.
+    El DataFrame lleva en attrs['completeness'] la verificación de filas esperadas frente a leídas.
+    """
+    trace = ScrapeTrace(sport)
+    url = slate_url(url, slate) if url else ownership_url(sport, slate)
+    key = slate_key(sport, slate)
+    saved_rows = 0
+    # Último estado del scroll todavía sin guardar y momento de la última escritura
+    pending = None
+    last_saved = time.monotonic()
+
+    def flush_checkpoint():
+        nonlocal pending, last_saved, saved_rows
+        if pending is None:
+            return
+        state, pending = pending, None
+        last_saved = time.monotonic()
+        try:
+            save_checkpoint(key, url, state, checkpoint_root)
+            saved_rows = len(state['processed_players'])
+        except OSError as e:
+            trace.record_error('checkpoint', e)
+
+    def on_checkpoint(state):
+        nonlocal pending
+        pending = state
+        if time.monotonic() - last_saved >= CHECKPOINT_INTERVAL_SECONDS:
+            flush_checkpoint()
+        if on_partial:
+            # Copia: las filas parciales se leen desde otro hilo mientras el scroll sigue agregando
+            on_partial(list(state['records']))
+
+    try:
+        deadline = time.monotonic() + job_timeout if job_timeout else None
+        checkpoint = load_checkpoint(key, url, checkpoint_root) if resume else None
+        all_players_data, trace.source = fetch_ownership_records(
+            sport, source, trace, url=url, progress_bar=progress_bar, pool=pool, deadline=deadline,
+            extraction_mode=extraction_mode, scroll_wait_timeout=scroll_wait_timeout,
+            page_load_timeout=page_load_timeout, ingestion_mode=ingestion_mode, on_row_error=on_row_error,
+            checkpoint=checkpoint, on_checkpoint=on_checkpoint, tab=tab
+        )
+        if all_players_data is None:
+            trace.outcome = 'no_table'
+            return None
+        if trace.completeness is None:
+            # Los payloads (red o HTML) traen la lista completa de una vez
+            trace.completeness = completeness_report(trace.source, len(all_players_data), len(all_players_data))
+        
+        with trace.span('dataframe_build'):
+            df = build_ownership_frame(all_players_data)
+        df.attrs['completeness'] = trace.completeness
+        # Las celdas que no se pudieron convertir quedaron vacías en lugar de descartar el frame
+        for message in df.attrs['coerced_cells']:
+            trace.record_error('coercion', message)
+            if on_row_error:
+                on_row_error(message)
+        
+        # Guardar el snapshot en el almacén columnar y sumarlo a la serie temporal del deporte
+        captured_at = datetime.now()
+        with trace.span('snapshot_save'):
+            save_snapshot(df, key, captured_at, root=snapshot_root)
+            maintain_snapshot_store(snapshot_root)
+        with trace.span('timeseries_ingest'):
+            get_series(key, snapshot_root).ingest(df, captured_at)
+        clear_checkpoint(key, checkpoint_root)
+        
+        trace.outcome = 'ok'
+        trace.rows = len(df)
+        if progress_bar:
+            progress_bar.progress(100)
+            message = f"Proceso completado. Total de {len(df)} jugadores extraídos."
+            if not trace.completeness['complete']:
+                message += f" Atención: se esperaban {trace.completeness['expected_rows']}."
+            progress_bar.text(message)
+        
+        return df
+        
+    except Exception as e:
+        trace.outcome = 'error'
+        trace.record_error('scrape', e)
+        flush_checkpoint()
+        if progress_bar:
+            message = f"Error en el scraping: {e}"
+            if saved_rows:
+                message += f". Se guardaron {saved_rows} jugadores: al reintentar, el scrape continúa desde ahí."
+            progress_bar.error(message)
+        return None
+    
+    finally:
+        try:
+            trace.save(trace_root)
+        except OSError:
+            pass
+
+
+# Scrapes en curso y resultados recientes por (deporte, slate), compartidos por todas las sesiones
+_scrape_flights = SingleFlight()
+
+
+def coalesced_scrape(sport="mlb", progress_bar=None, slate=None, max_age=SCRAPE_RESULT_TTL, on_row_error=None,
+                     on_partial=None, **scrape_kwargs):
+    """
+    run_ownership_scrape con una sola ejecución por (deporte, slate) en todo el proceso: las llamadas
+    concurrentes se unen al scrape en curso, reciben su progreso en su propia barra y el mismo
+    DataFrame. Un resultado de hace menos de max_age segundos se devuelve sin scrapear (0 = solo
+    unirse a un scrape en curso).
+    slate: identifica el slate de la página (None = el principal).
+    El DataFrame devuelto es compartido entre sesiones y no se debe modificar.
+    Los errores de fila se guardan y se entregan a on_row_error en el hilo de cada llamada, igual
+    que las filas parciales a on_partial mientras dura el scrape.
+    """
+    def scrape(flight):
+        return run_ownership_scrape(sport, flight, on_row_error=flight.warn, on_partial=flight.partial, slate=slate,
+                                    **scrape_kwargs)
+
+    return _scrape_flights.run((sport, slate), scrape, progress_bar, max_age, on_row_error, on_partial)
+
+
+def scrape_in_flight(sport, slate=None):
+    """True si hay un scrape del deporte y slate en curso en este proceso"""
+    return _scrape_flights.in_flight((sport, slate)) is not None
+
+
+def scrape_all_sports(sports=None, max_workers=SCRAPE_MAX_WORKERS, job_timeout=SCRAPE_JOB_TIMEOUT,
+                      progress_bars=None, scrape=None, on_thread_start=None, **scrape_kwargs):
+    """
+    Scrapea varios deportes en paralelo sobre un pool de hilos.
+    Devuelve un diccionario {deporte: DataFrame o None si falló o superó job_timeout}.
+    progress_bars: diccionario opcional {deporte: barra de progreso}.
+    scrape: función de scrape a usar (por defecto run_ownership_scrape; el dashboard pasa su versión compartida).
+    on_thread_start: función opcional que se ejecuta al iniciar cada hilo (p. ej. para propagar un contexto).
+    """
+    sports = list(sports or SPORTS)
+    progress_bars = progress_bars or {}
+    results = {sport: None for sport in sports}
+
+    scrape = scrape or run_ownership_scrape
+
+    def run_job(sport):
+        if on_thread_start:
+            on_thread_start()
+        return scrape(sport, progress_bars.get(sport), job_timeout=job_timeout, **scrape_kwargs)
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sports))))
+    try:
+        futures = {executor.submit(run_job, sport): sport for sport in sports}
+        # Margen extra sobre job_timeout para la espera de un navegador libre y la construcción del DataFrame
+        wait_timeout = job_timeout + BROWSER_BORROW_TIMEOUT if job_timeout else None
+        done, _ = concurrent.futures.wait(futures, timeout=wait_timeout)
+        for future in done:
+            sport = futures[future]
+            try:
+                results[sport] = future.result()
+            except Exception as e:
+                if sport in progress_bars:
+                    progress_bars[sport].error(f"Error en el scraping: {e}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+def discover_slates(sport, html=None, driver=None, url=None, page_load_timeout=20):
+    """
+    Slates que publica la página de ownership del deporte: {slate: nombre}, con el slate por
+    defecto (el activo en la página) como None y primero. Se lee del HTML indicado, de la página
+    abierta en driver o, si no se pasa ninguno, del HTML descargado sin navegador.
+    """
+    if driver is not None:
+        from ownership.browser import page_slates
+
+        options = page_slates(driver, sport, page_load_timeout)
+    else:
+        options = slates_from_html(html if html is not None else http_get(url or ownership_url(sport)))
+    slates = {None: SLATE_DEFAULT_LABEL}
+    for option in options:
+        if option['selected']:
+            slates[None] = option['label'] or SLATE_DEFAULT_LABEL
+        else:
+            slates.setdefault(option['slate'], option['label'] or option['slate'])
+    return slates
+
+
+def scrape_slates(sport="mlb", slates=None, progress_bar=None, pool=None, url=None, scrape=None,
+                  max_tabs=SLATE_MAX_TABS, page_load_timeout=20, **scrape_kwargs):
+    """
+    Scrapea todos los slates de un deporte con una sola sesión de Chrome: cada slate se carga en
+    su propia pestaña y las cargas se solapan en lugar de sumarse (las lecturas se hacen después,
+    pestaña por pestaña). Con más de max_tabs slates se procesan en tandas de max_tabs pestañas.
+    slates: {slate: nombre} a scrapear; por defecto se descubren en la página (discover_slates),
+    usando la pestaña del slate por defecto sin volver a cargarla.
+    scrape: función de scrape por slate (por defecto run_ownership_scrape; el dashboard pasa su
+    versión compartida); recibe slate= y tab= además de scrape_kwargs.
+    Devuelve {slate: {'label': nombre, 'data': DataFrame o None si falló}}.
+    """
+    # Selenium solo se importa si realmente hace falta un navegador
+    from ownership.browser import SlateTabs, drain_performance_log, get_browser_pool
+
+    pool = pool or get_browser_pool()
+    scrape = scrape or run_ownership_scrape
+    # Las pestañas son del navegador: el origen no se elige
+    scrape_kwargs.pop('source', None)
+    base_url = url or ownership_url(sport)
+    results = {}
+    with pool.borrow() as driver:
+        loaded = slates is None
+        if loaded:
+            if progress_bar:
+                progress_bar.text("Buscando los slates del día...")
+            # La página del slate por defecto queda abierta (y su payload en el log de red) para su pestaña
+            drain_performance_log(driver)
+            driver.get(base_url)
+            slates = discover_slates(sport, driver=driver, page_load_timeout=page_load_timeout)
+        items = list(slates.items())
+        for start in range(0, len(items), max(max_tabs, 1)):
+            batch = dict(items[start:start + max(max_tabs, 1)])
+            if start:
+                # La pestaña original pasa a cargar el primer slate de la tanda: el log de red anterior no sirve
+                drain_performance_log(driver)
+            urls = {slate: slate_url(base_url, slate) for slate in batch}
+            with SlateTabs(driver, urls, pool.prepare_tab, loaded=loaded and not start) as tabs:
+                for index, (slate, label) in enumerate(batch.items(), start + 1):
+                    if progress_bar:
+                        progress_bar.text(f"Slate {label} ({index}/{len(items)})...")
+                    try:
+                        data = scrape(sport, progress_bar, slate=slate, tab=tabs[slate], url=url, pool=pool,
+                                      source="browser", page_load_timeout=page_load_timeout, **scrape_kwargs)
+                    except Exception as e:
+                        data = None
+                        if progress_bar:
+                            progress_bar.error(f"Error en el scraping del slate {label}: {e}")
+                    results[slate] = {'label': label, 'data': data}
+    return results
@@ -0,0 +1,127 @@
+"""
+Single-flight: las ejecuciones concurrentes con la misma clave se unen a una sola ejecución en
+curso y reciben su progreso y el mismo resultado. El último resultado se comparte (solo lectura)
+durante max_age segundos.
+"""
+import threading
+import time
+
+
+class Flight:
+    """
+    Una ejecución en curso. Implementa la interfaz de barra de progreso del scraper
+    (progress/text/error) y recibe resultados parciales, guardando el último estado, que cada
+    espera copia a su propia barra.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.value = 0
+        self.message = None
+        self.failure = None
+        self.warnings = []
+        self.partial_result = None
+        self.result = None
+        self.followers = 0
+        self.version = 0
+        self.done = threading.Event()
+
+    def progress(self, value):
+        self.value = value
+        self.version += 1
+
+    def text(self, message):
+        self.message = message
+        self.version += 1
+
+    def error(self, message):
+        self.failure = message
+        self.version += 1
+
+    def warn(self, message):
+        self.warnings.append(message)
+
+    def partial(self, result):
+        self.partial_result = result
+        self.version += 1
+
+    def wait(self, progress_bar=None, on_warning=None, on_partial=None, poll_interval=0.2):
+        """
+        Espera a que termine la ejecución copiando su progreso a progress_bar y sus resultados
+        parciales a on_partial desde el hilo que espera (los elementos de Streamlit solo se
+        pueden actualizar desde su propia sesión).
+        """
+        seen = None
+        mirror = progress_bar or on_partial
+        while True:
+            finished = self.done.wait(poll_interval if mirror else None)
+            if mirror and self.version != seen:
+                seen = self.version
+                if progress_bar:
+                    progress_bar.progress(self.value)
+                    if self.failure:
+                        progress_bar.error(self.failure)
+                    elif self.message:
+                        progress_bar.text(self.message)
+                if on_partial and self.partial_result is not None and not finished:
+                    on_partial(self.partial_result)
+            if finished:
+                break
+        if on_warning:
+            for message in self.warnings:
+                on_warning(message)
+        return self.result
+
+
+class SingleFlight:
+    """Registro de ejecuciones en curso y resultados recientes por clave, compartido por el proceso"""
+
+    def __init__(self):
+        self._flights = {}
+        self._recent = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, fn, progress_bar=None, max_age=None, on_warning=None, on_partial=None):
+        """
+        Ejecuta fn(flight) una sola vez por clave. Si ya hay una ejecución con esa clave, espera la
+        existente; si terminó hace menos de max_age segundos, devuelve su resultado sin ejecutar.
+        Los resultados None (fallos) no se reutilizan.
+        """
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent and max_age and time.monotonic() - recent[0] < max_age:
+                return recent[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight(key)
+            else:
+                flight.followers += 1
+
+        if leader:
+            threading.Thread(target=self._execute, args=(flight, fn), name=f"flight-{key}", daemon=True).start()
+        elif progress_bar:
+            progress_bar.text("Uniéndose al scrape en curso...")
+        return flight.wait(progress_bar, on_warning, on_partial)
+
+    def _execute(self, flight, fn):
+        try:
+            flight.result = fn(flight)
+        except Exception as e:
+            flight.error(str(e))
+        finally:
+            with self._lock:
+                self._flights.pop(flight.key, None)
+                if flight.result is not None:
+                    self._recent[flight.key] = (time.monotonic(), flight.result)
+            flight.done.set()
+
+    def in_flight(self, key):
+        """Ejecución en curso para la clave, o None"""
+        with self._lock:
+            return self._flights.get(key)
+
+    def forget(self, key):
+        """Descarta el resultado reciente de la clave (el próximo run vuelve a ejecutar)"""
+        with self._lock:
+            self._recent.pop(key, None)
@@ -0,0 +1,216 @@
+"""Almacén de snapshots en Parquet con manifiesto JSONL, retención y compactación."""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ownership.config import SNAPSHOT_ROOT
+from ownership.schema import OWNERSHIP_COLUMNS, normalize_ownership_frame
+
+# Almacén de snapshots: un archivo Parquet por scrape, particionado por deporte y fecha,
+# más un manifiesto append-only (una línea JSON por snapshot) para consultar sin listar directorios.
+SNAPSHOT_MANIFEST = "manifest.jsonl"
+SNAPSHOT_RETENTION_DAYS = 30
+SNAPSHOT_COMPACT_AFTER_DAYS = 1
+
+_snapshot_lock = threading.Lock()
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ('Snapshot Id', pa.string()),
+    ('Captured At', pa.timestamp('us')),
+    ('Team', pa.string()),
+    ('Player', pa.string()),
+    ('DK Price', pa.int32()),
+    ('DK Ownership', pa.float32()),
+    ('FD Price', pa.int32()),
+    ('FD Ownership', pa.float32()),
+])
+
+
+def manifest_path(root=SNAPSHOT_ROOT):
+    return os.path.join(root, SNAPSHOT_MANIFEST)
+
+
+def read_manifest(root=SNAPSHOT_ROOT):
+    """Lee todas las entradas del manifiesto (lista de diccionarios)"""
+    try:
+        with open(manifest_path(root), encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def write_manifest(entries, root=SNAPSHOT_ROOT):
+    """Reescribe el manifiesto de forma atómica (solo lo usan retención y compactación)"""
+    os.makedirs(root, exist_ok=True)
+    tmp_path = manifest_path(root) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+    os.replace(tmp_path, manifest_path(root))
+
+
+def snapshot_table(data):
+    """Tabla Arrow con SNAPSHOT_SCHEMA; en Parquet equipo y jugador se guardan como texto"""
+    data = normalize_ownership_frame(data)
+    data[['Team', 'Player']] = data[['Team', 'Player']].astype(object)
+    return pa.Table.from_pandas(data[SNAPSHOT_SCHEMA.names], schema=SNAPSHOT_SCHEMA, preserve_index=False)
+
+
+def save_snapshot(df, sport, captured_at=None, root=SNAPSHOT_ROOT):
+    """
+    Guarda el DataFrame de un scrape como snapshot Parquet en root/sport=X/date=YYYY-MM-DD/.
+    Devuelve el id del snapshot.
+    """
+    captured_at = captured_at or datetime.now()
+    snapshot_id = f"{sport}_{captured_at.strftime('%Y%m%d_%H%M%S_%f')}"
+    partition = os.path.join(root, f"sport={sport}", f"date={captured_at.date().isoformat()}")
+    path = os.path.join(partition, f"{snapshot_id}.parquet")
+
+    data = df[OWNERSHIP_COLUMNS].copy()
+    data.insert(0, 'Captured At', pd.Timestamp(captured_at))
+    data.insert(0, 'Snapshot Id', snapshot_id)
+    table = snapshot_table(data)
+
+    with _snapshot_lock:
+        os.makedirs(partition, exist_ok=True)
+        pq.write_table(table, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        with open(manifest_path(root), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'snapshot_id': snapshot_id,
+                'sport': sport,
+                'captured_at': captured_at.isoformat(),
+                'path': os.path.relpath(path, root),
+                'rows': len(data)
+            }) + '\n')
+    return snapshot_id
+
+
+def select_snapshots(sport, start=None, end=None, root=SNAPSHOT_ROOT):
+    """Entradas del manifiesto de un deporte dentro del rango [start, end], ordenadas por fecha"""
+    entries = []
+    for entry in read_manifest(root):
+        if entry['sport'] != sport:
+            continue
+        captured_at = datetime.fromisoformat(entry['captured_at'])
+        if (start and captured_at < start) or (end and captured_at > end):
+            continue
+        entries.append(entry)
+    return sorted(entries, key=lambda entry: entry['captured_at'])
+
+
+def read_snapshot_entries(entries, columns=None, filters=None, root=SNAPSHOT_ROOT):
+    """
+    Lee los snapshots indicados leyendo solo sus archivos y las columnas pedidas.
+    filters: filtros adicionales en formato pyarrow, p. ej. [('Player', '==', 'X')].
+    """
+    if columns is not None:
+        columns = ['Snapshot Id', 'Captured At'] + [c for c in columns if c not in ('Snapshot Id', 'Captured At')]
+
+    ids_by_path = {}
+    for entry in entries:
+        ids_by_path.setdefault(entry['path'], []).append(entry['snapshot_id'])
+
+    frames = []
+    for path, snapshot_ids in ids_by_path.items():
+        path_filters = [('Snapshot Id', 'in', snapshot_ids)] + list(filters or [])
+        frames.append(pd.read_parquet(os.path.join(root, path), columns=columns, filters=path_filters))
+
+    if not frames:
+        return normalize_ownership_frame(pd.DataFrame(columns=columns or SNAPSHOT_SCHEMA.names))
+    # Las categorías se reconstruyen tras concatenar (y los snapshots antiguos con precios en texto se convierten)
+    data = pd.concat(frames, ignore_index=True).sort_values('Captured At', kind='stable', ignore_index=True)
+    return normalize_ownership_frame(data)
+
+
+def latest_snapshot(sport, columns=None, root=SNAPSHOT_ROOT):
+    """Último snapshot guardado de un deporte, o None si no hay ninguno"""
+    entries = select_snapshots(sport, root=root)
+    if not entries:
+        return None
+    return read_snapshot_entries(entries[-1:], columns, root=root)
+
+
+def load_snapshots(sport, start=None, end=None, columns=None, root=SNAPSHOT_ROOT):
+    """Todos los snapshots de un deporte entre start y end en un único DataFrame"""
+    return read_snapshot_entries(select_snapshots(sport, start, end, root), columns, root=root)
+
+
+def player_history(sport, player, start=None, end=None, columns=None, root=SNAPSHOT_ROOT):
+    """Historial de un jugador a lo largo de los snapshots de un deporte"""
+    return read_snapshot_entries(
+        select_snapshots(sport, start, end, root), columns, filters=[('Player', '==', player)], root=root
+    )
+
+
+def apply_snapshot_retention(retention_days=SNAPSHOT_RETENTION_DAYS, root=SNAPSHOT_ROOT, now=None):
+    """Elimina los snapshots más antiguos que retention_days. Devuelve la cantidad eliminada"""
+    if not retention_days:
+        return 0
+    cutoff = (now or datetime.now()) - timedelta(days=retention_days)
+
+    with _snapshot_lock:
+        entries = read_manifest(root)
+        keep = [e for e in entries if datetime.fromisoformat(e['captured_at']) >= cutoff]
+        if len(keep) == len(entries):
+            return 0
+        write_manifest(keep, root)
+        kept_paths = {e['path'] for e in keep}
+        for path in {e['path'] for e in entries} - kept_paths:
+            try:
+                os.remove(os.path.join(root, path))
+            except FileNotFoundError:
+                pass
+    return len(entries) - len(keep)
+
+
+def compact_snapshots(older_than_days=SNAPSHOT_COMPACT_AFTER_DAYS, root=SNAPSHOT_ROOT, now=None):
+    """
+    Une en un único Parquet por partición todos los snapshots de días anteriores a older_than_days.
+    Los ids de snapshot se conservan, así que las consultas no cambian. Devuelve las particiones compactadas.
+    """
+    cutoff_date = ((now or datetime.now()) - timedelta(days=older_than_days)).date()
+    compacted = 0
+
+    with _snapshot_lock:
+        entries = read_manifest(root)
+        groups = {}
+        for entry in entries:
+            captured_date = datetime.fromisoformat(entry['captured_at']).date()
+            if captured_date <= cutoff_date:
+                groups.setdefault((entry['sport'], captured_date), []).append(entry)
+
+        for (sport, captured_date), group in groups.items():
+            paths = sorted({e['path'] for e in group})
+            if len(paths) < 2:
+                continue
+            compact_path = os.path.join(f"sport={sport}", f"date={captured_date.isoformat()}",
+                                        f"{sport}_{captured_date.strftime('%Y%m%d')}_compact.parquet")
+            # Se pasa por pandas para unificar archivos escritos con esquemas anteriores
+            table = snapshot_table(pd.concat([
+                pd.read_parquet(os.path.join(root, path)) for path in paths
+            ], ignore_index=True))
+            full_path = os.path.join(root, compact_path)
+            pq.write_table(table, full_path + '.tmp')
+            os.replace(full_path + '.tmp', full_path)
+            for entry in group:
+                entry['path'] = compact_path
+            for path in paths:
+                if path != compact_path:
+                    os.remove(os.path.join(root, path))
+            compacted += 1
+
+        if compacted:
+            write_manifest(entries, root)
+    return compacted
+
+
+def maintain_snapshot_store(root=SNAPSHOT_ROOT):
+    """Aplica la retención y compacta los días anteriores"""
+    apply_snapshot_retention(root=root)
+    compact_snapshots(root=root)
@@ -0,0 +1,200 @@
+"""
+Series temporales de ownership: los snapshots sucesivos de cada deporte alineados por jugador,
+con deltas, tasas de cambio y "mayores movimientos desde T" calculados sobre arrays.
+"""
+import functools
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from ownership.config import SNAPSHOT_ROOT
+
+# Buffer acotado por deporte: TIMESERIES_CAPACITY puntos como máximo (un día de snapshots cada
+# 5 minutos). Al llenarse, los puntos más viejos que los TIMESERIES_FULL_RESOLUTION más recientes
+# se reducen a la mitad (se conserva uno de cada dos), así que la memoria no crece y el historial
+# lejano queda con menos resolución.
+TIMESERIES_CAPACITY = 288
+TIMESERIES_FULL_RESOLUTION = 144
+TIMESERIES_METRICS = ('DK Ownership', 'FD Ownership', 'Combined Ownership')
+TIMESERIES_INITIAL_PLAYERS = 256
+
+
+class OwnershipSeries:
+    """Matrices tiempo x jugador del ownership de un deporte, con capacidad acotada"""
+
+    def __init__(self, sport, capacity=TIMESERIES_CAPACITY, full_resolution=TIMESERIES_FULL_RESOLUTION):
+        if not 0 < full_resolution < capacity:
+            raise ValueError("full_resolution debe ser mayor que 0 y menor que capacity")
+        self.sport = sport
+        self.capacity = capacity
+        self.full_resolution = full_resolution
+        self.version = 0
+        self._times = np.empty(capacity, dtype='datetime64[us]')
+        self._values = {
+            column: np.full((capacity, TIMESERIES_INITIAL_PLAYERS), np.nan, dtype='float32')
+            for column in ('DK Ownership', 'FD Ownership')
+        }
+        self._size = 0
+        self._players = pd.Index([], dtype=object)
+        self._teams = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def players(self):
+        return self._players
+
+    @property
+    def times(self):
+        return pd.DatetimeIndex(self._times[:self._size].copy())
+
+    def _columns_for(self, players):
+        """Columna de cada jugador; los jugadores nuevos se agregan (y las matrices crecen al doble)"""
+        columns = self._players.get_indexer(players)
+        new = pd.Index(players[columns < 0]).unique()
+        if len(new):
+            self._players = self._players.append(new)
+            width = next(iter(self._values.values())).shape[1]
+            if len(self._players) > width:
+                width = max(width * 2, len(self._players))
+                for column, values in self._values.items():
+                    grown = np.full((self.capacity, width), np.nan, dtype='float32')
+                    grown[:, :values.shape[1]] = values
+                    self._values[column] = grown
+            columns = self._players.get_indexer(players)
+        return columns
+
+    def _downsample(self):
+        """Libera espacio conservando uno de cada dos puntos fuera de la ventana de resolución completa"""
+        old = self._size - self.full_resolution
+        # Se conserva el punto más reciente de cada par, así el último punto viejo sigue empalmando
+        keep = np.concatenate([np.arange(old - 1, -1, -2)[::-1], np.arange(old, self._size)])
+        self._times[:len(keep)] = self._times[keep]
+        for values in self._values.values():
+            values[:len(keep)] = values[keep]
+            values[len(keep):self._size] = np.nan
+        self._size = len(keep)
+
+    def ingest(self, df, captured_at):
+        """
+        Agrega un snapshot (DataFrame de ownership) capturado en captured_at. Los snapshots que no
+        son más nuevos que el último punto se ignoran. Devuelve True si se agregó.
+        """
+        captured_at = np.datetime64(pd.Timestamp(captured_at).to_datetime64(), 'us')
+        players = df['Player'].astype(object).to_numpy()
+        with self._lock:
+            if self._size and captured_at <= self._times[self._size - 1]:
+                return False
+            columns = self._columns_for(players)
+            if self._size == self.capacity:
+                self._downsample()
+            row = self._size
+            self._times[row] = captured_at
+            for column, values in self._values.items():
+                values[row, columns] = df[column].to_numpy(dtype='float32', na_value=np.nan)
+            self._teams.update(zip(players, df['Team'].astype(object)))
+            self._size += 1
+            self.version += 1
+        return True
+
+    def _matrix(self, metric):
+        """Matriz (puntos x jugadores) de la métrica; se llama con el lock tomado"""
+        size, width = self._size, len(self._players)
+        if metric == 'Combined Ownership':
+            return self._values['DK Ownership'][:size, :width] + self._values['FD Ownership'][:size, :width]
+        if metric not in self._values:
+            raise ValueError(f"Métrica desconocida: {metric}. Opciones: {TIMESERIES_METRICS}")
+        return self._values[metric][:size, :width].copy()
+
+    def frame(self, metric='DK Ownership'):
+        """Serie completa de la métrica: índice de tiempos, una columna por jugador"""
+        with self._lock:
+            return pd.DataFrame(self._matrix(metric), index=self.times, columns=self._players)
+
+    def deltas(self, metric='DK Ownership', since=None):
+        """
+        Cambio de la métrica por jugador entre el último punto anterior o igual a since (el primero
+        si no hay ninguno; since=None = el primer punto) y el último punto.
+        Devuelve Player, Team, Start, End, Delta y Rate (puntos por hora).
+        """
+        with self._lock:
+            if not self._size:
+                return pd.DataFrame(columns=['Player', 'Team', 'Start', 'End', 'Delta', 'Rate'])
+            values = self._matrix(metric)
+            times = self._times[:self._size]
+            start_row = 0
+            if since is not None:
+                since = np.datetime64(pd.Timestamp(since).to_datetime64(), 'us')
+                start_row = max(int(np.searchsorted(times, since, side='right')) - 1, 0)
+            hours = (times[-1] - times[start_row]) / np.timedelta64(1, 'h')
+            teams = [self._teams.get(player) for player in self._players]
+            players = self._players
+        start, end = values[start_row], values[-1]
+        delta = end - start
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = delta / np.float32(hours) if hours else np.full_like(delta, np.nan)
+        return pd.DataFrame({
+            'Player': players, 'Team': teams, 'Start': start, 'End': end, 'Delta': delta, 'Rate': rate
+        })
+
+    def rolling_rate(self, metric='DK Ownership', window=timedelta(minutes=30)):
+        """
+        Tasa de cambio (puntos por hora) de cada jugador en cada punto, medida contra el último
+        punto a window o más de distancia. NaN donde todavía no hay un punto tan antiguo.
+        """
+        with self._lock:
+            values = self._matrix(metric)
+            times = self._times[:self._size].copy()
+            players = self._players
+        base = np.searchsorted(times, times - np.timedelta64(window), side='right') - 1
+        valid = base >= 0
+        base = np.maximum(base, 0)
+        hours = ((times - times[base]) / np.timedelta64(1, 'h')).astype('float32')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = (values - values[base]) / hours[:, None]
+        rates[~valid | (hours == 0)] = np.nan
+        return pd.DataFrame(rates, index=pd.DatetimeIndex(times), columns=players)
+
+    def movers(self, metric='DK Ownership', since=None, n=10, direction='abs'):
+        """
+        Jugadores con mayor cambio desde since. direction: 'up' (solo subas), 'down' (solo bajas) o
+        'abs' (mayor cambio absoluto). Los jugadores sin dato en alguno de los dos extremos se omiten,
+        así que puede haber menos de n.
+        """
+        deltas = self.deltas(metric, since).dropna(subset=['Delta'])
+        if direction == 'up':
+            deltas = deltas[deltas['Delta'] > 0]
+        elif direction == 'down':
+            deltas = deltas[deltas['Delta'] < 0]
+        key = {'up': -deltas['Delta'], 'down': deltas['Delta'], 'abs': -deltas['Delta'].abs()}[direction]
+        order = np.argsort(key.to_numpy(), kind='stable')[:n]
+        return deltas.iloc[order].reset_index(drop=True)
+
+    def history(self, players, metric='DK Ownership'):
+        """Serie de los jugadores indicados en formato largo (Captured At, Player, valor) para graficar"""
+        frame = self.frame(metric)
+        columns = [player for player in players if player in frame.columns]
+        long = frame[columns].rename_axis('Captured At').reset_index()
+        return long.melt(id_vars='Captured At', var_name='Player', value_name=metric).dropna(subset=[metric])
+
+
+def backfill_series(series, start=None, root=SNAPSHOT_ROOT):
+    """Carga en la serie los snapshots guardados desde start (por defecto, desde el inicio del día)"""
+    from ownership.store import load_snapshots
+
+    start = start or datetime.combine(datetime.now().date(), datetime.min.time())
+    data = load_snapshots(series.sport, start=start, columns=['Team', 'Player', 'DK Ownership', 'FD Ownership'],
+                          root=root)
+    for captured_at, snapshot in data.groupby('Captured At', sort=True):
+        series.ingest(snapshot, captured_at)
+    return series
+
+
+@functools.lru_cache(maxsize=None)
+def get_series(sport, root=SNAPSHOT_ROOT):
+    """Serie única por proceso, deporte y almacén; la primera vez se completa con los snapshots del día"""
+    return backfill_series(OwnershipSeries(sport), root=root)
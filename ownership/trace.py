@@ -0,0 +1,139 @@
+"""Trazas de cada scrape: un JSON por ejecución con tiempos por fase, scrolls y errores."""
+import collections
+import contextlib
+import json
+import os
+import time
+from datetime import datetime
+
+from ownership.config import TRACE_ROOT
+
+# Trazas de cada scrape: tiempos por fase, filas nuevas por scroll, reintentos y errores por fila
+TRACE_HISTORY = 200
+
+
+class ScrapeTrace:
+    """Instrumentación estructurada de un scrape; se guarda como un JSON por ejecución"""
+
+    def __init__(self, sport):
+        self.sport = sport
+        self.started_at = datetime.now()
+        self.trace_id = f"{sport}_{self.started_at.strftime('%Y%m%d_%H%M%S_%f')}"
+        self.spans = []
+        self.scrolls = []
+        self.errors = []
+        self.counters = collections.Counter()
+        self.outcome = None
+        self.source = None
+        self.rows = 0
+        self.completeness = None
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Mide la duración de una fase del scrape"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({
+                'name': name,
+                'start_s': round(start - self._origin, 4),
+                'duration_s': round(time.perf_counter() - start, 4)
+            })
+
+    def count(self, name, amount=1):
+        """Incrementa un contador (reintentos, timeouts, respaldos...)"""
+        self.counters[name] += amount
+
+    def record_scroll(self, position, new_rows, visible_rows):
+        self.scrolls.append({'position': position, 'new_rows': new_rows, 'visible_rows': visible_rows})
+
+    def record_error(self, phase, message):
+        self.errors.append({'phase': phase, 'message': str(message)})
+
+    def phase_totals(self):
+        """Segundos acumulados por fase"""
+        totals = collections.defaultdict(float)
+        for span in self.spans:
+            totals[span['name']] += span['duration_s']
+        return {name: round(total, 4) for name, total in totals.items()}
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'sport': self.sport,
+            'started_at': self.started_at.isoformat(),
+            'total_s': round(time.perf_counter() - self._origin, 4),
+            'outcome': self.outcome,
+            'source': self.source,
+            'rows': self.rows,
+            'completeness': self.completeness,
+            'phase_totals': self.phase_totals(),
+            'counters': dict(self.counters),
+            'scrolls': self.scrolls,
+            'errors': self.errors,
+            'spans': self.spans
+        }
+
+    def save(self, root=TRACE_ROOT):
+        """Escribe la traza en root/<trace_id>.json y conserva solo las TRACE_HISTORY más recientes"""
+        os.makedirs(root, exist_ok=True)
+        path = os.path.join(root, f"{self.trace_id}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        # La traza recién escrita siempre se conserva; del resto, las más recientes
+        others = [name for name in trace_names(root) if name != os.path.basename(path)]
+        for name in others[max(TRACE_HISTORY - 1, 0):]:
+            try:
+                os.remove(os.path.join(root, name))
+            except FileNotFoundError:
+                pass
+        return path
+
+
+def completeness_report(method, expected_rows, collected_rows, row_errors=0, **details):
+    """
+    Verificación de completitud de un scrape: filas esperadas frente a filas leídas (válidas más
+    las que fallaron). expected_rows None significa que no hubo forma de estimarlas.
+    """
+    return {
+        'method': method,
+        'expected_rows': expected_rows,
+        'collected_rows': collected_rows,
+        'row_errors': row_errors,
+        'complete': expected_rows is None or collected_rows + row_errors >= expected_rows,
+        **details
+    }
+
+
+def trace_names(root=TRACE_ROOT):
+    """
+    Archivos de traza de root, del más reciente al más antiguo: por fecha de modificación y, a
+    igual fecha, por el instante de inicio que lleva el trace_id (no por el deporte del nombre)
+    """
+    entries = []
+    try:
+        for entry in os.scandir(root):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry.name[:-5].rsplit('_', 3)[-3:], entry.name))
+            except FileNotFoundError:
+                continue
+    except FileNotFoundError:
+        return []
+    return [name for *_, name in sorted(entries, reverse=True)]
+
+
+def load_traces(root=TRACE_ROOT, limit=50):
+    """Últimas trazas guardadas, de la más reciente a la más antigua"""
+    names = trace_names(root)
+    traces = []
+    for name in names[:limit]:
+        try:
+            with open(os.path.join(root, name), encoding='utf-8') as f:
+                traces.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return traces
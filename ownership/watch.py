@@ -0,0 +1,231 @@
+"""Modo en vivo: mantiene abierta la página de un deporte y registra cada cambio de celda."""
+import atexit
+import collections
+import functools
+import threading
+from datetime import datetime
+
+from selenium.webdriver.common.by import By
+
+from ownership.browser import BrowserPool, EXTRACT_SELECTORS, ROW_READER_JS, collect_ownership_rows
+from ownership.schema import build_ownership_frame
+
+# Modo en vivo: una página de ownership abierta con un observador que registra cada cambio de celda
+WATCH_POLL_INTERVAL = 5
+WATCH_EVENT_BUFFER = 5000
+WATCH_FIELDS = ('Team', 'DK Price', 'DK Ownership', 'FD Price', 'FD Ownership')
+
+# Instala el observador de cambios. arguments[2] son los registros ya conocidos (sin eventos para ellos)
+INSTALL_WATCH_JS = ROW_READER_JS + """
+const container = arguments[0];
+const sel = arguments[1];
+if (container.__ownershipWatch) {
+    return true;
+}
+const fields = arguments[3];
+const known = new Map();
+for (const record of arguments[2]) {
+    known.set(record['Player'], record);
+}
+const events = [];
+const scan = (row) => {
+    const record = readRow(row, sel);
+    if (!record['Player']) {
+        return;
+    }
+    const previous = known.get(record['Player']);
+    if (previous) {
+        for (const field of fields) {
+            if (record[field] !== null && previous[field] !== record[field]) {
+                events.push({player: record['Player'], field: field, old: previous[field], new: record[field]});
+            }
+        }
+    } else {
+        events.push({player: record['Player'], field: null, old: null, new: record});
+    }
+    known.set(record['Player'], record);
+};
+const observer = new MutationObserver((mutations) => {
+    const rows = new Set();
+    for (const mutation of mutations) {
+        const target = mutation.target.nodeType === 1 ? mutation.target : mutation.target.parentElement;
+        const row = target ? target.closest(sel.row) : null;
+        if (row) {
+            rows.add(row);
+        }
+        for (const node of mutation.addedNodes) {
+            if (node.nodeType !== 1) {
+                continue;
+            }
+            if (node.matches(sel.row)) {
+                rows.add(node);
+            }
+            node.querySelectorAll(sel.row).forEach((r) => rows.add(r));
+        }
+    }
+    rows.forEach(scan);
+});
+observer.observe(container, {childList: true, subtree: true, characterData: true, attributes: true, attributeFilter: ['alt']});
+container.querySelectorAll(sel.row).forEach(scan);
+container.__ownershipWatch = {events: events, observer: observer};
+return true;
+"""
+
+# Devuelve y vacía la cola de eventos; null si la página se recargó y el observador se perdió
+DRAIN_WATCH_JS = """
+const watch = arguments[0].__ownershipWatch;
+if (!watch) {
+    return null;
+}
+if (arguments[1]) {
+    // Avanzar una pantalla (volviendo al inicio al llegar al final) para observar también las filas ocultas
+    const container = arguments[0];
+    const atBottom = container.scrollTop + container.clientHeight >= container.scrollHeight - 1;
+    container.scrollTop = atBottom ? 0 : container.scrollTop + container.clientHeight;
+}
+return watch.events.splice(0);
+"""
+
+
+def same_cell_value(old, new):
+    """Compara dos textos de celda ignorando el formato de precios y porcentajes"""
+    if old == new:
+        return True
+    try:
+        return float(str(old).strip('$% ').replace(',', '')) == float(str(new).strip('$% ').replace(',', ''))
+    except ValueError:
+        return False
+
+
+class OwnershipWatcher:
+    """
+    Mantiene abierta la página de ownership de un deporte y acumula los cambios
+    (jugador, campo, anterior, nuevo) en una tabla en memoria, sin volver a hacer scrape.
+    Mientras está activo ocupa una sesión de Chrome propia, fuera del pool de scrapes: si la tomara
+    del pool, con un watcher por deporte los scrapes se quedarían sin sesiones libres.
+    pool: pool del que tomar la sesión en lugar de lanzar una propia (p. ej. en pruebas).
+    """
+
+    def __init__(self, sport, poll_interval=WATCH_POLL_INTERVAL, sweep=True, pool=None):
+        self.sport = sport
+        self.poll_interval = poll_interval
+        self.sweep = sweep
+        self.pool = pool
+        self.error = None
+        self.started_at = None
+        self._table = {}
+        self._events = collections.deque(maxlen=WATCH_EVENT_BUFFER)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name=f"watch-{self.sport}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _open(self, driver):
+        """Carga la página, siembra la tabla y arma el observador. Devuelve el contenedor de scroll"""
+        records = collect_ownership_rows(driver, self.sport)
+        if records is None:
+            raise RuntimeError(f"No se encontró la tabla de ownership de {self.sport}")
+        with self._lock:
+            self._table = {record['Player']: dict(record) for record in records}
+        container = driver.find_element(By.CSS_SELECTOR, f"div[data-testid='ownershipTable{self.sport}']")
+        scroll_container = container.find_element(By.XPATH, './div')
+        driver.execute_script(INSTALL_WATCH_JS, scroll_container, EXTRACT_SELECTORS, records, list(WATCH_FIELDS))
+        return scroll_container
+
+    def _apply(self, events):
+        now = datetime.now()
+        with self._lock:
+            for event in events:
+                player = event['player']
+                if event['field'] is not None and same_cell_value(event['old'], event['new']):
+                    # Mismo valor con otro formato (p. ej. "12%" del DOM frente a "12.0%" del payload)
+                    self._table.setdefault(player, {'Player': player})[event['field']] = event['new']
+                    continue
+                if event['field'] is None:
+                    # Jugador que no estaba en la tabla: se agrega completo
+                    self._table[player] = dict(event['new'])
+                else:
+                    self._table.setdefault(player, {'Player': player})[event['field']] = event['new']
+                self._seq += 1
+                self._events.append({
+                    'seq': self._seq,
+                    'time': now,
+                    'player': player,
+                    'field': event['field'] or 'Nuevo jugador',
+                    'old': event['old'],
+                    'new': event['new'] if event['field'] else None
+                })
+
+    def _run(self):
+        own_pool = None
+        try:
+            if self.pool is None:
+                own_pool = BrowserPool(size=1)
+                atexit.register(own_pool.close)
+            with (self.pool or own_pool).borrow() as driver:
+                scroll_container = self._open(driver)
+                self.started_at = datetime.now()
+                while not self._stop.wait(self.poll_interval):
+                    events = driver.execute_script(DRAIN_WATCH_JS, scroll_container, self.sweep)
+                    if events is None:
+                        # La página se recargó: volver a sembrar y armar el observador
+                        scroll_container = self._open(driver)
+                        continue
+                    if events:
+                        self._apply(events)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if own_pool is not None:
+                own_pool.close()
+                atexit.unregister(own_pool.close)
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def events_since(self, seq=0):
+        """Eventos con número de secuencia mayor a seq"""
+        with self._lock:
+            return [event for event in self._events if event['seq'] > seq]
+
+    def records(self, players):
+        """Registros actuales de los jugadores indicados (los que ya no están se omiten)"""
+        with self._lock:
+            return [dict(self._table[player]) for player in players if player in self._table]
+
+    def frame(self):
+        """Tabla actual como DataFrame con el mismo formato que run_ownership_scrape"""
+        with self._lock:
+            records = [dict(record) for record in self._table.values()]
+        if not records:
+            return None
+        return build_ownership_frame(records)
+
+
+@functools.lru_cache(maxsize=None)
+def get_watchers():
+    """Watchers activos del proceso, uno por deporte (compartidos entre sesiones)"""
+    return {}
+
+
+def get_watcher(sport):
+    watchers = get_watchers()
+    if sport not in watchers:
+        watchers[sport] = OwnershipWatcher(sport)
+    return watchers[sport]
@@ -1,18 +1,27 @@
 import streamlit as st
-import time
+import io
+import os
+import threading
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import plotly.express as px
-import base64
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from ownership.checkpoint import load_checkpoint
+from ownership.config import EXPORT_ROOT, SPORTS, TRACE_ROOT, ownership_url, slate_key
+from ownership.export import EXPORT_FORMATS, EXPORT_INLINE_MAX_MB, export_frame, export_history_archive, prune_export_cache
+from ownership.field import FIELD_SIZE, simulate_field
+from ownership.leaderboard import get_leaderboard
+from ownership.lineups import generate_lineups, lineup_sites
+from ownership.prefetch import PREFETCH_TICK_SECONDS, get_prefetch_scheduler
+from ownership.projections import (
+    MATCH_AMBIGUOUS, MATCH_METHODS, join_projections, load_projections, match_summary, projection_slates
+)
+from ownership.schema import OWNERSHIP_COLUMNS, apply_ownership_updates, format_price
+from ownership.scrape import coalesced_scrape, scrape_all_sports, scrape_slates
+from ownership.timeseries import TIMESERIES_METRICS, get_series
+from ownership.trace import load_traces
+from ownership.watch import WATCH_POLL_INTERVAL, get_watcher
 
 # Configuración de la página
 st.set_page_config(
@@ -22,597 +31,726 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Funciones de scraping adaptadas para Streamlit
-@st.cache_data(ttl=3600)  # Cache por 1 hora
-def scrape_ownership_data(sport="mlb", _progress_bar=None):
+def scrape_ownership_data(sport="mlb", progress_bar=None, **scrape_kwargs):
     """
-    Función general para hacer scraping de datos de propiedad tanto para MLB como NBA
+    Scrape usado por los botones del dashboard: compartido entre sesiones, así que los clics
+    simultáneos de varios usuarios se unen a un solo navegador y reciben el mismo resultado
+    (reutilizado durante SCRAPE_RESULT_TTL)
     """
-    try:
-        url = f"https://fantasyteamadvice.com/dfs/{sport}/ownership"
-        
-        # Configuración para usar Chrome en modo headless
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Ejecutar sin interfaz gráfica
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--start-maximized")
-        
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        if _progress_bar:
-            _progress_bar.progress(10)
-            _progress_bar.text("Abriendo navegador y cargando la página...")
-        
-        driver.get(url)
-        time.sleep(5)
-        
-        if progress_bar:
-            progress_bar.progress(20)
-            progress_bar.text("Esperando que se cargue el contenedor de datos...")
-        
-        wait = WebDriverWait(driver, 20)
-        
-        # Buscar el contenedor de la tabla de ownership
-        try:
-            ownership_container = wait.until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR, f"div[data-testid='ownershipTable{sport}']")
-            ))
-            if progress_bar:
-                progress_bar.progress(30)
-                progress_bar.text("Contenedor de datos encontrado! Iniciando extracción...")
-        except Exception as e:
-            if progress_bar:
-                progress_bar.error(f"Error al esperar el contenedor: {e}")
-            driver.quit()
-            return None
-        
-        # Buscar el contenedor donde se debe hacer scroll
-        scroll_container = ownership_container.find_element(By.XPATH, './div')
-        
-        # Crear lista para guardar los datos de todos los jugadores
-        all_players_data = []
-        
-        # Conjunto para llevar un registro de los jugadores ya procesados (para evitar duplicados)
-        processed_players = set()
-        
-        # Proceso de scroll y captura de datos con scroll incremental
-        same_count_iterations = 0
-        max_same_count = 5
-        total_scrolls = 0
-        max_scrolls = 100
-        scroll_increment = 300
-        current_scroll_position = 0
-        
-        while total_scrolls < max_scrolls:
-            # Actualizar la barra de progreso
-            if progress_bar:
-                # Calcular progreso basado en número de scrolls y máximo estimado
-                estimated_progress = min(30 + (total_scrolls / 30) * 60, 90)
-                progress_bar.progress(int(estimated_progress))
-                progress_bar.text(f"Scroll #{total_scrolls+1}... Jugadores encontrados: {len(processed_players)}")
-            
-            # Hacer scroll incremental
-            current_scroll_position += scroll_increment
-            driver.execute_script(
-                f"arguments[0].scrollTop = {current_scroll_position};", 
-                scroll_container
-            )
-            
-            # Esperar que se carguen nuevos elementos
-            time.sleep(2)
-            
-            # Contar filas actuales y obtener datos
-            player_rows = driver.find_elements(By.CSS_SELECTOR, "div[data-testid='ownershipPlayerRow']")
-            current_count = len(player_rows)
-            
-            # Contador de nuevos jugadores en este scroll
-            new_players_in_this_scroll = 0
-            
-            # Procesar solo jugadores nuevos en cada iteración
-            for row in player_rows:
-                try:
-                    # Obtener nombre del jugador para identificación única
-                    player_name = row.find_element(By.CSS_SELECTOR, "div[data-testid='ownershipPlayer']").text
-                    
-                    # Verificar si ya procesamos este jugador
-                    player_key = player_name.strip()
-                    if player_key in processed_players:
-                        continue
-                    
-                    # Marcar como procesado
-                    processed_players.add(player_key)
-                    new_players_in_this_scroll += 1
-                    
-                    # Obtener equipo
-                    team_div = row.find_element(By.CSS_SELECTOR, "div[data-testid='ownershipPlayerTeam']")
-                    team_img = team_div.find_element(By.TAG_NAME, "img")
-                    team = team_img.get_attribute("alt").replace(" logo", "")
-                    
-                    # Obtener precios y ownership
-                    dk_price = row.find_element(By.CSS_SELECTOR, "div[data-testid='ownershipPlayerDkPrice']").text
-                    dk_ownership = row.find_element(By.CSS_SELECTOR, "div[data-testid='ownershipPlayerDkOwnership']").text
-                    fd_price = row.find_element(By.CSS_SELECTOR, "div[data-testid='ownershipPlayerFdPrice']").text
-                    fd_ownership = row.find_element(By.CSS_SELECTOR, "div[data-testid='ownershipPlayerFdOwnership']").text
-                    
-                    # Agregar datos a la lista
-                    all_players_data.append({
-                        'Team': team,
-                        'Player': player_name,
-                        'DK Price': dk_price,
-                        'DK Ownership': dk_ownership,
-                        'FD Price': fd_price,
-                        'FD Ownership': fd_ownership
-                    })
-                    
-                except Exception as e:
-                    st.warning(f"Error procesando jugador: {e}")
-                    continue
-            
-            total_scrolls += 1
-            
-            # Verificar si estamos encontrando nuevos jugadores
-            if new_players_in_this_scroll == 0:
-                same_count_iterations += 1
-                if same_count_iterations >= max_same_count:
-                    # Probar con un scroll grande
-                    current_scroll_position += 1000
-                    driver.execute_script(
-                        f"arguments[0].scrollTop = {current_scroll_position};", 
-                        scroll_container
-                    )
-                    time.sleep(3)
-                    
-                    # Verificar si encontramos nuevos jugadores 
-                    player_rows_after_big_scroll = driver.find_elements(By.CSS_SELECTOR, "div[data-testid='ownershipPlayerRow']")
-                    if len(player_rows_after_big_scroll) > current_count:
-                        same_count_iterations = 0
-                    else:
-                        # Intento final: scroll al final
-                        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scroll_container)
-                        time.sleep(3)
-                        
-                        # Verificación final
-                        final_player_rows = driver.find_elements(By.CSS_SELECTOR, "div[data-testid='ownershipPlayerRow']")
-                        final_new_players = 0
-                        
-                        for row in final_player_rows:
-                            try:
-                                player_name = row.find_element(By.CSS_SELECTOR, "div[data-testid='ownershipPlayer']").text
-                                if player_name.strip() not in processed_players:
-                                    final_new_players += 1
-                            except:
-                                pass
-                        
-                        if final_new_players == 0:
-                            break
-                        else:
-                            same_count_iterations = 0
-            else:
-                same_count_iterations = 0
-        
-        # Finalizar y cerrar navegador
-        driver.quit()
-        
-        # Crear DataFrame y formatear datos
-        df = pd.DataFrame(all_players_data)
-        
-        # Limpiar y convertir las columnas de ownership
-        df['DK Ownership'] = df['DK Ownership'].str.replace('%', '').astype(float)
-        df['FD Ownership'] = df['FD Ownership'].str.replace('%', '').astype(float)
-        
-        # Guardar a CSV
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        csv_path = f'{sport}_ownership_{timestamp}.csv'
-        df.to_csv(csv_path, index=False)
-        
-        if progress_bar:
-            progress_bar.progress(100)
-            progress_bar.text(f"Proceso completado. Total de {len(df)} jugadores extraídos.")
-        
-        return df
-        
-    except Exception as e:
-        if progress_bar:
-            progress_bar.error(f"Error en el scraping: {e}")
-        if 'driver' in locals():
-            driver.quit()
-        return None
+    return coalesced_scrape(
+        sport, progress_bar, on_row_error=lambda error: st.warning(f"Error procesando jugador: {error}"),
+        **scrape_kwargs
+    )
 
-def analyze_highest_ownership(df, sport=""):
-    """
-    Analiza los datos para encontrar los jugadores con mayor ownership
-    """
-    # Crear una copia para no modificar el dataframe original
-    df_analysis = df.copy()
+def scrape_sport_slates(sport, progress_bar=None):
+    """Todos los slates del día de un deporte en pestañas de un mismo navegador, cada uno compartido entre sesiones"""
+    return scrape_slates(sport, progress_bar=progress_bar, scrape=scrape_ownership_data)
+
+# Formato de presentación de las columnas numéricas en st.dataframe
+OWNERSHIP_COLUMN_CONFIG = {
+    'DK Price': st.column_config.NumberColumn('DK Price', format="$%d"),
+    'FD Price': st.column_config.NumberColumn('FD Price', format="$%d"),
+    'DK Ownership': st.column_config.NumberColumn('DK Ownership', format="%.2f%%"),
+    'FD Ownership': st.column_config.NumberColumn('FD Ownership', format="%.2f%%"),
+    'Combined Ownership': st.column_config.NumberColumn('Combined Ownership', format="%.2f%%"),
+    'Min Ownership': st.column_config.NumberColumn('Min Ownership', format="%.2f%%"),
+    'Ownership Spread': st.column_config.NumberColumn('Ownership Spread', format="%+.2f%%"),
+    'DK Own per $1k': st.column_config.NumberColumn('DK Own per $1k', format="%.2f%%"),
+    'FD Own per $1k': st.column_config.NumberColumn('FD Own per $1k', format="%.2f%%"),
+    'DK Projection': st.column_config.NumberColumn('DK Projection', format="%.1f"),
+    'FD Projection': st.column_config.NumberColumn('FD Projection', format="%.1f"),
+    'DK Proj per Own': st.column_config.NumberColumn('DK Proj per Own', format="%.2f"),
+    'FD Proj per Own': st.column_config.NumberColumn('FD Proj per Own', format="%.2f"),
+    'DK Proj per $1k': st.column_config.NumberColumn('DK Proj per $1k', format="%.2f"),
+    'FD Proj per $1k': st.column_config.NumberColumn('FD Proj per $1k', format="%.2f"),
+}
+
+def store_sport_results(sport, df, captured_at=None, slate=None):
+    """Guarda los datos y análisis de un deporte (del slate indicado, None = el principal) en session state"""
+    st.session_state[f"{sport}_slate"] = slate
+    st.session_state[f"{sport}_captured_at"] = captured_at or datetime.now()
+    st.session_state[f"{sport}_data"] = df
+    leaderboard = get_leaderboard(df)
+    st.session_state[f"{sport}_leaderboard"] = leaderboard
+    st.session_state[f"{sport}_analyzed"] = (leaderboard.leaders(), leaderboard.frame)
+    st.session_state[f"{sport}_top"] = leaderboard.top_tables()
+
+def warn_if_incomplete(sport, df):
+    """Avisa si el scrape leyó menos filas de las que la lista decía tener"""
+    report = df.attrs.get('completeness')
+    if report and not report['complete']:
+        read = report['collected_rows'] + report['row_errors']
+        st.warning(f"⚠️ {SPORTS[sport]['name']}: se leyeron {read} de {report['expected_rows']} filas esperadas")
+
+def format_age(captured_at):
+    """Antigüedad legible de un snapshot"""
+    minutes = int((datetime.now() - captured_at).total_seconds() // 60)
+    if minutes < 1:
+        return "hace menos de un minuto"
+    if minutes < 60:
+        return f"hace {minutes} min"
+    return f"hace {minutes // 60} h {minutes % 60} min"
+
+def sync_prefetched_results(scheduler):
+    """Carga en la sesión los snapshots del prefetch más nuevos que los que ya tiene. Devuelve si hubo cambios"""
+    updated = False
+    for sport in SPORTS:
+        latest = scheduler.latest(sport)
+        # El prefetch es del slate principal: no reemplaza otro slate elegido en el selector
+        if latest is None or st.session_state.get(f"{sport}_slate") is not None:
+            continue
+        current = st.session_state.get(f"{sport}_captured_at")
+        if current is None or latest['captured_at'] > current:
+            store_sport_results(sport, latest['data'], latest['captured_at'])
+            updated = True
+    return updated
+
+@st.fragment(run_every=PREFETCH_TICK_SECONDS)
+def render_prefetch_status(scheduler):
+    """Antigüedad del snapshot servido y estado del refresco en curso de cada deporte"""
+    if sync_prefetched_results(scheduler):
+        st.rerun()
     
-    # Calcular métricas adicionales
-    df_analysis['Combined Ownership'] = df_analysis['DK Ownership'] + df_analysis['FD Ownership']
-    df_analysis['Min Ownership'] = df_analysis[['DK Ownership', 'FD Ownership']].min(axis=1)
+    columns = st.columns(len(SPORTS))
+    for column, (sport, config) in zip(columns, SPORTS.items()):
+        status = scheduler.status(sport)
+        captured_at = st.session_state.get(f"{sport}_captured_at")
+        lines = [f"**{config['icon']} {config['name']}**"]
+        lines.append(f"Datos de {format_age(captured_at)}" if captured_at else "Sin datos todavía")
+        if status['state'] == 'running':
+            lines.append(f"🔄 Actualizando desde las {status['started_at']:%H:%M}")
+        elif status['state'] == 'failed':
+            lines.append(f"⚠️ Último refresco falló: {status['error']}")
+        elif status['next_run'] and status['next_run'] != datetime.max:
+            lines.append(f"Próximo refresco: {status['next_run']:%H:%M}")
+        column.caption("  \n".join(lines))
+
+@st.cache_data
+def load_trace_history(traces_mtime, limit=50):
+    """Historial de trazas, cacheado hasta que cambie el directorio de trazas"""
+    return load_traces(limit=limit)
+
+def render_diagnostics():
+    """Panel de diagnóstico: historial de scrapes y desglose por fase de una ejecución"""
+    try:
+        traces_mtime = os.path.getmtime(TRACE_ROOT)
+    except OSError:
+        traces_mtime = None
+    traces = load_trace_history(traces_mtime)
+    if not traces:
+        st.caption("Sin scrapes registrados todavía")
+        return
     
-    # Crear diccionario con los resultados
-    results = {
-        'max_dk': df_analysis.loc[df_analysis['DK Ownership'].idxmax()].to_dict(),
-        'max_fd': df_analysis.loc[df_analysis['FD Ownership'].idxmax()].to_dict(),
-        'max_combined': df_analysis.loc[df_analysis['Combined Ownership'].idxmax()].to_dict(),
-        'max_min': df_analysis.loc[df_analysis['Min Ownership'].idxmax()].to_dict()
-    }
+    history = pd.DataFrame([{
+        'Inicio': trace['started_at'][:19].replace('T', ' '),
+        'Deporte': trace['sport'].upper(),
+        'Resultado': trace['outcome'],
+        'Origen': trace.get('source'),
+        'Segundos': trace['total_s'],
+        'Filas': trace['rows'],
+        'Esperadas': (trace.get('completeness') or {}).get('expected_rows'),
+        'Completo': (trace.get('completeness') or {}).get('complete'),
+        'Scrolls': len(trace['scrolls']),
+        'Errores': len(trace['errors'])
+    } for trace in traces])
+    st.dataframe(history, hide_index=True, use_container_width=True)
     
-    return results, df_analysis
-
-def get_top_players(df, n=10):
-    """Obtener top N jugadores por diferentes métricas"""
-    df_top = df.copy()
+    selected = st.selectbox(
+        "Detalle de la ejecución",
+        range(len(traces)),
+        format_func=lambda i: f"{history.iloc[i]['Deporte']} · {history.iloc[i]['Inicio']}"
+    )
+    trace = traces[selected]
     
-    # Crear diferentes clasificaciones
-    top_dk = df_top.nlargest(n, 'DK Ownership')[['Player', 'Team', 'DK Price', 'DK Ownership']]
-    top_fd = df_top.nlargest(n, 'FD Ownership')[['Player', 'Team', 'FD Price', 'FD Ownership']]
-    top_combined = df_top.nlargest(n, 'Combined Ownership')[['Player', 'Team', 'DK Ownership', 'FD Ownership', 'Combined Ownership']]
-    top_min = df_top.nlargest(n, 'Min Ownership')[['Player', 'Team', 'DK Ownership', 'FD Ownership', 'Min Ownership']]
+    phases = pd.DataFrame(list(trace['phase_totals'].items()), columns=['Fase', 'Segundos'])
+    fig = px.bar(phases, x='Segundos', y='Fase', orientation='h', title='Tiempo por fase')
+    fig.update_layout(height=250, margin=dict(l=0, r=0, t=30, b=0))
+    st.plotly_chart(fig, use_container_width=True)
     
-    return {
-        'top_dk': top_dk,
-        'top_fd': top_fd,
-        'top_combined': top_combined,
-        'top_min': top_min
-    }
-
-def download_link(df, filename, text):
-    """Genera un enlace para descargar un DataFrame como archivo CSV"""
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">{text}</a>'
-    return href
+    if trace['scrolls']:
+        st.markdown("**Filas nuevas por scroll**")
+        st.bar_chart(pd.DataFrame(trace['scrolls'])['new_rows'], height=150)
+    if trace['counters']:
+        st.markdown("**Reintentos y respaldos**")
+        st.json(trace['counters'])
+    if trace['errors']:
+        st.markdown(f"**Errores ({len(trace['errors'])})**")
+        st.dataframe(pd.DataFrame(trace['errors']), hide_index=True, use_container_width=True)
 
-# Interfaz de usuario con Streamlit
-st.title("🏆 Fantasy Sports Ownership Dashboard")
-st.markdown("Herramienta para analizar datos de propiedad (ownership) en Fantasy Sports")
-
-# Crear pestañas para diferentes deportes
-tab_mlb, tab_nba, tab_about = st.tabs(["⚾ MLB Ownership", "🏀 NBA Ownership", "ℹ️ Acerca de"])
+def refresh_live_results(sport):
+    """Recalcula el análisis de un deporte si el modo en vivo cambió sus datos desde el último rerun completo"""
+    if st.session_state.pop(f"{sport}_live_pending", False):
+        store_sport_results(sport, st.session_state[f"{sport}_data"],
+                            captured_at=st.session_state.get(f"{sport}_live_at"))
 
-with tab_mlb:
-    st.header("⚾ MLB Ownership Data")
+@st.fragment(run_every=WATCH_POLL_INTERVAL)
+def render_live_updates():
+    """
+    Aplica los cambios de los watchers activos a los datos guardados y los muestra. Solo se
+    redibuja este fragmento; el análisis del dashboard se recalcula en el siguiente rerun completo.
+    """
+    loaded = False
+    for sport, config in SPORTS.items():
+        watcher = get_watcher(sport)
+        if watcher.error:
+            st.error(f"{config['name']}: {watcher.error}")
+            continue
+        if not watcher.running:
+            continue
+        
+        if f"{sport}_data" not in st.session_state:
+            # Primera tabla del watcher: se guarda completa y se dibuja el dashboard una vez
+            live_data = watcher.frame()
+            if live_data is not None:
+                store_sport_results(sport, live_data)
+                st.session_state[f"{sport}_live_seq"] = watcher.last_seq
+                loaded = True
+        elif st.session_state.get(f"{sport}_slate") is None:
+            # El watcher sigue el slate principal: solo se aplican las celdas de los jugadores que cambiaron
+            new_events = watcher.events_since(st.session_state.get(f"{sport}_live_seq", 0))
+            if new_events:
+                players = list(dict.fromkeys(event['player'] for event in new_events))
+                st.session_state[f"{sport}_data"] = apply_ownership_updates(
+                    st.session_state[f"{sport}_data"], watcher.records(players)
+                )
+                st.session_state[f"{sport}_live_seq"] = new_events[-1]['seq']
+                st.session_state[f"{sport}_live_at"] = new_events[-1]['time']
+                st.session_state[f"{sport}_live_pending"] = True
+        
+        st.caption(f"{config['icon']} {config['name']}: {watcher.last_seq} cambios registrados")
+        recent = watcher.events_since(max(watcher.last_seq - 10, 0))
+        if recent:
+            st.dataframe(
+                pd.DataFrame(recent[::-1])[['time', 'player', 'field', 'old', 'new']],
+                use_container_width=True,
+                hide_index=True
+            )
+        if st.session_state.get(f"{sport}_live_pending") and st.button(
+            "Actualizar análisis", key=f"{sport}_live_refresh", help="Recalcula líderes, tops y gráficos con los cambios"
+        ):
+            loaded = True
     
-    # Botón para iniciar el scraping
+    # Rerun completo solo al cargar la primera tabla o cuando se pide actualizar el análisis
+    if loaded:
+        st.rerun()
+
+# Vista genérica por deporte. Solo se dibuja la sección seleccionada, las figuras se cachean
+# por (hash del snapshot, parámetros) y el slider del gráfico vive en un fragmento propio.
+LEADER_CARDS = (
+    ('max_dk', "Mayor Ownership en DraftKings",
+     (('DK Ownership', 'DK Ownership'), ('Precio DK', 'DK Price'), ('FD Ownership', 'FD Ownership'))),
+    ('max_fd', "Mayor Ownership en FanDuel",
+     (('FD Ownership', 'FD Ownership'), ('Precio FD', 'FD Price'), ('DK Ownership', 'DK Ownership'))),
+    ('max_combined', "Mayor Ownership Combinado",
+     (('Total', 'Combined Ownership'), ('DK', 'DK Ownership'), ('FD', 'FD Ownership'))),
+    ('max_min', "Mayor Ownership en Ambas",
+     (('Mínimo', 'Min Ownership'), ('DK', 'DK Ownership'), ('FD', 'FD Ownership'))),
+)
+TOP_TABLE_TITLES = {
+    'top_dk': "Top 10 DraftKings Ownership",
+    'top_fd': "Top 10 FanDuel Ownership",
+    'top_combined': "Top 10 Ownership Combinado",
+    'top_min': "Top 10 Ownership en Ambas Plataformas",
+}
+LEVERAGE_TABLE_TITLES = {
+    'lev_dk_own': "Top 10 Proyección por Punto de Ownership (DK)",
+    'lev_fd_own': "Top 10 Proyección por Punto de Ownership (FD)",
+    'lev_dk_value': "Top 10 Proyección por $1k (DK)",
+    'lev_fd_value': "Top 10 Proyección por $1k (FD)",
+}
+SPORT_SECTIONS = ("Top Jugadores", "Tabla Completa", "Visualizaciones", "Movimiento", "Lineups")
+ABOUT_VIEW = "about"
+
+
+def format_card_value(column, value):
+    return format_price(value) if column.endswith('Price') else f"{value:.2f}%"
+
+
+@st.cache_data(max_entries=64)
+def build_ownership_bar(snapshot_hash, n_players, _leaderboard):
+    """Barras DK vs FD del top n por ownership mínimo"""
+    fig = px.bar(
+        _leaderboard.top('Min Ownership', n_players),
+        x='Player',
+        y=['DK Ownership', 'FD Ownership'],
+        title=f'Top {n_players} Jugadores por Ownership',
+        labels={'value': 'Ownership (%)', 'Player': 'Jugador', 'variable': 'Plataforma'},
+        barmode='group',
+        color_discrete_sequence=['#1E88E5', '#FFC107']
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def build_ownership_scatter(snapshot_hash, _leaderboard):
+    """Dispersión DK vs FD ownership con la línea de 45 grados como referencia"""
+    data = _leaderboard.frame
+    fig = px.scatter(
+        data,
+        x='DK Ownership',
+        y='FD Ownership',
+        hover_name='Player',
+        hover_data={'Team': True, 'DK Price': ':$,', 'FD Price': ':$,'},
+        title='Comparación de Ownership entre DraftKings y FanDuel',
+        labels={'DK Ownership': 'DraftKings Ownership (%)', 'FD Ownership': 'FanDuel Ownership (%)'}
+    )
+    fig.update_layout(
+        xaxis_title="DraftKings Ownership (%)",
+        yaxis_title="FanDuel Ownership (%)"
+    )
+    max_val = float(max(data['DK Ownership'].max(), data['FD Ownership'].max()))
+    fig.add_shape(
+        type='line',
+        x0=0,
+        y0=0,
+        x1=max_val,
+        y1=max_val,
+        line=dict(color='red', dash='dash')
+    )
+    return fig
+
+
+# Ventanas de "mayores movimientos desde T", medidas hacia atrás desde el último snapshot
+MOVEMENT_WINDOWS = {
+    "30 minutos": timedelta(minutes=30),
+    "1 hora": timedelta(hours=1),
+    "2 horas": timedelta(hours=2),
+    "4 horas": timedelta(hours=4),
+    "Todo el día": None,
+}
+MOVEMENT_COLUMNS = ['Player', 'Team', 'Start', 'End', 'Delta', 'Rate']
+MOVEMENT_COLUMN_CONFIG = {
+    'Start': st.column_config.NumberColumn('Inicio', format="%.2f%%"),
+    'End': st.column_config.NumberColumn('Ahora', format="%.2f%%"),
+    'Delta': st.column_config.NumberColumn('Cambio', format="%+.2f%%"),
+    'Rate': st.column_config.NumberColumn('Por hora', format="%+.2f%%"),
+}
+
+
+@st.cache_data(max_entries=64)
+def build_movement(sport, version, metric, window, n_players, _series):
+    """Subas, bajas y gráfico de los mayores movimientos de la serie en su versión actual"""
+    since = _series.times[-1] - MOVEMENT_WINDOWS[window] if MOVEMENT_WINDOWS[window] else None
+    risers = _series.movers(metric, since, n_players, 'up')
+    fallers = _series.movers(metric, since, n_players, 'down')
+    movers = _series.movers(metric, since, n_players, 'abs')
+    history = _series.history(movers['Player'], metric)
+    if since is not None:
+        history = history[history['Captured At'] >= since]
+    fig = px.line(
+        history,
+        x='Captured At',
+        y=metric,
+        color='Player',
+        markers=True,
+        title=f'Evolución de {metric} de los mayores movimientos',
+        labels={'Captured At': 'Hora', metric: f'{metric} (%)', 'Player': 'Jugador'}
+    )
+    return risers[MOVEMENT_COLUMNS], fallers[MOVEMENT_COLUMNS], fig
+
+
+def render_scrape_controls(sport):
+    """Botón de extracción y descarga de un deporte"""
+    config = SPORTS[sport]
+    # Lugar para las filas parciales mientras el scrape sigue recorriendo la lista
+    partial_table = st.empty()
     col1, col2 = st.columns([1, 2])
     with col1:
-        if st.button("Extraer datos de MLB", type="primary", use_container_width=True):
+        if st.button(f"Extraer datos de {config['name']}", type="primary", use_container_width=True,
+                     key=f"{sport}_scrape"):
             # Crear barra de progreso
             progress_bar = st.progress(0)
-            status_text = st.empty()
             progress_bar.text("Iniciando...")
             
+            def show_partial(rows):
+                partial_table.dataframe(pd.DataFrame(rows, columns=OWNERSHIP_COLUMNS), hide_index=True,
+                                        use_container_width=True, height=250)
+            
             # Ejecutar scraping
-            mlb_data = scrape_ownership_data("mlb", progress_bar)
+            data = scrape_ownership_data(sport, progress_bar, on_partial=show_partial)
+            partial_table.empty()
             
             # Guardar en session state
-            if mlb_data is not None:
-                st.session_state.mlb_data = mlb_data
-                st.session_state.mlb_analyzed = analyze_highest_ownership(mlb_data, "MLB")
-                st.session_state.mlb_top = get_top_players(st.session_state.mlb_analyzed[1])
-                st.success(f"✅ Datos extraídos correctamente: {len(mlb_data)} jugadores")
+            if data is not None:
+                store_sport_results(sport, data)
+                get_prefetch_scheduler().publish(sport, data, st.session_state[f"{sport}_captured_at"])
+                st.success(f"✅ Datos extraídos correctamente: {len(data)} jugadores")
+                warn_if_incomplete(sport, data)
             else:
                 st.error("❌ Error al extraer los datos")
+                if load_checkpoint(sport, ownership_url(sport)):
+                    st.info("Las filas ya leídas quedaron guardadas: al reintentar, el scrape continúa desde donde se cortó.")
+        
+        if st.button("Extraer todos los slates", use_container_width=True, key=f"{sport}_scrape_slates"):
+            progress_bar = st.progress(0)
+            progress_bar.text("Iniciando...")
+            results = scrape_sport_slates(sport, progress_bar)
+            captured_at = datetime.now()
+            slates = {
+                slate: {'label': result['label'], 'data': result['data'], 'captured_at': captured_at}
+                for slate, result in results.items() if result['data'] is not None
+            }
+            st.session_state[f"{sport}_slates"] = slates
+            if None in slates:
+                store_sport_results(sport, slates[None]['data'], captured_at)
+                get_prefetch_scheduler().publish(sport, slates[None]['data'], captured_at)
+            failed = [result['label'] for result in results.values() if result['data'] is None]
+            if slates:
+                st.success(f"✅ {len(slates)} slates extraídos")
+            if failed:
+                st.error(f"❌ Error al extraer los slates: {', '.join(failed)}")
     
     with col2:
-        if 'mlb_data' in st.session_state:
-            st.success(f"✅ Datos disponibles: {len(st.session_state.mlb_data)} jugadores")
-            st.markdown(
-                download_link(
-                    st.session_state.mlb_data, 
-                    'mlb_ownership.csv', 
-                    '⬇️ Descargar datos en formato CSV'
-                ), 
-                unsafe_allow_html=True
-            )
+        if f"{sport}_data" in st.session_state:
+            st.success(f"✅ Datos disponibles: {len(st.session_state[f'{sport}_data'])} jugadores")
+            render_export_controls(sport)
+
+
+def render_download(label, path, file_name, mime, key):
+    """Botón de descarga del archivo; Streamlit lo carga entero en memoria, así que los muy grandes no se sirven"""
+    size_mb = os.path.getsize(path) / 2**20
+    if size_mb > EXPORT_INLINE_MAX_MB:
+        st.warning(f"El archivo pesa {size_mb:.0f} MB, más de los {EXPORT_INLINE_MAX_MB} MB que el dashboard sirve "
+                   f"directamente. Quedó en {path}; también se puede generar con `python -m ownership export`.")
+        return
+    with open(path, 'rb') as f:
+        st.download_button(label, f, file_name=file_name, mime=mime, key=key, use_container_width=True)
+
+
+def render_export_controls(sport):
+    """Descarga del snapshot actual; el archivo se genera solo al pedirlo y se cachea por snapshot"""
+    snapshot_key = st.session_state[f"{sport}_leaderboard"].snapshot_hash
+    col_format, col_button = st.columns([1, 1])
+    fmt = col_format.selectbox("Formato", list(EXPORT_FORMATS), key=f"{sport}_export_format",
+                               format_func=lambda key: EXPORT_FORMATS[key]['label'],
+                               label_visibility="collapsed")
+    prepared = st.session_state.get(f"{sport}_export")
+    if prepared != (snapshot_key, fmt) and col_button.button("Preparar descarga", key=f"{sport}_export_prepare",
+                                                             use_container_width=True):
+        prepared = st.session_state[f"{sport}_export"] = (snapshot_key, fmt)
+    if prepared == (snapshot_key, fmt):
+        with col_button:
+            path = export_frame(st.session_state[f"{sport}_data"], fmt, snapshot_key)
+            extension = EXPORT_FORMATS[fmt]['extension']
+            render_download(f"⬇️ Descargar {EXPORT_FORMATS[fmt]['label']}", path,
+                            f"{sport}_ownership.{extension}", EXPORT_FORMATS[fmt]['mime'], f"{sport}_export_download")
+
+
+def render_history_export(sport):
+    """Exporta un rango del historial de snapshots como un único ZIP"""
+    with st.expander("📦 Exportar historial"):
+        today = datetime.now().date()
+        col_range, col_format = st.columns([2, 1])
+        date_range = col_range.date_input("Rango", (today - timedelta(days=7), today), key=f"{sport}_history_range")
+        fmt = col_format.selectbox("Formato", list(EXPORT_FORMATS), key=f"{sport}_history_format",
+                                   format_func=lambda key: EXPORT_FORMATS[key]['label'])
+        if len(date_range) != 2:
+            return
+        if st.button("Generar archivo", key=f"{sport}_history_prepare"):
+            start = datetime.combine(date_range[0], datetime.min.time())
+            end = datetime.combine(date_range[1], datetime.max.time())
+            os.makedirs(EXPORT_ROOT, exist_ok=True)
+            path = os.path.join(EXPORT_ROOT, f"{sport}_history_{date_range[0]}_{date_range[1]}_{fmt}.zip")
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                count = export_history_archive(sport, start, end, fmt, f)
+            os.replace(tmp_path, path)
+            prune_export_cache()
+            st.session_state[f"{sport}_history_export"] = (path, count)
+        if f"{sport}_history_export" in st.session_state:
+            path, count = st.session_state[f"{sport}_history_export"]
+            if not count:
+                st.info("No hay snapshots en ese rango")
+            elif os.path.exists(path):
+                render_download(f"⬇️ Descargar {count} snapshots", path, os.path.basename(path),
+                                "application/zip", f"{sport}_history_download")
+
+
+def render_leader_cards(leaders):
+    """Tarjetas con los jugadores destacados, en filas de dos"""
+    for start in range(0, len(LEADER_CARDS), 2):
+        for col, (key, title, lines) in zip(st.columns(2), LEADER_CARDS[start:start + 2]):
+            with col:
+                st.subheader(title)
+                leader = leaders[key]
+                details = "\n".join(
+                    f"- **{label}**: {format_card_value(column, leader[column])}" for label, column in lines
+                )
+                st.markdown(f"### 👑 {leader['Player']} ({leader['Team']})\n{details}")
+
+
+def render_top_tables(top_data, titles=TOP_TABLE_TITLES, heading="Top 10 Jugadores por Categoría"):
+    """Top 10 jugadores en las distintas categorías"""
+    st.subheader(heading)
+    keys = list(titles)
+    for start in range(0, len(keys), 2):
+        for col, key in zip(st.columns(2), keys[start:start + 2]):
+            with col:
+                st.markdown(f"#### {titles[key]}")
+                st.dataframe(top_data[key], use_container_width=True, column_config=OWNERSHIP_COLUMN_CONFIG)
+
+
+@st.fragment
+def render_ownership_bar(sport):
+    """Slider y gráfico de barras: mover el slider solo redibuja este gráfico"""
+    leaderboard = st.session_state[f"{sport}_leaderboard"]
+    n_players = st.slider("Número de jugadores a mostrar", 5, 30, 15, key=f"{sport}_n_players")
+    st.plotly_chart(build_ownership_bar(leaderboard.snapshot_hash, n_players, leaderboard),
+                    use_container_width=True)
+
+
+@st.fragment
+def render_movement(sport):
+    """Movimiento del ownership entre los snapshots del día del slate mostrado"""
+    key = slate_key(sport, st.session_state.get(f"{sport}_slate"))
+    series = get_series(key)
+    if len(series) < 2:
+        st.info("Hacen falta al menos dos snapshots del día para ver el movimiento del ownership")
+        return
+    col_metric, col_window, col_n = st.columns(3)
+    metric = col_metric.selectbox("Métrica", TIMESERIES_METRICS, key=f"{sport}_movement_metric")
+    window = col_window.selectbox("Desde", list(MOVEMENT_WINDOWS), index=1, key=f"{sport}_movement_window")
+    n_players = col_n.slider("Jugadores", 3, 20, 8, key=f"{sport}_movement_players")
     
-    # Mostrar datos si están disponibles
-    if 'mlb_data' in st.session_state:
-        # Sección de análisis destacado
-        st.header("🔍 Análisis Destacado")
-        
-        # Obtener resultados del análisis
-        analysis_results = st.session_state.mlb_analyzed[0]
-        
-        # Mostrar tarjetas con los jugadores destacados
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Mayor Ownership en DraftKings")
-            max_dk = analysis_results['max_dk']
-            st.markdown(f"""
-            ### 👑 {max_dk['Player']} ({max_dk['Team']})
-            - **DK Ownership**: {max_dk['DK Ownership']:.2f}%
-            - **Precio DK**: {max_dk['DK Price']}
-            - **FD Ownership**: {max_dk['FD Ownership']:.2f}%
-            """)
-        
-        with col2:
-            st.subheader("Mayor Ownership en FanDuel")
-            max_fd = analysis_results['max_fd']
-            st.markdown(f"""
-            ### 👑 {max_fd['Player']} ({max_fd['Team']})
-            - **FD Ownership**: {max_fd['FD Ownership']:.2f}%
-            - **Precio FD**: {max_fd['FD Price']}
-            - **DK Ownership**: {max_fd['DK Ownership']:.2f}%
-            """)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Mayor Ownership Combinado")
-            max_combined = analysis_results['max_combined']
-            st.markdown(f"""
-            ### 👑 {max_combined['Player']} ({max_combined['Team']})
-            - **Total**: {max_combined['Combined Ownership']:.2f}%
-            - **DK**: {max_combined['DK Ownership']:.2f}%
-            - **FD**: {max_combined['FD Ownership']:.2f}%
-            """)
-        
-        with col2:
-            st.subheader("Mayor Ownership en Ambas")
-            max_min = analysis_results['max_min']
-            st.markdown(f"""
-            ### 👑 {max_min['Player']} ({max_min['Team']})
-            - **Mínimo**: {max_min['Min Ownership']:.2f}%
-            - **DK**: {max_min['DK Ownership']:.2f}%
-            - **FD**: {max_min['FD Ownership']:.2f}%
-            """)
-        
-        # Pestañas para tops y tablas
-        tab_top, tab_table, tab_viz = st.tabs(["Top Jugadores", "Tabla Completa", "Visualizaciones"])
-        
-        with tab_top:
-            # Mostrar top 10 jugadores en diferentes categorías
-            st.subheader("Top 10 Jugadores por Categoría")
-            top_data = st.session_state.mlb_top
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("#### Top 10 DraftKings Ownership")
-                st.dataframe(top_data['top_dk'], use_container_width=True)
-            
-            with col2:
-                st.markdown("#### Top 10 FanDuel Ownership")
-                st.dataframe(top_data['top_fd'], use_container_width=True)
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("#### Top 10 Ownership Combinado")
-                st.dataframe(top_data['top_combined'], use_container_width=True)
-            
-            with col2:
-                st.markdown("#### Top 10 Ownership en Ambas Plataformas")
-                st.dataframe(top_data['top_min'], use_container_width=True)
-        
-        with tab_table:
-            # Mostrar tabla completa con filtrado
-            st.subheader("Datos Completos")
-            st.dataframe(st.session_state.mlb_data, use_container_width=True)
-        
-        with tab_viz:
-            # Visualizaciones
-            st.subheader("Visualizaciones")
-            
-            # Seleccionar top N jugadores para gráfico
-            n_players = st.slider("Número de jugadores a mostrar", 5, 30, 15)
-            
-            # Obtener datos para visualización
-            top_players_viz = st.session_state.mlb_analyzed[1].nlargest(n_players, 'Min Ownership')
-            
-            # Crear gráfico de barras comparativas
-            fig = px.bar(
-                top_players_viz,
-                x='Player',
-                y=['DK Ownership', 'FD Ownership'],
-                title=f'Top {n_players} Jugadores por Ownership',
-                labels={'value': 'Ownership (%)', 'Player': 'Jugador', 'variable': 'Plataforma'},
-                barmode='group',
-                color_discrete_sequence=['#1E88E5', '#FFC107']
-            )
-            fig.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Gráfico de dispersión: DK vs FD ownership
-            fig2 = px.scatter(
-                st.session_state.mlb_analyzed[1],
-                x='DK Ownership',
-                y='FD Ownership',
-                hover_name='Player',
-                hover_data=['Team', 'DK Price', 'FD Price'],
-                title='Comparación de Ownership entre DraftKings y FanDuel',
-                labels={'DK Ownership': 'DraftKings Ownership (%)', 'FD Ownership': 'FanDuel Ownership (%)'}
-            )
-            fig2.update_layout(
-                xaxis_title="DraftKings Ownership (%)",
-                yaxis_title="FanDuel Ownership (%)"
-            )
-            # Añadir línea de 45 grados para referencia
-            max_val = max(
-                st.session_state.mlb_analyzed[1]['DK Ownership'].max(),
-                st.session_state.mlb_analyzed[1]['FD Ownership'].max()
-            )
-            fig2.add_shape(
-                type='line',
-                x0=0,
-                y0=0,
-                x1=max_val,
-                y1=max_val,
-                line=dict(color='red', dash='dash')
+    risers, fallers, fig = build_movement(key, series.version, metric, window, n_players, series)
+    col_up, col_down = st.columns(2)
+    with col_up:
+        st.markdown("**📈 Mayores subas**")
+        st.dataframe(risers, hide_index=True, use_container_width=True, column_config=MOVEMENT_COLUMN_CONFIG)
+    with col_down:
+        st.markdown("**📉 Mayores bajas**")
+        st.dataframe(fallers, hide_index=True, use_container_width=True, column_config=MOVEMENT_COLUMN_CONFIG)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(series)} snapshots desde las {series.times[0]:%H:%M}")
+
+
+LINEUP_COLUMN_CONFIG = {
+    'Salary': st.column_config.NumberColumn('Salario', format="$%d"),
+    'Ownership': st.column_config.NumberColumn('Ownership', format="%.1f%%"),
+    'Score': st.column_config.NumberColumn('Score', format="%.1f"),
+}
+
+
+@st.cache_data(max_entries=16, show_spinner="Generando lineups...")
+def build_lineups(snapshot_hash, sport, site, options, _leaderboard):
+    """Lineups del snapshot (con las proyecciones si las hay) para unas opciones dadas"""
+    return generate_lineups(_leaderboard.frame, sport, site, **dict(options))
+
+
+@st.fragment
+def render_lineups(sport, leaderboard):
+    """Generador de lineups con techo de ownership, límites por equipo y exposición"""
+    if not leaderboard.has_projections:
+        st.caption("Sin proyecciones cargadas el score es el salario; los slots usan posiciones si el archivo las trae.")
+    col_site, col_count, col_ceiling = st.columns(3)
+    sites = lineup_sites(sport)
+    site = col_site.selectbox("Sitio", list(sites), format_func=sites.get, key=f"{sport}_lineup_site")
+    n_lineups = col_count.number_input("Lineups", 1, 5000, 150, step=50, key=f"{sport}_lineup_count")
+    ceiling = col_ceiling.number_input("Techo de ownership (suma de %)", 0.0, 1000.0, 0.0, step=10.0,
+                                       key=f"{sport}_lineup_ceiling", help="0 = sin techo")
+    col_stack, col_team, col_exposure = st.columns(3)
+    min_stack = col_stack.number_input("Stack mínimo", 0, 8, 0, key=f"{sport}_lineup_stack", help="0 = sin mínimo")
+    max_per_team = col_team.number_input("Máximo por equipo", 0, 8, 0, key=f"{sport}_lineup_team",
+                                         help="0 = el del sitio")
+    max_exposure = col_exposure.slider("Exposición máxima", 0.05, 1.0, 1.0, key=f"{sport}_lineup_exposure")
+    if st.button("Generar lineups", key=f"{sport}_lineup_generate"):
+        options = (('n_lineups', n_lineups), ('ownership_ceiling', ceiling or None), ('min_stack', min_stack or None),
+                   ('max_per_team', max_per_team or None), ('max_exposure', max_exposure))
+        try:
+            st.session_state[f"{sport}_lineups"] = (
+                leaderboard.snapshot_hash, site, build_lineups(leaderboard.snapshot_hash, sport, site, options, leaderboard)
             )
-            st.plotly_chart(fig2, use_container_width=True)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+
+    # Los lineups quedan en la sesión para simular el field sin volver a generarlos
+    generated = st.session_state.get(f"{sport}_lineups")
+    if generated is None or generated[0] != leaderboard.snapshot_hash:
+        return
+    _, site, lineups = generated
+    stats = lineups.attrs['stats']
+    st.caption(f"{stats['lineups']} lineups de {stats['valid']:,} válidos entre {stats['candidates']:,} "
+               f"candidatos ({stats['seconds']} s)")
+    if lineups.empty:
+        st.warning("Ningún candidato cumple las restricciones; prueba con un techo de ownership más alto")
+        return
+    st.dataframe(lineups, hide_index=True, use_container_width=True, column_config=LINEUP_COLUMN_CONFIG)
+    st.download_button("⬇️ Descargar CSV", lineups.to_csv(index=False), file_name=f"{sport}_{site}_lineups.csv",
+                       mime="text/csv", key=f"{sport}_lineup_download")
+    render_field_simulation(sport, site, lineups, leaderboard)
+
+
+FIELD_COLUMN_CONFIG = {
+    'Ownership': st.column_config.NumberColumn('Ownership', format="%.1f%%"),
+    'Field Exposure': st.column_config.NumberColumn('Exposición en el field', format="%.1f%%"),
+    'Exposure Diff': st.column_config.NumberColumn('Diferencia', format="%+.1f%%"),
+    'Stack Rate': st.column_config.NumberColumn('Stacks', format="%.1f%%"),
+    'Expected Duplicates': st.column_config.NumberColumn('Copias esperadas', format="%.2f"),
+    'Duplication Probability': st.column_config.NumberColumn('Prob. duplicado', format="%.1f%%"),
+}
+
 
-with tab_nba:
-    st.header("🏀 NBA Ownership Data")
+@st.cache_data(max_entries=8, show_spinner="Simulando el field...")
+def build_field(snapshot_hash, sport, site, field_size, n_fields, lineups, _leaderboard):
+    """Simulación del field del snapshot para los lineups generados, reutilizada mientras no cambien"""
+    return simulate_field(_leaderboard.frame, sport, site, field_size=field_size, lineups=lineups,
+                          n_fields=n_fields, seed=0)
+
+
+def render_field_simulation(sport, site, lineups, leaderboard):
+    """Duplicación esperada de los lineups y exposición del field por jugador y equipo"""
+    st.markdown("**🎲 Simulación del field**")
+    col_size, col_fields, col_button = st.columns(3)
+    field_size = col_size.number_input("Entradas del concurso", 1000, 1000000, FIELD_SIZE, step=10000,
+                                       key=f"{sport}_field_size")
+    n_fields = col_fields.number_input("Fields a simular", 1, 10, 1, key=f"{sport}_field_count",
+                                       help="Más fields = estimaciones de duplicación más finas")
+    if not col_button.button("Simular field", key=f"{sport}_field_simulate", use_container_width=True):
+        return
+    try:
+        field = build_field(leaderboard.snapshot_hash, sport, site, field_size, n_fields, lineups, leaderboard)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+    stats = field['stats']
+    st.caption(f"{stats['simulated']:,} lineups simulados en {stats['seconds']} s · "
+               f"{stats['distinct_lineups']:,.0f} distintos por field · "
+               f"{stats['duplicated_entries']:.2f}% de entradas duplicadas")
+    duplication = field['lineups'].drop(columns=['Field Matches'])
+    st.dataframe(duplication, hide_index=True, use_container_width=True,
+                 column_config={**LINEUP_COLUMN_CONFIG, **FIELD_COLUMN_CONFIG})
+    col_players, col_teams = st.columns([2, 1])
+    col_players.dataframe(field['players'], hide_index=True, use_container_width=True, height=300,
+                          column_config=FIELD_COLUMN_CONFIG)
+    col_teams.dataframe(field['teams'], hide_index=True, use_container_width=True, height=300,
+                        column_config=FIELD_COLUMN_CONFIG)
+
+
+@st.cache_data(max_entries=8)
+def read_projection_file(content, name, sport, slate=None):
+    """Proyecciones subidas, leídas una sola vez por contenido del archivo (y slate elegido)"""
+    return load_projections(io.BytesIO(content), name, sport, slate)
+
+
+def shown_slate_aliases(sport):
+    """Id y nombre del slate mostrado, para reconocerlo en la columna Slate de las proyecciones"""
+    slate = st.session_state.get(f"{sport}_slate")
+    slates = st.session_state.get(f"{sport}_slates") or {}
+    label = slates[slate]['label'] if slate in slates else None
+    return [alias.lower() for alias in (slate, label) if alias]
+
+
+def projection_leaderboard(sport):
+    """Leaderboard del snapshot actual cruzado con las proyecciones subidas, o None"""
+    uploaded = st.session_state.get(f"{sport}_projections_file")
+    if uploaded is None:
+        return None
+    try:
+        projections = read_projection_file(uploaded.getvalue(), uploaded.name, sport)
+        slates = projection_slates(projections)
+        if len(slates) > 1:
+            # Un archivo con varios slates se cruza solo con uno (por defecto, el que se muestra)
+            shown = shown_slate_aliases(sport)
+            default = next((i for i, slate in enumerate(slates) if slate.lower() in shown), 0)
+            slate = st.selectbox("Slate de las proyecciones", slates, index=default,
+                                 key=f"{sport}_projections_slate_{st.session_state.get(f'{sport}_slate')}")
+            projections = read_projection_file(uploaded.getvalue(), uploaded.name, sport, slate)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return None
+    return get_leaderboard(join_projections(st.session_state[f"{sport}_data"], projections))
+
+
+def render_projection_upload(sport):
+    """Carga de proyecciones propias y resumen del cruce por nombre"""
+    with st.expander("📊 Proyecciones propias"):
+        st.file_uploader("Archivo de proyecciones (CSV o Parquet)", type=["csv", "parquet"],
+                         key=f"{sport}_projections_file",
+                         help="Columnas: jugador, equipo (opcional) y proyección genérica o por sitio")
+        leaderboard = projection_leaderboard(sport)
+        if leaderboard is None:
+            return None
+        summary = match_summary(leaderboard.frame)
+        missing = summary['unmatched'] + summary[MATCH_AMBIGUOUS]
+        st.caption(
+            f"Cruzados {len(leaderboard) - missing} de {len(leaderboard)} jugadores · "
+            + " · ".join(f"{method}: {summary[method]}" for method in MATCH_METHODS + (MATCH_AMBIGUOUS,))
+        )
+        if missing:
+            match = leaderboard.frame['Projection Match']
+            unmatched = leaderboard.frame.loc[match.isna() | (match == MATCH_AMBIGUOUS),
+                                              ['Player', 'Team', 'Projection Match']]
+            st.dataframe(unmatched, hide_index=True, use_container_width=True, height=150)
+        return leaderboard
+
+
+def render_slate_selector(sport):
+    """Selector entre los slates extraídos del deporte: el elegido pasa a ser los datos de la vista"""
+    slates = st.session_state.get(f"{sport}_slates")
+    if not slates:
+        return
     
-    # Botón para iniciar el scraping
-    col1, col2 = st.columns([1, 2])
-    with col1:
-        if st.button("Extraer datos de NBA", type="primary", use_container_width=True):
-            # Crear barra de progreso
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            progress_bar.text("Iniciando...")
-            
-            # Ejecutar scraping
-            nba_data = scrape_ownership_data("nba", progress_bar)
-            
-            # Guardar en session state
-            if nba_data is not None:
-                st.session_state.nba_data = nba_data
-                st.session_state.nba_analyzed = analyze_highest_ownership(nba_data, "NBA")
-                st.session_state.nba_top = get_top_players(st.session_state.nba_analyzed[1])
-                st.success(f"✅ Datos extraídos correctamente: {len(nba_data)} jugadores")
-            else:
-                st.error("❌ Error al extraer los datos")
+    def choose_slate():
+        slate = st.session_state[f"{sport}_slate_choice"]
+        store_sport_results(sport, slates[slate]['data'], slates[slate]['captured_at'], slate)
     
-    with col2:
-        if 'nba_data' in st.session_state:
-            st.success(f"✅ Datos disponibles: {len(st.session_state.nba_data)} jugadores")
-            st.markdown(
-                download_link(
-                    st.session_state.nba_data, 
-                    'nba_ownership.csv', 
-                    '⬇️ Descargar datos en formato CSV'
-                ), 
-                unsafe_allow_html=True
-            )
+    # El selector sigue al slate mostrado aunque otro scrape o el prefetch hayan cambiado los datos
+    current = st.session_state.get(f"{sport}_slate")
+    if current in slates:
+        st.session_state[f"{sport}_slate_choice"] = current
+    st.selectbox(
+        "Slate", list(slates), key=f"{sport}_slate_choice", on_change=choose_slate,
+        format_func=lambda key: f"{slates[key]['label']} · {len(slates[key]['data'])} jugadores"
+    )
+
+
+def render_sport_view(sport):
+    """Vista completa de un deporte: extracción, slate, análisis destacado y la sección elegida"""
+    config = SPORTS[sport]
+    st.header(f"{config['icon']} {config['name']} Ownership Data")
+    render_scrape_controls(sport)
+    render_slate_selector(sport)
+    render_history_export(sport)
     
-    # Mostrar datos si están disponibles (mismo código que MLB pero con nba_data)
-    if 'nba_data' in st.session_state:
-        # Sección de análisis destacado
-        st.header("🔍 Análisis Destacado")
-        
-        # Obtener resultados del análisis
-        analysis_results = st.session_state.nba_analyzed[0]
-        
-        # Mostrar tarjetas con los jugadores destacados
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Mayor Ownership en DraftKings")
-            max_dk = analysis_results['max_dk']
-            st.markdown(f"""
-            ### 👑 {max_dk['Player']} ({max_dk['Team']})
-            - **DK Ownership**: {max_dk['DK Ownership']:.2f}%
-            - **Precio DK**: {max_dk['DK Price']}
-            - **FD Ownership**: {max_dk['FD Ownership']:.2f}%
-            """)
-        
-        with col2:
-            st.subheader("Mayor Ownership en FanDuel")
-            max_fd = analysis_results['max_fd']
-            st.markdown(f"""
-            ### 👑 {max_fd['Player']} ({max_fd['Team']})
-            - **FD Ownership**: {max_fd['FD Ownership']:.2f}%
-            - **Precio FD**: {max_fd['FD Price']}
-            - **DK Ownership**: {max_fd['DK Ownership']:.2f}%
-            """)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Mayor Ownership Combinado")
-            max_combined = analysis_results['max_combined']
-            st.markdown(f"""
-            ### 👑 {max_combined['Player']} ({max_combined['Team']})
-            - **Total**: {max_combined['Combined Ownership']:.2f}%
-            - **DK**: {max_combined['DK Ownership']:.2f}%
-            - **FD**: {max_combined['FD Ownership']:.2f}%
-            """)
-        
-        with col2:
-            st.subheader("Mayor Ownership en Ambas")
-            max_min = analysis_results['max_min']
-            st.markdown(f"""
-            ### 👑 {max_min['Player']} ({max_min['Team']})
-            - **Mínimo**: {max_min['Min Ownership']:.2f}%
-            - **DK**: {max_min['DK Ownership']:.2f}%
-            - **FD**: {max_min['FD Ownership']:.2f}%
-            """)
-        
-        # Pestañas para tops y tablas
-        tab_top, tab_table, tab_viz = st.tabs(["Top Jugadores", "Tabla Completa", "Visualizaciones"])
-        
-        with tab_top:
-            # Mostrar top 10 jugadores en diferentes categorías
-            st.subheader("Top 10 Jugadores por Categoría")
-            top_data = st.session_state.nba_top
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("#### Top 10 DraftKings Ownership")
-                st.dataframe(top_data['top_dk'], use_container_width=True)
-            
-            with col2:
-                st.markdown("#### Top 10 FanDuel Ownership")
-                st.dataframe(top_data['top_fd'], use_container_width=True)
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("#### Top 10 Ownership Combinado")
-                st.dataframe(top_data['top_combined'], use_container_width=True)
-            
-            with col2:
-                st.markdown("#### Top 10 Ownership en Ambas Plataformas")
-                st.dataframe(top_data['top_min'], use_container_width=True)
-        
-        with tab_table:
-            # Mostrar tabla completa con filtrado
-            st.subheader("Datos Completos")
-            st.dataframe(st.session_state.nba_data, use_container_width=True)
-        
-        with tab_viz:
-            # Visualizaciones
-            st.subheader("Visualizaciones")
-            
-            # Seleccionar top N jugadores para gráfico
-            n_players = st.slider("Número de jugadores a mostrar", 5, 30, 15, key="nba_slider")
-            
-            # Obtener datos para visualización
-            top_players_viz = st.session_state.nba_analyzed[1].nlargest(n_players, 'Min Ownership')
-            
-            # Crear gráfico de barras comparativas
-            fig = px.bar(
-                top_players_viz,
-                x='Player',
-                y=['DK Ownership', 'FD Ownership'],
-                title=f'Top {n_players} Jugadores por Ownership',
-                labels={'value': 'Ownership (%)', 'Player': 'Jugador', 'variable': 'Plataforma'},
-                barmode='group',
-                color_discrete_sequence=['#1E88E5', '#FFC107']
-            )
-            fig.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Gráfico de dispersión: DK vs FD ownership
-            fig2 = px.scatter(
-                st.session_state.nba_analyzed[1],
-                x='DK Ownership',
-                y='FD Ownership',
-                hover_name='Player',
-                hover_data=['Team', 'DK Price', 'FD Price'],
-                title='Comparación de Ownership entre DraftKings y FanDuel',
-                labels={'DK Ownership': 'DraftKings Ownership (%)', 'FD Ownership': 'FanDuel Ownership (%)'}
-            )
-            fig2.update_layout(
-                xaxis_title="DraftKings Ownership (%)",
-                yaxis_title="FanDuel Ownership (%)"
-            )
-            # Añadir línea de 45 grados para referencia
-            max_val = max(
-                st.session_state.nba_analyzed[1]['DK Ownership'].max(),
-                st.session_state.nba_analyzed[1]['FD Ownership'].max()
-            )
-            fig2.add_shape(
-                type='line',
-                x0=0,
-                y0=0,
-                x1=max_val,
-                y1=max_val,
-                line=dict(color='red', dash='dash')
-            )
-            st.plotly_chart(fig2, use_container_width=True)
+    # Mostrar datos si están disponibles
+    if f"{sport}_data" not in st.session_state:
+        return
+    refresh_live_results(sport)
+    
+    st.header("🔍 Análisis Destacado")
+    render_leader_cards(st.session_state[f"{sport}_analyzed"][0])
+    leverage = render_projection_upload(sport)
+    
+    # Solo se dibuja la sección seleccionada (st.tabs dibujaría las tres en cada rerun)
+    # Los deportes sin reglas de lineup no muestran el generador
+    sections = SPORT_SECTIONS if lineup_sites(sport) else tuple(s for s in SPORT_SECTIONS if s != "Lineups")
+    section = st.radio("Sección", sections, horizontal=True, key=f"{sport}_section",
+                       label_visibility="collapsed")
+    if section == "Top Jugadores":
+        render_top_tables(st.session_state[f"{sport}_top"])
+        if leverage is not None:
+            render_top_tables(leverage.leverage_tables(), LEVERAGE_TABLE_TITLES, "Top 10 por Leverage")
+    elif section == "Tabla Completa":
+        st.subheader("Datos Completos")
+        st.dataframe(st.session_state[f"{sport}_data"], use_container_width=True,
+                     column_config=OWNERSHIP_COLUMN_CONFIG)
+    elif section == "Movimiento":
+        st.subheader("Movimiento del Ownership")
+        render_movement(sport)
+    elif section == "Lineups":
+        st.subheader("Generador de Lineups")
+        render_lineups(sport, leverage if leverage is not None else st.session_state[f"{sport}_leaderboard"])
+    else:
+        st.subheader("Visualizaciones")
+        render_ownership_bar(sport)
+        leaderboard = st.session_state[f"{sport}_leaderboard"]
+        st.plotly_chart(build_ownership_scatter(leaderboard.snapshot_hash, leaderboard), use_container_width=True)
 
-with tab_about:
+
+def render_about():
+    """Pestaña con la descripción de la aplicación"""
     st.header("ℹ️ Acerca de esta Aplicación")
     
     st.markdown("""
@@ -625,7 +763,7 @@ with tab_about:
     - **Extracción de Datos**: Web scraping automatizado que captura todos los jugadores disponibles.
     - **Análisis Detallado**: Identifica jugadores con mayor ownership en diferentes categorías.
     - **Visualizaciones**: Gráficos interactivos para comparar ownership entre plataformas.
-    - **Exportación**: Descarga los datos en formato CSV para análisis adicional.
+    - **Exportación**: Descarga los datos en CSV, CSV comprimido, Parquet, Arrow o JSON Lines, y el historial completo como ZIP.
     
     #### ¿Cómo usar la aplicación?
     
@@ -646,3 +784,68 @@ with tab_about:
     """)
 
     st.info("Esta aplicación es solo para fines educativos y de análisis personal. No está afiliada oficialmente a FantasyTeamAdvice, DraftKings o FanDuel.")
+
+
+# Interfaz de usuario con Streamlit
+st.title("🏆 Fantasy Sports Ownership Dashboard")
+st.markdown("Herramienta para analizar datos de propiedad (ownership) en Fantasy Sports")
+
+# Prefetch en segundo plano: servir al instante el último snapshot completo
+prefetch_scheduler = get_prefetch_scheduler()
+sync_prefetched_results(prefetch_scheduler)
+render_prefetch_status(prefetch_scheduler)
+
+# Extracción en paralelo de todos los deportes configurados
+if st.button("Extraer datos de todos los deportes", use_container_width=True):
+    sport_progress = {}
+    for sport, config in SPORTS.items():
+        sport_progress[sport] = st.progress(0)
+        sport_progress[sport].text(f"{config['icon']} {config['name']}: en cola...")
+    
+    # Propagar el contexto de Streamlit para que los hilos puedan actualizar las barras de progreso
+    ctx = get_script_run_ctx()
+    all_results = scrape_all_sports(
+        progress_bars=sport_progress,
+        scrape=scrape_ownership_data,
+        on_thread_start=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+    )
+    
+    for sport, sport_data in all_results.items():
+        if sport_data is not None:
+            store_sport_results(sport, sport_data)
+            prefetch_scheduler.publish(sport, sport_data, st.session_state[f"{sport}_captured_at"])
+            st.success(f"✅ {SPORTS[sport]['name']}: {len(sport_data)} jugadores")
+            warn_if_incomplete(sport, sport_data)
+        else:
+            st.error(f"❌ {SPORTS[sport]['name']}: error al extraer los datos")
+
+# Modo en vivo: mantiene abierta la página de cada deporte y aplica solo los cambios
+with st.sidebar:
+    st.header("📡 Modo en vivo")
+    for sport, config in SPORTS.items():
+        watcher = get_watcher(sport)
+        live = st.toggle(f"{config['icon']} {config['name']} en vivo", value=watcher.running, key=f"{sport}_live")
+        if live and not watcher.running:
+            watcher.start()
+        elif not live and watcher.running:
+            watcher.stop()
+    render_live_updates()
+    
+    # Diagnóstico de los scrapes: tiempos por fase e historial entre ejecuciones
+    st.header("🩺 Diagnóstico")
+    with st.expander("Historial de scrapes"):
+        render_diagnostics()
+
+# Navegación entre deportes: solo se dibuja la vista seleccionada
+view = st.radio(
+    "Vista",
+    list(SPORTS) + [ABOUT_VIEW],
+    format_func=lambda key: "ℹ️ Acerca de" if key == ABOUT_VIEW else f"{SPORTS[key]['icon']} {SPORTS[key]['name']} Ownership",
+    horizontal=True,
+    key="active_view",
+    label_visibility="collapsed"
+)
+if view == ABOUT_VIEW:
+    render_about()
+else:
+    render_sport_view(view)
@@ -0,0 +1,29 @@
+"""Datos sintéticos compartidos por las pruebas."""
+import pytest
+
+# Posiciones que cubren los slots de MLB en DraftKings y FanDuel
+MLB_POSITIONS = ('SP', 'SP', 'C', '1B', '2B', '3B', 'SS', 'OF', 'OF', 'OF', 'C/1B', '2B/SS')
+
+
+@pytest.fixture
+def lineup_frame():
+    """Construye un frame scrapeado con posiciones, seis equipos y precios que caben en el tope de DK"""
+    np = pytest.importorskip("numpy")
+    pd = pytest.importorskip("pandas")
+
+    def build(n_players=72, positions=True, seed=0):
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame({
+            'Team': [f"T{i % 6}" for i in range(n_players)],
+            'Player': [f"Player {i:03d}" for i in range(n_players)],
+            'DK Price': rng.integers(25, 62, n_players).astype('float32') * 100,
+            'DK Ownership': rng.uniform(0.5, 35, n_players).astype('float32'),
+            'FD Price': rng.integers(22, 45, n_players).astype('float32') * 100,
+            'FD Ownership': rng.uniform(0.5, 35, n_players).astype('float32'),
+            'DK Projection': rng.gamma(4, 2.5, n_players).astype('float32'),
+        })
+        if positions:
+            df['Position'] = [MLB_POSITIONS[i % len(MLB_POSITIONS)] for i in range(n_players)]
+        return df
+
+    return build
@@ -0,0 +1,22 @@
+"""Validación de argumentos de la CLI antes de lanzar ningún scrape."""
+import pytest
+
+from ownership import cli
+
+
+@pytest.mark.parametrize("argv", [
+    ["scrape", "mlb", "nba", "--output", "ownership.csv"],
+    ["scrape", "--output", "ownership.csv"],
+    ["scrape", "mlb", "--all-slates", "--output", "ownership.csv"],
+])
+def test_scrape_output_needs_a_single_result(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(argv)
+    assert exit_info.value.code == 2
+    assert "--output" in capsys.readouterr().err
+
+
+def test_scrape_rejects_unknown_sports(capsys):
+    with pytest.raises(SystemExit):
+        cli.main(["scrape", "mlb", "nfl"])
+    assert "nfl" in capsys.readouterr().err
@@ -0,0 +1,38 @@
+"""Exportación en bloques: cada formato se puede volver a leer igual al frame de origen."""
+import io
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from ownership.export import write_export  # noqa: E402
+
+
+def sample_frame(n_rows=7):
+    return pd.DataFrame({
+        'Team': [f"T{i % 3}" for i in range(n_rows)],
+        'Player': [f"Player {i}" for i in range(n_rows)],
+        'DK Price': [3000 + 100 * i for i in range(n_rows)],
+        'DK Ownership': [0.5 * i for i in range(n_rows)],
+    })
+
+
+def test_jsonl_round_trip_across_chunks(tmp_path):
+    df = sample_frame()
+    path = tmp_path / "export.jsonl"
+    with open(path, 'wb') as f:
+        write_export(df, 'jsonl', f, chunk_rows=3)
+
+    text = path.read_text(encoding='utf-8')
+    assert '\n\n' not in text
+    assert text.endswith('}\n')
+    pd.testing.assert_frame_equal(pd.read_json(path, lines=True), df, check_dtype=False)
+
+
+def test_csv_round_trip_across_chunks():
+    df = sample_frame()
+    buffer = io.BytesIO()
+    write_export(df, 'csv', buffer, chunk_rows=3)
+    buffer.seek(0)
+    pd.testing.assert_frame_equal(pd.read_csv(buffer), df, check_dtype=False)
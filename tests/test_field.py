@@ -0,0 +1,70 @@
+"""Simulador de field: forma y rangos de las tablas y estimación de duplicación."""
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from ownership import field, lineups  # noqa: E402
+
+
+def test_simulate_field_shapes_and_ranges(lineup_frame):
+    df = lineup_frame()
+    mine = lineups.generate_lineups(df, "mlb", "dk", n_lineups=5, candidates=10000, batch_size=5000,
+                                    workers=1, seed=0)
+    result = field.simulate_field(df, "mlb", "dk", field_size=4000, n_fields=2, lineups=mine,
+                                  batch_size=4000, workers=1, seed=0)
+    stats = result['stats']
+    n_slots = len(lineups.lineup_rules("mlb", "dk")['slots'])
+
+    assert stats['simulated'] >= 8000
+    assert 0 < stats['distinct_lineups'] <= 4000
+    assert 0 <= stats['duplicated_entries'] <= 100
+
+    players = result['players']
+    assert sorted(players['Player']) == sorted(df['Player'])
+    assert players['Field Exposure'].between(0, 100).all()
+    # Cada lineup tiene un jugador por slot: las exposiciones suman 100% por slot
+    assert players['Field Exposure'].sum() == pytest.approx(100 * n_slots, rel=1e-3)
+    assert players['Field Exposure'].is_monotonic_decreasing
+    assert stats['exposure_error'] < 5
+
+    teams = result['teams']
+    assert sorted(teams['Team']) == sorted(df['Team'].unique())
+    assert teams['Field Exposure'].between(0, 100).all()
+    assert teams['Stack Rate'].between(0, 100).all()
+    assert (teams['Stack Rate'] <= teams['Field Exposure']).all()
+
+    estimates = result['lineups']
+    assert len(estimates) == len(mine)
+    assert (estimates['Field Matches'] >= 0).all()
+    assert (estimates['Expected Duplicates'] >= 0).all()
+    assert estimates['Duplication Probability'].between(0, 100).all()
+
+
+def test_simulate_field_is_reproducible_with_a_seed(lineup_frame):
+    df = lineup_frame()
+    options = {'field_size': 2000, 'batch_size': 2000, 'workers': 1, 'seed': 7}
+    first = field.simulate_field(df, "mlb", "fd", **options)
+    second = field.simulate_field(df, "mlb", "fd", **options)
+    pd.testing.assert_frame_equal(first['players'], second['players'])
+    assert first['stats']['simulated'] == second['stats']['simulated']
+
+
+def test_duplication_estimates_count_matches_in_any_slot_order(lineup_frame):
+    pool = lineups.lineup_player_pool(lineup_frame(positions=False), "mlb", "dk")
+    names = pool['players']
+    mine = pd.DataFrame({'UTIL1': [names[0], names[3], "Desconocido"],
+                         'UTIL2': [names[1], names[4], names[1]],
+                         'UTIL3': [names[2], names[5], names[2]],
+                         'Salary': [0, 0, 0]})
+    simulated = np.array([[2, 1, 0], [0, 1, 2], [0, 2, 1], [6, 7, 8]] + [[9, 10, 11]] * 6)
+    hashes = lineups.lineup_hashes(simulated, len(names))
+
+    estimates = field.duplication_estimates(mine, pool, hashes, field_size=1000)
+    assert estimates['Field Matches'].tolist() == [3, 0, 0]
+    assert estimates['Expected Duplicates'].iloc[0] == pytest.approx(3 / 10 * 1000)
+    assert estimates['Expected Duplicates'].iloc[1] == 0
+    assert estimates['Duplication Probability'].iloc[0] == pytest.approx(100.0)
+    # Un jugador que no está en el pool no se puede estimar
+    assert np.isnan(estimates['Expected Duplicates'].iloc[2])
+    assert np.isnan(estimates['Duplication Probability'].iloc[2])
@@ -0,0 +1,36 @@
+"""Arranque en frío de la CLI: presupuesto de importación y sin el stack del dashboard."""
+import json
+import os
+import subprocess
+import sys
+
+# Mismo presupuesto que python benchmark.py --import-time
+CLI_IMPORT_BUDGET_S = 0.25
+FORBIDDEN_MODULES = ("streamlit", "selenium", "plotly", "pandas", "pyarrow")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import ownership.cli
+ownership.cli.build_parser()
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'loaded': sorted(m for m in %r if m in sys.modules)}))
+""" % (FORBIDDEN_MODULES,)
+
+
+def measure_cli_import(repeat=3):
+    """Mejor tiempo de varios intérpretes nuevos (el primero paga la caché de disco)"""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, cwd=REPO_ROOT,
+                                check=True)
+        measurement = json.loads(result.stdout)
+        if best is None or measurement['seconds'] < best['seconds']:
+            best = measurement
+    return best
+
+
+def test_cli_cold_import_stays_light():
+    measurement = measure_cli_import()
+    assert measurement['loaded'] == []
+    assert measurement['seconds'] < CLI_IMPORT_BUDGET_S
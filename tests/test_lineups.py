@@ -0,0 +1,108 @@
+"""Generador de lineups: reglas por deporte y sitio, restricciones, muestreo y selección."""
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from ownership import lineups  # noqa: E402
+
+
+def test_lineup_rules_names_supported_pairs():
+    with pytest.raises(ValueError) as error:
+        lineups.lineup_rules("nfl", "dk")
+    message = str(error.value)
+    assert "nfl/dk" in message
+    assert all(f"{sport}/{site}" in message for sport, site in lineups.LINEUP_RULES)
+
+
+def test_generate_lineups_rejects_sport_without_rules():
+    df = pd.DataFrame({'Team': ["KC"] * 10, 'Player': [f"Player {i}" for i in range(10)],
+                       'DK Price': [5000.0] * 10, 'DK Ownership': [10.0] * 10})
+    with pytest.raises(ValueError, match="Soportados"):
+        lineups.generate_lineups(df, "nfl", "dk", workers=1)
+
+
+def test_lineup_sites_per_sport():
+    assert lineups.lineup_sites("mlb") == lineups.LINEUP_SITES
+    assert lineups.lineup_sites("nfl") == {}
+
+
+def slot_columns(result):
+    return [column for column in result.columns if column not in ('Salary', 'Ownership', 'Score', 'Stack')]
+
+
+def test_generated_lineups_respect_every_constraint(lineup_frame):
+    df = lineup_frame()
+    rules = lineups.lineup_rules("mlb", "dk")
+    n_lineups, ceiling, max_exposure = 20, 140.0, 0.6
+    result = lineups.generate_lineups(df, "mlb", "dk", n_lineups=n_lineups, ownership_ceiling=ceiling,
+                                      max_per_team=4, min_stack=3, max_exposure=max_exposure,
+                                      candidates=40000, batch_size=10000, workers=1, seed=0)
+    assert len(result) == n_lineups
+    players = df.set_index('Player')
+    slots = slot_columns(result)
+    assert len(slots) == len(rules['slots'])
+
+    for _, lineup in result.iterrows():
+        chosen = players.loc[list(lineup[slots])]
+        assert chosen.index.is_unique
+        assert chosen['DK Price'].sum() == lineup['Salary'] <= rules['salary_cap']
+        assert chosen['DK Ownership'].sum() == pytest.approx(lineup['Ownership'], rel=1e-5)
+        assert lineup['Ownership'] <= ceiling
+        team_counts = chosen['Team'].value_counts()
+        assert 3 <= team_counts.max() <= 4
+        assert team_counts.idxmax() == lineup['Stack']
+        # Cada jugador está en un slot que admite su posición
+        for player, (_, eligible) in zip(lineup[slots], rules['slots']):
+            assert set(players.loc[player, 'Position'].split('/')) & set(eligible)
+
+    exposure = result[slots].stack().value_counts()
+    assert exposure.max() <= int(max_exposure * n_lineups)
+    assert len({frozenset(row) for row in result[slots].itertuples(index=False)}) == len(result)
+    # Ordenados por score, el de la proyección del sitio
+    assert result['Score'].is_monotonic_decreasing
+
+
+def test_generate_lineups_is_reproducible_with_a_seed(lineup_frame):
+    df = lineup_frame()
+    options = {'n_lineups': 10, 'candidates': 10000, 'batch_size': 5000, 'workers': 1}
+    first = lineups.generate_lineups(df, "mlb", "fd", seed=3, **options)
+    pd.testing.assert_frame_equal(first, lineups.generate_lineups(df, "mlb", "fd", seed=3, **options))
+    assert slot_columns(first)[:2] == ['P', 'C/1B']
+
+
+def test_without_positions_every_slot_is_util(lineup_frame):
+    result = lineups.generate_lineups(lineup_frame(positions=False), "mlb", "dk", n_lineups=5,
+                                      candidates=5000, batch_size=5000, workers=1, seed=0)
+    assert slot_columns(result) == [f"UTIL{i}" for i in range(1, 11)]
+    assert (result['Salary'] <= 50000).all()
+
+
+def test_sample_lineups_fill_eligible_slots_without_repeats(lineup_frame):
+    np = pytest.importorskip("numpy")
+    pool = lineups.lineup_player_pool(lineup_frame(), "mlb", "dk")
+    weights = lineups.sampling_weights(pool)
+    sampled, valid = lineups.sample_lineups(pool, 2000, np.random.default_rng(0), weights)
+    assert sampled.shape == (2000, len(pool['slot_names']))
+    assert valid.all()
+    assert all(len(set(row)) == len(row) for row in sampled)
+    assert pool['eligibility'][np.arange(sampled.shape[1]), sampled].all()
+
+    # Un grupo de slots sin suficientes jugadores elegibles invalida todo el lote
+    pool['eligibility'][2] = False
+    _, valid = lineups.sample_lineups(pool, 100, np.random.default_rng(0), weights)
+    assert not valid.any()
+
+
+def test_select_lineups_dedupes_and_caps_exposure():
+    np = pytest.importorskip("numpy")
+    candidates = np.array([
+        [0, 1, 2],
+        [2, 1, 0],  # mismo conjunto que el anterior en otro orden
+        [0, 3, 4],
+        [5, 6, 7],
+        [0, 6, 8],
+    ])
+    scores = np.array([10.0, 9.5, 9.0, 8.0, 7.0])
+    assert lineups.select_lineups(candidates, scores, 4, 9).tolist() == [0, 2, 3, 4]
+    # Con exposición máxima 0.5 de 4 lineups, el jugador 0 entra en dos como mucho
+    assert lineups.select_lineups(candidates, scores, 4, 9, max_exposure=0.5).tolist() == [0, 2, 3]
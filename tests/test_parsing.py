@@ -0,0 +1,120 @@
+"""Lectura sin navegador: payloads JSON (XHR o incrustados en la página) y filas renderizadas en el servidor."""
+import json
+
+from ownership.parsing import OwnershipRowParser, match_payload_columns, records_from_html, records_from_payload
+
+PLAYERS = [
+    {'name': "Aaron Judge", 'team': "NYY",
+     'dk': {'salary': 6400, 'ownership': 31.5}, 'fd': {'salary': 4200, 'ownership': 27.0}},
+    {'name': "Mookie Betts", 'team': "LAD",
+     'dk': {'salary': 5800, 'ownership': 18.2}, 'fd': {'salary': 3900, 'ownership': 12.4}},
+    {'name': "José Ramírez", 'team': "CLE",
+     'dk': {'salary': 5200, 'ownership': 9}, 'fd': {'salary': 3600, 'ownership': 7.5}},
+]
+
+EXPECTED = [
+    {'Team': "NYY", 'Player': "Aaron Judge", 'DK Price': "$6,400", 'DK Ownership': "31.5%",
+     'FD Price': "$4,200", 'FD Ownership': "27.0%"},
+    {'Team': "LAD", 'Player': "Mookie Betts", 'DK Price': "$5,800", 'DK Ownership': "18.2%",
+     'FD Price': "$3,900", 'FD Ownership': "12.4%"},
+    {'Team': "CLE", 'Player': "José Ramírez", 'DK Price': "$5,200", 'DK Ownership': "9%",
+     'FD Price': "$3,600", 'FD Ownership': "7.5%"},
+]
+
+ROW_TEMPLATE = (
+    '<div data-testid="ownershipPlayerRow">'
+    '<div data-testid="ownershipPlayerTeam"><img alt="{Team} logo"></div>'
+    '<div data-testid="ownershipPlayer"> {Player} </div>'
+    '<div data-testid="ownershipPlayerDkPrice">{DK Price}</div>'
+    '<div data-testid="ownershipPlayerDkOwnership">{DK Ownership}</div>'
+    '<div data-testid="ownershipPlayerFdPrice">{FD Price}</div>'
+    '<div data-testid="ownershipPlayerFdOwnership">{FD Ownership}</div>'
+    '</div>'
+)
+
+
+def render_rows(records):
+    return "".join(ROW_TEMPLATE.format_map(record) for record in records)
+
+
+def test_records_from_xhr_payload():
+    # Cuerpo de /api/ownership: jugadores anidados bajo metadatos, con salario y ownership por sitio
+    body = {'meta': {'slates': [{'id': "main", 'games': 12}]},
+            'data': {'updatedAt': "2024-06-01T18:00:00Z", 'players': PLAYERS}}
+    assert records_from_payload(json.loads(json.dumps(body))) == EXPECTED
+
+
+def test_payload_prefers_exact_keys_over_projections():
+    players = [
+        {'playerName': player['name'], 'teamAbbr': player['team'],
+         'dkProjectedOwnership': 99.9, 'dkOwnership': player['dk']['ownership'], 'dkSalary': player['dk']['salary'],
+         'fdProjOwn': 88.8, 'fdPriceChange': -100, 'fdPrice': player['fd']['salary'],
+         'fdOwnership': player['fd']['ownership']}
+        for player in PLAYERS
+    ]
+    assert records_from_payload({'players': players}) == EXPECTED
+
+
+def test_payload_ignores_projection_only_keys():
+    flat = {'name': "Aaron Judge", 'team': "NYY", 'dksalary': 6400, 'dkprojectedownership': 30.0,
+            'fdsalary': 4200, 'fdownership': 27.0}
+    assert match_payload_columns(flat) is None
+    assert match_payload_columns({**flat, 'dkactualownpct': 31.5})['DK Ownership'] == 'dkactualownpct'
+
+
+def test_payload_columns_from_several_items():
+    # El primer jugador llega sin ownership de FanDuel: las columnas se reconocen en los siguientes
+    players = [dict(PLAYERS[0], fd={'salary': 4200})] + PLAYERS[1:]
+    assert records_from_payload({'players': players}) == EXPECTED[1:]
+
+
+def test_records_from_inline_script():
+    payload = json.dumps({'players': PLAYERS})
+    html = (
+        '<html><head><script src="/app.js"></script></head><body>'
+        '<script>window.__CONFIG__ = {"theme": "dark"};</script>'
+        f'<script>const rows = []; load({payload});</script>'
+        '</body></html>'
+    )
+    assert records_from_html(html) == EXPECTED
+
+
+def test_records_from_json_script():
+    next_data = json.dumps({'props': {'pageProps': {'ownership': {'players': PLAYERS}}}})
+    html = f'<html><body><script id="__NEXT_DATA__" type="application/json">{next_data}</script></body></html>'
+    assert records_from_html(html) == EXPECTED
+
+
+def test_records_from_server_rendered_rows():
+    html = f'<html><body><div data-testid="ownershipTablemlb"><div>{render_rows(EXPECTED)}</div></div></body></html>'
+    assert records_from_html(html) == EXPECTED
+
+
+def test_records_from_html_without_data():
+    # Página que carga las filas por XHR: el backend HTTP debe ceder el turno al navegador
+    html = "<html><body><script>fetch('/api/ownership').then((r) => r.json()).then(load);</script></body></html>"
+    assert records_from_html(html) is None
+
+
+def test_row_parser_skips_incomplete_and_repeated_rows():
+    incomplete = ROW_TEMPLATE.replace('<div data-testid="ownershipPlayerFdOwnership">{FD Ownership}</div>', '')
+    html = (
+        render_rows(EXPECTED[:2])
+        + incomplete.format_map(EXPECTED[2])
+        + render_rows(EXPECTED[:1])
+        + '<br><span data-testid="ownershipPlayer">Fuera de una fila</span>'
+    )
+    parser = OwnershipRowParser()
+    parser.feed(html)
+    parser.close()
+    assert parser.records == EXPECTED[:2]
+
+
+def test_row_parser_reads_nested_cell_markup():
+    html = render_rows(EXPECTED[:1]).replace(
+        '> Aaron Judge </div>', '><a href="/p/1"><span>Aaron</span> <b>Judge</b></a></div>'
+    )
+    parser = OwnershipRowParser()
+    parser.feed(html)
+    parser.close()
+    assert parser.records == EXPECTED[:1]
@@ -0,0 +1,73 @@
+"""Cruce de proyecciones con el ownership, con archivos de varios deportes y slates."""
+import io
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from ownership.projections import (  # noqa: E402
+    MATCH_AMBIGUOUS, join_projections, load_projections, match_summary, projection_slates
+)
+
+SLATES = ("Main", "Early", "Late", "Showdown")
+TEAMS = ("NYY", "BOS", "LAD", "SF")
+
+
+def ownership_frame(n_players=40):
+    return pd.DataFrame({
+        'Team': [TEAMS[i % len(TEAMS)] for i in range(n_players)],
+        'Player': [f"Player {i:03d}" for i in range(n_players)],
+        'DK Ownership': [float(i % 30) for i in range(n_players)],
+    })
+
+
+def projection_file(df, slates=SLATES, sport="mlb"):
+    """CSV con cada jugador en todos los slates, con una proyección distinta por slate"""
+    rows = [
+        {'Sport': sport, 'Slate': slate, 'Player': player, 'Team': team, 'FPTS': 10 + i + 0.5 * s}
+        for s, slate in enumerate(slates)
+        for i, (player, team) in enumerate(zip(df['Player'], df['Team']))
+    ]
+    rows.append({'Sport': "nba", 'Slate': "Main", 'Player': "Otro Deporte", 'Team': "LAL", 'FPTS': 40})
+    return io.StringIO(pd.DataFrame(rows).to_csv(index=False))
+
+
+def test_several_slates_without_slate_are_ambiguous_not_fuzzy():
+    df = ownership_frame()
+    projections = load_projections(projection_file(df), "proj.csv", sport="mlb")
+    assert projection_slates(projections) == list(SLATES)
+
+    joined = join_projections(df, projections)
+    assert match_summary(joined) == {'exact': 0, 'name': 0, 'initial': 0, 'fuzzy': 0,
+                                     MATCH_AMBIGUOUS: len(df), 'unmatched': 0}
+    assert joined['DK Projection'].isna().all()
+
+
+@pytest.mark.parametrize("slate", ["Late", "late", ("late_slate", "Late")])
+def test_slate_filter_matches_every_player_exactly(slate):
+    df = ownership_frame()
+    projections = load_projections(projection_file(df), "proj.csv", sport="mlb", slate=slate)
+    assert len(projections) == len(df)
+
+    joined = join_projections(df, projections)
+    assert match_summary(joined)['exact'] == len(df)
+    expected = [10 + i + 0.5 * SLATES.index("Late") for i in range(len(df))]
+    assert joined['DK Projection'].tolist() == pytest.approx(expected)
+
+
+def test_same_projection_in_several_slates_is_not_ambiguous():
+    df = ownership_frame(8)
+    rows = [{'Slate': slate, 'Player': player, 'Team': team, 'Projection': 20.0}
+            for slate in SLATES for player, team in zip(df['Player'], df['Team'])]
+    projections = load_projections(io.StringIO(pd.DataFrame(rows).to_csv(index=False)), "proj.csv")
+    assert match_summary(join_projections(df, projections))['exact'] == len(df)
+
+
+def test_fuzzy_still_resolves_unique_names():
+    projections = pd.DataFrame({'Player': ["Aaron Judge", "Rafael Devers", "Mookie Betts"],
+                                'Team': ["NYY", "BOS", "LAD"], 'Projection': [11.0, 9.0, 10.0]})
+    projections = load_projections(io.StringIO(projections.to_csv(index=False)), "proj.csv")
+    df = pd.DataFrame({'Player': ["Aaron Jugde", "Rafael Devers", "Mookie Betts"], 'Team': ["NYY", "BOS", "LAD"]})
+    joined = join_projections(df, projections)
+    assert joined['Projection Match'].tolist() == ['fuzzy', 'exact', 'exact']
+    assert joined['DK Projection'].tolist() == [11.0, 9.0, 10.0]
@@ -0,0 +1,38 @@
+"""Esquema tipado: cambios del modo en vivo aplicados celda por celda al DataFrame guardado."""
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from ownership.schema import (  # noqa: E402
+    apply_ownership_updates, build_ownership_frame, validate_ownership_frame
+)
+
+RECORDS = [
+    {'Team': "NYY", 'Player': "Aaron Judge", 'DK Price': "$6,400", 'DK Ownership': "31.5%",
+     'FD Price': "$4,200", 'FD Ownership': "27.0%"},
+    {'Team': "LAD", 'Player': "Mookie Betts", 'DK Price': "$5,800", 'DK Ownership': "18.2%",
+     'FD Price': "$3,900", 'FD Ownership': "12.4%"},
+]
+NEW_PLAYER = {'Team': "CLE", 'Player': "José Ramírez", 'DK Price': "$5,200", 'DK Ownership': "9%",
+              'FD Price': "$3,600", 'FD Ownership': "7.5%"}
+
+
+def test_updates_change_cells_and_append_new_players():
+    df = build_ownership_frame(RECORDS)
+    changed = dict(RECORDS[1], **{'DK Ownership': "20.5%", 'FD Price': "$4,000"})
+    result = apply_ownership_updates(df, [changed, NEW_PLAYER])
+
+    # El mismo resultado que reconstruir toda la tabla, con los tipos del esquema
+    expected = build_ownership_frame([RECORDS[0], changed, NEW_PLAYER])
+    pd.testing.assert_frame_equal(result, expected, check_categorical=False)
+    validate_ownership_frame(result)
+    assert set(result['Team'].cat.categories) == {"NYY", "LAD", "CLE"}
+
+    # El DataFrame guardado no se modifica
+    assert df['DK Ownership'].iloc[1] == pytest.approx(18.2)
+    assert len(df) == 2
+
+
+def test_no_updates_returns_the_same_frame():
+    df = build_ownership_frame(RECORDS)
+    assert apply_ownership_updates(df, []) is df
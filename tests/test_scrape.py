@@ -0,0 +1,143 @@
+"""Elección de backend: con source="auto" se prueba HTTP y, si no trae datos, el navegador."""
+import contextlib
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from ownership import scrape  # noqa: E402
+from ownership.parsing import HTTP_RETRY_AFTER_MINUTES  # noqa: E402
+
+RECORDS = [{'Team': "NYY", 'Player': "Aaron Judge", 'DK Price': "$6,400", 'DK Ownership': "31.5%",
+            'FD Price': "$4,200", 'FD Ownership': "27.0%"}]
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    """Sustituye ambos backends (sin red ni Chrome) y registra los deportes con que se llama a cada uno"""
+    calls = {'http': [], 'browser': []}
+    results = {'http': None, 'browser': RECORDS}
+
+    def backend(name):
+        def fetch(sport, trace=None, **options):
+            calls[name].append(sport)
+            result = results[name]
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fetch
+
+    monkeypatch.setattr(scrape, '_http_skip_until', {})
+    for name in calls:
+        monkeypatch.setitem(scrape.SOURCE_BACKENDS, name, backend(name))
+    return calls, results
+
+
+def test_auto_falls_back_to_browser_and_skips_http_for_an_hour(backends):
+    calls, _ = backends
+
+    before = datetime.now()
+    assert scrape.fetch_ownership_records("mlb") == (RECORDS, "browser")
+    assert calls == {'http': ["mlb"], 'browser': ["mlb"]}
+    skip_until = scrape._http_skip_until["mlb"]
+    retry_after = timedelta(minutes=HTTP_RETRY_AFTER_MINUTES)
+    assert before + retry_after <= skip_until <= datetime.now() + retry_after
+
+    # Durante la hora siguiente el deporte va directo al navegador; los demás siguen probando HTTP
+    assert scrape.fetch_ownership_records("mlb") == (RECORDS, "browser")
+    assert scrape.fetch_ownership_records("nba") == (RECORDS, "browser")
+    assert calls == {'http': ["mlb", "nba"], 'browser': ["mlb", "mlb", "nba"]}
+
+
+def test_auto_retries_http_once_the_hour_has_passed(backends):
+    calls, results = backends
+    scrape._http_skip_until["mlb"] = datetime.now() - timedelta(seconds=1)
+    results['http'] = RECORDS
+
+    assert scrape.fetch_ownership_records("mlb") == (RECORDS, "http")
+    assert calls == {'http': ["mlb"], 'browser': []}
+    assert "mlb" not in scrape._http_skip_until
+
+
+def test_auto_falls_back_when_http_raises(backends):
+    calls, results = backends
+    results['http'] = OSError("connection refused")
+
+    assert scrape.fetch_ownership_records("mlb") == (RECORDS, "browser")
+    assert calls == {'http': ["mlb"], 'browser': ["mlb"]}
+    assert "mlb" in scrape._http_skip_until
+
+
+def test_explicit_source_does_not_fall_back(backends):
+    calls, results = backends
+    results['http'] = OSError("connection refused")
+
+    with pytest.raises(OSError):
+        scrape.fetch_ownership_records("mlb", source="http")
+    assert calls['browser'] == []
+    with pytest.raises(ValueError):
+        scrape.fetch_ownership_records("mlb", source="ftp")
+
+
+def test_checkpoint_is_throttled_and_saved_on_failure(backends, monkeypatch, tmp_path):
+    saves = []
+    monkeypatch.setattr(scrape, 'save_checkpoint', lambda *args: saves.append(args))
+    monkeypatch.setattr(scrape, 'CHECKPOINT_INTERVAL_SECONDS', 3600)
+
+    def scroll_then_fail(sport, trace=None, on_checkpoint=None, **options):
+        records, processed = [], set()
+        for i in range(50):
+            records.append(dict(RECORDS[0], Player=f"Player {i}"))
+            processed.add(f"Player {i}")
+            on_checkpoint({'position': i * 400, 'records': records, 'processed_players': processed})
+        raise TimeoutError("Tiempo máximo de scraping agotado")
+
+    monkeypatch.setitem(scrape.SOURCE_BACKENDS, 'browser', scroll_then_fail)
+    assert scrape.run_ownership_scrape("mlb", source="browser", trace_root=tmp_path,
+                                       checkpoint_root=tmp_path, resume=False) is None
+
+    # Ninguna escritura durante el scroll y una sola al fallar, con el último estado
+    assert len(saves) == 1
+    key, _, state, root = saves[0]
+    assert (key, state['position'], len(state['records']), root) == ("mlb", 49 * 400, 50, tmp_path)
+
+
+def test_scrape_slates_covers_every_slate_in_batches(monkeypatch):
+    browser = pytest.importorskip("ownership.browser")
+    batches = []
+
+    class FakeTabs:
+        def __init__(self, driver, urls, prepare_tab=None, loaded=False):
+            batches.append((list(urls), loaded))
+            self.urls = urls
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def __getitem__(self, slate):
+            return self.urls[slate]
+
+    class FakePool:
+        prepare_tab = None
+
+        @contextlib.contextmanager
+        def borrow(self):
+            yield object()
+
+    monkeypatch.setattr(browser, 'SlateTabs', FakeTabs)
+    monkeypatch.setattr(browser, 'drain_performance_log', lambda driver: None)
+    slates = {None: "Main", **{f"s{i}": f"Slate {i}" for i in range(10)}}
+
+    def fake_scrape(sport, progress_bar=None, slate=None, tab=None, **options):
+        return f"{slate}@{tab}"
+
+    results = scrape.scrape_slates("mlb", slates=slates, pool=FakePool(), url="http://local/own",
+                                   scrape=fake_scrape, max_tabs=4)
+    assert list(results) == list(slates)
+    assert all(result['data'] is not None for result in results.values())
+    assert [len(urls) for urls, _ in batches] == [4, 4, 3]
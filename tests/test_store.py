@@ -0,0 +1,124 @@
+"""Almacén de snapshots: ida y vuelta por Parquet, manifiesto, retención, compactación e historial."""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from ownership import store  # noqa: E402
+from ownership.schema import build_ownership_frame, validate_ownership_frame  # noqa: E402
+
+NOW = datetime(2024, 6, 10, 18, 0)
+
+
+def ownership_frame(judge_ownership="31.5%"):
+    return build_ownership_frame([
+        {'Team': "NYY", 'Player': "Aaron Judge", 'DK Price': "$6,400", 'DK Ownership': judge_ownership,
+         'FD Price': "$4,200", 'FD Ownership': "27.0%"},
+        {'Team': "LAD", 'Player': "Mookie Betts", 'DK Price': "$5,800", 'DK Ownership': "18.2%",
+         'FD Price': "$3,900", 'FD Ownership': "12.4%"},
+    ])
+
+
+def stored_files(root):
+    return sorted(
+        os.path.relpath(os.path.join(folder, name), root)
+        for folder, _, names in os.walk(root) for name in names if name.endswith('.parquet')
+    )
+
+
+def test_save_and_read_latest_snapshot(tmp_path):
+    df = ownership_frame()
+    first = store.save_snapshot(df, "mlb", captured_at=NOW - timedelta(hours=1), root=tmp_path)
+    second = store.save_snapshot(ownership_frame("35.0%"), "mlb", captured_at=NOW, root=tmp_path)
+    store.save_snapshot(df, "nba", captured_at=NOW + timedelta(hours=1), root=tmp_path)
+
+    manifest = store.read_manifest(tmp_path)
+    assert [(e['snapshot_id'], e['sport'], e['rows']) for e in manifest] == [
+        (first, "mlb", 2), (second, "mlb", 2), (manifest[2]['snapshot_id'], "nba", 2)
+    ]
+    assert manifest[1]['path'] == os.path.join("sport=mlb", "date=2024-06-10", f"{second}.parquet")
+    assert all((tmp_path / e['path']).exists() for e in manifest)
+
+    # El último snapshot de cada deporte vuelve con los valores y los tipos del esquema
+    latest = store.latest_snapshot("mlb", root=tmp_path)
+    assert set(latest['Snapshot Id']) == {second}
+    assert (latest['Captured At'] == pd.Timestamp(NOW)).all()
+    expected = ownership_frame("35.0%")
+    pd.testing.assert_frame_equal(validate_ownership_frame(latest[expected.columns]), expected,
+                                  check_categorical=False)
+    assert store.latest_snapshot("nfl", root=tmp_path) is None
+
+    # Solo las columnas pedidas, más el id y la fecha del snapshot
+    prices = store.latest_snapshot("mlb", columns=['Player', 'DK Price'], root=tmp_path)
+    assert list(prices.columns) == ['Snapshot Id', 'Captured At', 'Player', 'DK Price']
+
+
+def test_player_history_across_snapshots(tmp_path):
+    for hours, ownership in [(3, "20.0%"), (2, "25.0%"), (1, "31.5%")]:
+        store.save_snapshot(ownership_frame(ownership), "mlb", captured_at=NOW - timedelta(hours=hours),
+                            root=tmp_path)
+
+    history = store.player_history("mlb", "Aaron Judge", root=tmp_path)
+    assert list(history['Player'].astype(str)) == ["Aaron Judge"] * 3
+    assert history['Captured At'].is_monotonic_increasing
+    assert history['DK Ownership'].tolist() == pytest.approx([20.0, 25.0, 31.5])
+
+    # El rango de fechas deja fuera el snapshot más antiguo
+    recent = store.player_history("mlb", "Aaron Judge", start=NOW - timedelta(hours=2), root=tmp_path)
+    assert recent['DK Ownership'].tolist() == pytest.approx([25.0, 31.5])
+    assert store.player_history("mlb", "Shohei Ohtani", root=tmp_path).empty
+
+
+def test_retention_removes_old_snapshots_and_their_files(tmp_path):
+    old = store.save_snapshot(ownership_frame(), "mlb", captured_at=NOW - timedelta(days=40), root=tmp_path)
+    kept = store.save_snapshot(ownership_frame(), "mlb", captured_at=NOW - timedelta(days=5), root=tmp_path)
+
+    assert store.apply_snapshot_retention(30, root=tmp_path, now=NOW) == 1
+    assert [e['snapshot_id'] for e in store.read_manifest(tmp_path)] == [kept]
+    assert not any(old in path for path in stored_files(tmp_path))
+    # Una segunda pasada no encuentra nada que borrar
+    assert store.apply_snapshot_retention(30, root=tmp_path, now=NOW) == 0
+    assert store.apply_snapshot_retention(0, root=tmp_path, now=NOW) == 0
+
+
+def test_compaction_joins_past_days_and_keeps_queries(tmp_path):
+    yesterday = NOW - timedelta(days=1)
+    ids = [
+        store.save_snapshot(ownership_frame(ownership), "mlb", captured_at=yesterday + timedelta(hours=hours),
+                            root=tmp_path)
+        for hours, ownership in [(0, "20.0%"), (1, "25.0%"), (2, "31.5%")]
+    ]
+    today = store.save_snapshot(ownership_frame("35.0%"), "mlb", captured_at=NOW, root=tmp_path)
+    before = store.load_snapshots("mlb", root=tmp_path)
+
+    assert store.compact_snapshots(1, root=tmp_path, now=NOW) == 1
+    # Un solo archivo para el día anterior; el día actual queda intacto
+    compact = os.path.join("sport=mlb", "date=2024-06-09", "mlb_20240609_compact.parquet")
+    assert stored_files(tmp_path) == [compact, os.path.join("sport=mlb", "date=2024-06-10", f"{today}.parquet")]
+    manifest = store.read_manifest(tmp_path)
+    assert [e['snapshot_id'] for e in manifest] == ids + [today]
+    assert [e['path'] for e in manifest[:3]] == [compact] * 3
+
+    # Los ids se conservan, así que las consultas devuelven lo mismo
+    pd.testing.assert_frame_equal(store.load_snapshots("mlb", root=tmp_path), before)
+    history = store.player_history("mlb", "Aaron Judge", root=tmp_path)
+    assert history['DK Ownership'].tolist() == pytest.approx([20.0, 25.0, 31.5, 35.0])
+    assert store.compact_snapshots(1, root=tmp_path, now=NOW) == 0
+
+
+def test_maintain_snapshot_store_applies_retention_then_compaction(tmp_path):
+    real_now = datetime.now()
+    old_day = real_now - timedelta(days=store.SNAPSHOT_RETENTION_DAYS + 2)
+    past_day = (real_now - timedelta(days=3)).replace(hour=12)
+    store.save_snapshot(ownership_frame(), "mlb", captured_at=old_day, root=tmp_path)
+    kept = [store.save_snapshot(ownership_frame(), "mlb", captured_at=past_day + timedelta(hours=hours),
+                                root=tmp_path) for hours in (0, 1)]
+
+    store.maintain_snapshot_store(root=tmp_path)
+    manifest = store.read_manifest(tmp_path)
+    assert [e['snapshot_id'] for e in manifest] == kept
+    assert len({e['path'] for e in manifest}) == 1
+    assert stored_files(tmp_path) == [manifest[0]['path']]
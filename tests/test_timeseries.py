@@ -0,0 +1,71 @@
+"""Serie temporal de ownership: deltas, mayores movimientos y buffer acotado."""
+from datetime import datetime, timedelta
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from ownership.timeseries import OwnershipSeries  # noqa: E402
+
+START = datetime(2026, 10, 1, 12, 0)
+
+
+def snapshot(dk, fd=None):
+    players = list(dk)
+    return pd.DataFrame({
+        'Team': ["NYY"] * len(players),
+        'Player': players,
+        'DK Ownership': [float(dk[player]) for player in players],
+        'FD Ownership': [float((fd or dk)[player]) for player in players],
+    })
+
+
+def build_series(*snapshots, **options):
+    series = OwnershipSeries("mlb", **options)
+    for minutes, df in enumerate(snapshots):
+        series.ingest(df, START + timedelta(minutes=5 * minutes))
+    return series
+
+
+def test_movers_only_keep_the_requested_direction():
+    # Una sola baja y varias subas: 'down' no debe completar la tabla con jugadores que subieron
+    series = build_series(
+        snapshot({'A': 10, 'B': 10, 'C': 10, 'D': 10, 'E': 10}),
+        snapshot({'A': 22, 'B': 15, 'C': 11, 'D': 10, 'E': 7}),
+    )
+    down = series.movers('DK Ownership', n=3, direction='down')
+    assert down['Player'].tolist() == ['E']
+    assert (down['Delta'] < 0).all()
+
+    up = series.movers('DK Ownership', n=10, direction='up')
+    assert up['Player'].tolist() == ['A', 'B', 'C']
+    assert up['Delta'].tolist() == [12, 5, 1]
+
+    assert series.movers('DK Ownership', n=2, direction='abs')['Player'].tolist() == ['A', 'B']
+
+
+def test_movers_skip_players_missing_at_either_end():
+    series = build_series(snapshot({'A': 10, 'B': 5}), snapshot({'A': 4, 'C': 30}))
+    assert series.movers('DK Ownership', direction='down')['Player'].tolist() == ['A']
+    assert series.movers('DK Ownership', direction='up').empty
+
+
+def test_deltas_since_and_combined_metric():
+    series = build_series(
+        snapshot({'A': 10}, {'A': 1}),
+        snapshot({'A': 14}, {'A': 2}),
+        snapshot({'A': 20}, {'A': 5}),
+    )
+    assert series.deltas('DK Ownership')['Delta'].tolist() == [10]
+    since = series.deltas('DK Ownership', since=START + timedelta(minutes=7))
+    assert since['Delta'].tolist() == [6]
+    assert since['Rate'].tolist() == pytest.approx([6 / (5 / 60)])
+    assert series.deltas('Combined Ownership')['Delta'].tolist() == [14]
+
+
+def test_ingest_ignores_stale_snapshots_and_stays_bounded():
+    series = build_series(*[snapshot({'A': i}) for i in range(12)], capacity=8, full_resolution=4)
+    assert len(series) <= 8
+    assert series.times[-1] == pd.Timestamp(START + timedelta(minutes=55))
+    assert series.frame('DK Ownership')['A'].iloc[-4:].tolist() == [8, 9, 10, 11]
+    assert not series.ingest(snapshot({'A': 99}), START)
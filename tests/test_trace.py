@@ -0,0 +1,42 @@
+"""Historial de trazas: se conservan las más recientes sin importar el deporte."""
+import os
+import time
+
+from ownership import trace
+from ownership.trace import ScrapeTrace, load_traces, trace_names
+
+
+def save_traces(root, sports):
+    saved = []
+    for sport in sports:
+        scrape_trace = ScrapeTrace(sport)
+        saved.append(os.path.basename(scrape_trace.save(root)))
+        # Fechas de modificación distintas aunque el sistema de archivos tenga poca resolución
+        time.sleep(0.02)
+    return saved
+
+
+def test_pruning_keeps_newest_traces_across_sports(tmp_path, monkeypatch):
+    monkeypatch.setattr(trace, 'TRACE_HISTORY', 3)
+    saved = save_traces(tmp_path, ["nba", "nba", "mlb", "mlb"])
+
+    assert sorted(os.listdir(tmp_path)) == sorted(saved[1:])
+    assert trace_names(tmp_path) == saved[:0:-1]
+    assert [t['trace_id'] for t in load_traces(tmp_path)] == [name[:-5] for name in saved[:0:-1]]
+
+
+def test_pruning_never_removes_the_trace_just_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(trace, 'TRACE_HISTORY', 2)
+    saved = save_traces(tmp_path, ["mlb", "mlb"])
+    # Traza antigua con una fecha de modificación en el futuro (p. ej. copiada de otra máquina)
+    future = time.time() + 3600
+    for name in saved:
+        os.utime(tmp_path / name, (future, future))
+
+    newest = save_traces(tmp_path, ["nba"])[0]
+    assert newest in os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_load_traces_without_directory(tmp_path):
+    assert load_traces(tmp_path / "missing") == []